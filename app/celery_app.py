@@ -1,8 +1,26 @@
 from celery import Celery
+from celery.signals import worker_init
+from kombu import Queue
 import os
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
 
+# ------------------------------------------------------------------
+# Queues
+# generation → I/O bound (VEO / Nano Banana / ElevenLabs waits)
+#              run with high concurrency, e.g. -P threads -c 32
+# merge      → CPU bound ffmpeg encodes
+#              run with concurrency ≈ cores, e.g. -c $(nproc)
+# upload     → final S3 uploads (network bound), e.g. -P threads -c 8
+#
+# Publish reads the merged master / renditions / previews from
+# MERGE_WORK_ROOT → upload workers must see the merge workers' files:
+# run them on the same hosts or mount one shared volume there.
+# ------------------------------------------------------------------
+GENERATION_QUEUE = os.getenv("CELERY_GENERATION_QUEUE", "generation")
+MERGE_QUEUE = os.getenv("CELERY_MERGE_QUEUE", "merge")
+UPLOAD_QUEUE = os.getenv("CELERY_UPLOAD_QUEUE", "upload")
+
 celery_app = Celery(
     "video_tasks",
     broker=REDIS_URL,
@@ -17,6 +35,29 @@ celery_app.conf.update(
     task_serializer="json",
     result_serializer="json",
     accept_content=["json"],
+    task_queues=(
+        Queue(GENERATION_QUEUE),
+        Queue(MERGE_QUEUE),
+        Queue(UPLOAD_QUEUE),
+    ),
+    task_default_queue=GENERATION_QUEUE,
+    task_routes={
+        "app.tasks.video_tasks.generate_campaign_video_task": {"queue": GENERATION_QUEUE},
+        "app.tasks.video_tasks.generate_scene_video_task": {"queue": GENERATION_QUEUE},
+        "app.tasks.video_tasks.merge_campaign_video_task": {"queue": MERGE_QUEUE},
+        "app.tasks.video_tasks.encode_segment_task": {"queue": MERGE_QUEUE},
+        "app.tasks.video_tasks.concat_segments_task": {"queue": MERGE_QUEUE},
+        "app.tasks.video_tasks.publish_campaign_video_task": {"queue": UPLOAD_QUEUE},
+        # Errbacks only write the DB → a queue that always has a worker
+        "app.tasks.video_tasks.campaign_video_failed_task": {"queue": GENERATION_QUEUE},
+    },
 )
 
-celery_app.autodiscover_tasks(["app.tasks"])
\ No newline at end of file
+celery_app.autodiscover_tasks(["app.tasks"])
+
+
+@worker_init.connect
+def _prepare_schema(**kwargs):
+    # Workers may start before the API → bring the schema up to date too
+    from app.database import prepare_schema
+    prepare_schema()
@@ -0,0 +1,114 @@
+import os
+
+# ------------------------------------------------------------------
+# Named x264 / AAC encoding profiles for the merge stage
+# draft    → previews / internal review, fastest possible encode
+# standard → libx264 defaults (previous behaviour)
+# final    → client delivery, higher quality at more CPU
+# threads 0 = let ffmpeg decide
+# ------------------------------------------------------------------
+ENCODING_PROFILES = {
+    "draft": {
+        "preset": "ultrafast",
+        "crf": 28,
+        "threads": 0,
+        "audio_bitrate": "96k",
+    },
+    "standard": {
+        "preset": "medium",
+        "crf": 23,
+        "threads": 0,
+        "audio_bitrate": "128k",
+    },
+    "final": {
+        "preset": "slow",
+        "crf": 18,
+        "threads": 0,
+        "audio_bitrate": "192k",
+    },
+}
+
+DEFAULT_ENCODING_PROFILE = os.getenv("ENCODING_PROFILE", "standard")
+
+
+# ------------------------------------------------------------------
+# Extra output renditions (center crop-to-fill from the 16:9 master)
+# ------------------------------------------------------------------
+RENDITIONS = {
+    "16x9_720": {"aspect_ratio": "16:9", "width": 1280, "height": 720},
+    "16x9_1080": {"aspect_ratio": "16:9", "width": 1920, "height": 1080},
+    "9x16_1080": {"aspect_ratio": "9:16", "width": 1080, "height": 1920},
+    "9x16_720": {"aspect_ratio": "9:16", "width": 720, "height": 1280},
+    "1x1_1080": {"aspect_ratio": "1:1", "width": 1080, "height": 1080},
+    "1x1_720": {"aspect_ratio": "1:1", "width": 720, "height": 720},
+}
+
+# Comma-separated names, e.g. "9x16_1080,1x1_1080" (empty = master only)
+DEFAULT_RENDITIONS = [
+    r.strip() for r in os.getenv("VIDEO_RENDITIONS", "").split(",") if r.strip()
+]
+
+
+# ------------------------------------------------------------------
+# Listing previews produced in the merge pass
+# poster  → JPEG frame at poster_at seconds
+# sprite  → thumbnail grid, one tile every sprite_interval seconds
+# preview → short silent low-bitrate MP4 loop
+# ------------------------------------------------------------------
+VIDEO_PREVIEWS = os.getenv("VIDEO_PREVIEWS", "true").lower() == "true"
+
+PREVIEW_SETTINGS = {
+    "poster_at": 1.0,
+    "poster_width": 1280,
+    "sprite_interval": 2.0,
+    "sprite_columns": 5,
+    "sprite_width": 160,
+    "preview_seconds": 6,
+    "preview_fps": 12,
+    "preview_width": 480,
+    "preview_crf": 32,
+}
+
+
+# ------------------------------------------------------------------
+# HLS / CMAF bitrate ladder (rungs above the master height are skipped)
+# ------------------------------------------------------------------
+HLS_LADDER = {
+    "1080p": {"height": 1080, "video_bitrate": "5000k", "maxrate": "5350k", "bufsize": "7500k", "audio_bitrate": "128k"},
+    "720p": {"height": 720, "video_bitrate": "2800k", "maxrate": "2996k", "bufsize": "4200k", "audio_bitrate": "128k"},
+    "480p": {"height": 480, "video_bitrate": "1400k", "maxrate": "1498k", "bufsize": "2100k", "audio_bitrate": "96k"},
+    "360p": {"height": 360, "video_bitrate": "800k", "maxrate": "856k", "bufsize": "1200k", "audio_bitrate": "96k"},
+}
+
+
+# ------------------------------------------------------------------
+# Mezzanine segment spec (distributed merge)
+# Every scene is normalised to this before its own encode, so segments
+# from different workers join with a stream-copy concat.
+# Defaults match VEO's output (1280x720, 24 fps).
+# ------------------------------------------------------------------
+MEZZANINE_SPEC = {
+    "width": int(os.getenv("MEZZANINE_WIDTH", "1280")),
+    "height": int(os.getenv("MEZZANINE_HEIGHT", "720")),
+    "fps": int(os.getenv("MEZZANINE_FPS", "24")),
+    "timescale": 90000,
+}
+
+
+def get_encoding_profile(name: str = None) -> dict:
+    name = name or DEFAULT_ENCODING_PROFILE
+    if name not in ENCODING_PROFILES:
+        raise ValueError(
+            f"Unknown encoding profile '{name}' "
+            f"(available: {', '.join(ENCODING_PROFILES)})"
+        )
+    return {"name": name, **ENCODING_PROFILES[name]}
+
+
+def get_rendition(name: str) -> dict:
+    if name not in RENDITIONS:
+        raise ValueError(
+            f"Unknown rendition '{name}' "
+            f"(available: {', '.join(RENDITIONS)})"
+        )
+    return {"name": name, **RENDITIONS[name]}
@@ -1,11 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger("video_pipeline")
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -36,3 +40,50 @@ def get_db():
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+
+
+def add_missing_columns(bind=engine, metadata=None):
+    """
+    create_all() never alters existing tables — add model columns that
+    are missing from the live table. Only nullable columns (safe to add
+    without a default); anything else needs a real migration.
+    """
+    metadata = metadata or Base.metadata
+    inspector = inspect(bind)
+
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+
+            column_type = column.type.compile(dialect=bind.dialect)
+            try:
+                # One transaction per column: the API and the workers run
+                # this at startup, a concurrent ALTER must not undo the rest
+                with bind.begin() as conn:
+                    conn.execute(text(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                    ))
+                logger.info("Added column %s.%s", table.name, column.name)
+            except SQLAlchemyError:
+                columns = {c["name"] for c in inspect(bind).get_columns(table.name)}
+                if column.name not in columns:
+                    raise
+                # Added by another process meanwhile
+
+
+def prepare_schema(bind=engine):
+    """
+    Tables + new nullable columns. Run by every entry point (API startup
+    and Celery worker_init), so whichever process starts first brings
+    the schema up to date.
+    """
+    # Registers every model on Base.metadata
+    import app.models  # noqa: F401
+
+    Base.metadata.create_all(bind=bind)
+    add_missing_columns(bind)
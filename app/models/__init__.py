@@ -1,3 +1,3 @@
-from .campaign import Campaign, CampaignScene, CampaignOutput, Base
+from .campaign import Campaign, CampaignScene, CampaignOutput, PipelineSpan, Base
 
-__all__ = ['Campaign', 'CampaignScene', 'CampaignOutput', 'Base']
+__all__ = ['Campaign', 'CampaignScene', 'CampaignOutput', 'PipelineSpan', 'Base']
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, JSON, Boolean
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, JSON, Boolean
 from app.database import Base
 from datetime import datetime
 
@@ -23,6 +23,25 @@ class Campaign(Base):
     # Video output
     final_video_url = Column(String, nullable=True)
     generation_error = Column(Text, nullable=True)
+
+    # Business details of the last video run (narration / scene re-renders)
+    business_name = Column(String, nullable=True)
+    phone_number = Column(String, nullable=True)
+    website = Column(String, nullable=True)
+
+    # Extra aspect-ratio renditions requested for this campaign
+    # (names from constants/encoding_profiles.RENDITIONS)
+    output_renditions = Column(JSON, nullable=True)
+
+    # Listing previews cut from the same merge pass
+    poster_url = Column(String, nullable=True)
+    thumbnail_sprite_url = Column(String, nullable=True)
+    thumbnail_sprite_meta = Column(JSON, nullable=True)  # interval, columns, rows, tile_width
+    preview_url = Column(String, nullable=True)
+
+    # Adaptive-bitrate ladder (None = VIDEO_HLS default on the worker)
+    output_hls = Column(Boolean, nullable=True)
+    hls_master_url = Column(String, nullable=True)
     
     # Status tracking
     status = Column(String, default="pending")  
@@ -78,6 +97,9 @@ class CampaignOutput(Base):
     # Merged final ad
     final_ad_url = Column(String, nullable=True)
     final_ad_duration = Column(Integer, nullable=True)
+
+    # [{name, aspect_ratio, width, height, url, bytes}]
+    renditions = Column(JSON, nullable=True)
     
     # Status
     status = Column(String, default="pending")  
@@ -85,3 +107,28 @@ class CampaignOutput(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+
+
+class PipelineSpan(Base):
+    __tablename__ = "pipeline_spans"
+
+    id = Column(String, primary_key=True)
+    campaign_id = Column(String, nullable=False, index=True)
+    scene_id = Column(String, nullable=True)
+    scene_number = Column(Integer, nullable=True)
+
+    # Stage timing
+    stage = Column(String, nullable=False)
+    attempt = Column(Integer, default=1)        # provider retry (VEO)
+    task_retries = Column(Integer, default=0)   # Celery retries of the task
+    started_at = Column(DateTime, nullable=False)
+    ended_at = Column(DateTime, nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    bytes_moved = Column(BigInteger, nullable=True)
+
+    # Outcome
+    status = Column(String, default="ok")
+    error = Column(Text, nullable=True)
+    meta = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
+import os
 import uuid
 
 from app.database import get_db
-from app.models.campaign import Campaign, CampaignScene
+from app.models.campaign import Campaign, CampaignScene, CampaignOutput, PipelineSpan
 
 from app.services.nano_banana_generator import nano_banana_generator
 from app.services.beauty_prompt_generator import beauty_prompt_generator
+from app.services.pipeline_timing import bind_timing_context, summarize_spans
+from app.services.campaign_scenes import load_video_scenes
+from app.constants.encoding_profiles import ENCODING_PROFILES, RENDITIONS
 
 # -----------------------------
 # CONFIG
@@ -23,6 +27,9 @@ LOCKED_OUTFIT_MAP = {
     "spa center": "white spa robe, clean texture, no patterns",
 }
 
+# Split video generation into per-scene Celery tasks + chord merge
+VIDEO_FANOUT_DEFAULT = os.getenv("VIDEO_FANOUT", "false").lower() == "true"
+
 router = APIRouter(prefix="/api/campaign", tags=["Campaign"])
 
 
@@ -300,6 +307,13 @@ async def get_campaign(campaign_id: str, db: Session = Depends(get_db)):
     )
     progress = calculate_campaign_progress(campaign, scenes)
 
+    latest_output = (
+        db.query(CampaignOutput)
+        .filter(CampaignOutput.campaign_id == campaign_id)
+        .order_by(CampaignOutput.created_at.desc())
+        .first()
+    )
+
     return {
         "campaign": {
             "id": campaign.id,
@@ -310,6 +324,12 @@ async def get_campaign(campaign_id: str, db: Session = Depends(get_db)):
             "product_type": campaign.product_type,
             "character_image_url": campaign.character_image_url,
             "final_video_url": campaign.final_video_url,
+            "renditions": latest_output.renditions if latest_output else None,
+            "poster_url": campaign.poster_url,
+            "thumbnail_sprite_url": campaign.thumbnail_sprite_url,
+            "thumbnail_sprite": campaign.thumbnail_sprite_meta,
+            "preview_url": campaign.preview_url,
+            "hls_master_url": campaign.hls_master_url,
             "created_at": campaign.created_at.isoformat(),
         },
         "scenes": [
@@ -324,6 +344,51 @@ async def get_campaign(campaign_id: str, db: Session = Depends(get_db)):
             for s in scenes
         ],
     }
+
+# =========================================================
+# STAGE TIMINGS
+# =========================================================
+
+@router.get("/campaign/{campaign_id}/timings")
+async def get_campaign_timings(campaign_id: str, db: Session = Depends(get_db)):
+    """
+    Per-stage timing breakdown (character → scene images → VEO → TTS
+    → merge → upload) recorded by pipeline_timing.
+    """
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(404, "Campaign not found")
+
+    spans = (
+        db.query(PipelineSpan)
+        .filter(PipelineSpan.campaign_id == campaign_id)
+        .order_by(PipelineSpan.started_at)
+        .all()
+    )
+
+    return {
+        "campaign_id": campaign_id,
+        **summarize_spans(spans),
+        "spans": [
+            {
+                "stage": s.stage,
+                "scene_id": s.scene_id,
+                "scene_number": s.scene_number,
+                "attempt": s.attempt,
+                "task_retries": s.task_retries,
+                "started_at": s.started_at.isoformat(),
+                "ended_at": s.ended_at.isoformat(),
+                "duration_ms": s.duration_ms,
+                "bytes_moved": s.bytes_moved,
+                "status": s.status,
+                "error": s.error,
+                "meta": s.meta,
+            }
+            for s in spans
+        ],
+    }
+
+
 # =========================================================
 # GENERATE CAMPAIGN VIDEOS (ASYNC – CELERY)
 # =========================================================
@@ -334,13 +399,48 @@ async def generate_campaign_videos(
     business_name: Optional[str] = None,
     phone_number: Optional[str] = None,
     website: Optional[str] = None,
+    scene_concurrency: Optional[int] = Query(None, ge=1, le=10),
+    fan_out: Optional[bool] = None,
+    resume: bool = False,
+    encoding_profile: Optional[str] = None,
+    renditions: Optional[str] = None,
+    hls: Optional[bool] = None,
     db: Session = Depends(get_db),
 ):
     """
     Trigger async video generation.
     Heavy work is done by Celery workers.
+    scene_concurrency: how many scenes render in parallel
+    (defaults to VIDEO_SCENE_CONCURRENCY on the worker).
+    fan_out: one Celery task per scene + merge callback
+    (defaults to VIDEO_FANOUT).
+    resume: keep scene videos from a previous run instead of
+    re-rendering them.
+    encoding_profile: draft / standard / final
+    (defaults to ENCODING_PROFILE on the worker).
+    renditions: extra aspect ratios encoded in the same merge pass,
+    comma-separated, e.g. "9x16_1080,1x1_1080"
+    (defaults to VIDEO_RENDITIONS on the worker).
+    hls: also package an HLS/CMAF bitrate ladder
+    (defaults to VIDEO_HLS on the worker).
     """
 
+    if encoding_profile and encoding_profile not in ENCODING_PROFILES:
+        raise HTTPException(
+            400,
+            f"Unknown encoding profile. Use one of: {', '.join(ENCODING_PROFILES)}"
+        )
+
+    rendition_names = None
+    if renditions is not None:
+        rendition_names = [r.strip() for r in renditions.split(",") if r.strip()]
+        unknown = [r for r in rendition_names if r not in RENDITIONS]
+        if unknown:
+            raise HTTPException(
+                400,
+                f"Unknown renditions {unknown}. Use any of: {', '.join(RENDITIONS)}"
+            )
+
     try:
         campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
         if not campaign:
@@ -349,17 +449,7 @@ async def generate_campaign_videos(
         if not campaign.character_image_url:
             raise HTTPException(400, "Character reference missing")
 
-        scenes = (
-            db.query(CampaignScene)
-            .filter(CampaignScene.campaign_id == campaign_id)
-            .order_by(CampaignScene.scene_number)
-            .all()
-        )
-
-        scenes_with_images = [
-            s for s in scenes
-            if s.selected_image_url and s.scene_number <= campaign.num_scenes
-        ]
+        scenes_with_images = load_video_scenes(db, campaign)
 
         if not scenes_with_images:
             raise HTTPException(
@@ -371,14 +461,43 @@ async def generate_campaign_videos(
         campaign.business_name = business_name
         campaign.phone_number = phone_number
         campaign.website = website
+        campaign.output_renditions = rendition_names
+        campaign.output_hls = hls
+
+        # Fresh run → drop scene checkpoints so VEO renders again
+        if not resume:
+            for scene in scenes_with_images:
+                scene.video_url = None
+                scene.status = "image_selected"
 
         # Mark queued
         campaign.status = "video_queued"
         db.commit()
 
-        # Enqueue Celery job
-        from app.tasks.video_tasks import generate_campaign_video_task
-        generate_campaign_video_task.delay(campaign_id, business_name, phone_number, website)
+        if fan_out is None:
+            fan_out = VIDEO_FANOUT_DEFAULT
+
+        # Enqueue Celery job(s)
+        if fan_out:
+            from app.tasks.video_tasks import dispatch_campaign_fanout
+            dispatch_campaign_fanout(
+                campaign_id,
+                [s.id for s in scenes_with_images],
+                business_name,
+                phone_number,
+                website,
+                encoding_profile,
+            )
+        else:
+            from app.tasks.video_tasks import generate_campaign_video_task
+            generate_campaign_video_task.delay(
+                campaign_id,
+                business_name,
+                phone_number,
+                website,
+                scene_concurrency,
+                encoding_profile,
+            )
 
         return {
             "status": "video_generation_started",
@@ -392,6 +511,74 @@ async def generate_campaign_videos(
     #     db.rollback()
     #     raise HTTPException(500, "Failed to start video generation")
 
+
+# =========================================================
+# RE-RENDER ONE SCENE (ASYNC – CELERY)
+# =========================================================
+
+@router.post("/campaign/{campaign_id}/scenes/{scene_number}/rerender")
+async def rerender_campaign_scene(
+    campaign_id: str,
+    scene_number: int,
+    encoding_profile: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Re-render one scene through VEO and rebuild the final ad.
+    Every other scene keeps its saved video and narration, and its
+    mezzanine segment is reused from S3 → only this scene is rendered
+    and encoded, the ad itself is a stream-copy concat.
+    Select a new image for the scene first to change its look.
+    encoding_profile: same as the previous run to reuse its segments
+    (defaults to ENCODING_PROFILE on the worker).
+    Runs in fan-out mode (needs the Redis result backend).
+    """
+
+    if encoding_profile and encoding_profile not in ENCODING_PROFILES:
+        raise HTTPException(
+            400,
+            f"Unknown encoding profile. Use one of: {', '.join(ENCODING_PROFILES)}"
+        )
+
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(404, "Campaign not found")
+
+    if campaign.status in ("video_queued", "veo_generating", "merging_video"):
+        raise HTTPException(409, "Video generation already in progress")
+
+    scenes_with_images = load_video_scenes(db, campaign)
+
+    target = next((s for s in scenes_with_images if s.scene_number == scene_number), None)
+    if not target:
+        raise HTTPException(404, f"Scene {scene_number} not found or has no selected image")
+
+    # Only this scene loses its VEO checkpoint
+    target.video_url = None
+    target.status = "image_selected"
+
+    campaign.status = "video_queued"
+    campaign.generation_error = None
+    db.commit()
+
+    from app.tasks.video_tasks import dispatch_campaign_fanout
+    dispatch_campaign_fanout(
+        campaign_id,
+        [s.id for s in scenes_with_images],
+        campaign.business_name,
+        campaign.phone_number,
+        campaign.website,
+        encoding_profile,
+        distributed=True,
+    )
+
+    return {
+        "status": "scene_rerender_started",
+        "campaign_id": campaign_id,
+        "scene_number": scene_number,
+        "message": "Scene is re-rendering. Poll campaign status."
+    }
+
 @router.post("/generate_beauty_campaign")
 async def generate_beauty_campaign(
     business_type: str,
@@ -416,6 +603,9 @@ async def generate_beauty_campaign(
         "neutral elegant professional outfit, no patterns, no logos"
     )
 
+    # Spans below belong to this campaign (request task context)
+    bind_timing_context(campaign_id)
+
     try:
         # -------------------------------------------------
         # STEP 1: Generate character
@@ -492,6 +682,7 @@ async def generate_beauty_campaign(
             db.commit()
 
             # Generate image
+            bind_timing_context(campaign_id, scene_id, scene_num)
             image_url = await nano_banana_generator.generate_scene_with_character(
                 visual_prompt=scene["prompt"],
                 character_image_url=character_url,
@@ -0,0 +1,23 @@
+from sqlalchemy.orm import Session
+
+from app.models.campaign import Campaign, CampaignScene
+
+
+def load_video_scenes(db: Session, campaign: Campaign) -> list[CampaignScene]:
+    """
+    Scenes that go into the campaign video, in scene order: a selected
+    image and within num_scenes. Fan-out, single-task runs and scene
+    re-renders all use this, so every mode renders the same set.
+    """
+    scenes = (
+        db.query(CampaignScene)
+        .filter(CampaignScene.campaign_id == campaign.id)
+        .order_by(CampaignScene.scene_number)
+        .all()
+    )
+
+    return [
+        s for s in scenes
+        if s.selected_image_url
+        and (campaign.num_scenes is None or s.scene_number <= campaign.num_scenes)
+    ]
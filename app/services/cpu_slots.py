@@ -0,0 +1,147 @@
+"""
+Host-wide ffmpeg CPU slots
+
+Every Celery prefork child on a host draws ffmpeg threads from one
+shared pool of CPU slots, so concurrent merges stop oversubscribing the
+cores and slowing each other down.
+
+- One lock file per slot under FFMPEG_SLOT_DIR, held with flock →
+  works across processes, and the kernel releases a dead worker's slots
+- A job asks for FFMPEG_JOB_THREADS slots and gets what is free (at
+  least one); with nothing free it waits (admission control) up to
+  FFMPEG_SLOT_WAIT seconds, recorded as a "cpu_wait" span
+- The granted count is carried in a contextvar: VideoMerger's encoder
+  args turn it into -threads, and nested acquisitions reuse it
+
+    with cpu_slots.acquire() as threads:
+        run_ffmpeg([... "-threads", str(threads) ...], step="encode")
+"""
+
+import os
+import time
+import random
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:     # Windows dev boxes: scheduler off
+    fcntl = None
+
+from app.services.pipeline_timing import stage_span
+
+
+_CPUS = os.cpu_count() or 2
+
+FFMPEG_CPU_SLOTS = os.getenv("FFMPEG_CPU_SLOTS", "true").lower() == "true"
+FFMPEG_HOST_SLOTS = int(os.getenv("FFMPEG_HOST_SLOTS", str(_CPUS)))
+FFMPEG_JOB_THREADS = int(os.getenv("FFMPEG_JOB_THREADS", str(max(1, _CPUS // 2))))
+FFMPEG_SLOT_WAIT = float(os.getenv("FFMPEG_SLOT_WAIT", "600"))
+FFMPEG_SLOT_DIR = os.getenv(
+    "FFMPEG_SLOT_DIR", os.path.join(tempfile.gettempdir(), "ffmpeg_cpu_slots")
+)
+
+_granted: ContextVar[Optional[int]] = ContextVar("ffmpeg_cpu_threads", default=None)
+
+
+def granted_threads() -> Optional[int]:
+    """Slots held by the current context (None outside cpu_slots.acquire)."""
+    return _granted.get()
+
+
+class CpuSlots:
+
+    def __init__(
+        self,
+        slots: int = FFMPEG_HOST_SLOTS,
+        slot_dir: str = FFMPEG_SLOT_DIR,
+        job_threads: int = FFMPEG_JOB_THREADS,
+        wait: float = FFMPEG_SLOT_WAIT,
+        enabled: bool = FFMPEG_CPU_SLOTS,
+    ):
+        self.slots = max(1, slots)
+        self.slot_dir = slot_dir
+        self.job_threads = max(1, min(job_threads, self.slots))
+        self.wait = wait
+        self.enabled = enabled and fcntl is not None
+
+    def _try_take(self, want: int) -> List[int]:
+        """Non-blocking: locks up to `want` free slots, returns their fds."""
+        os.makedirs(self.slot_dir, exist_ok=True)
+        held = []
+
+        # Random start → processes don't all fight over slot 0
+        start = random.randrange(self.slots)
+        for i in range(self.slots):
+            if len(held) == want:
+                break
+            path = os.path.join(self.slot_dir, f"slot_{(start + i) % self.slots}.lock")
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                held.append(fd)
+            except OSError:
+                os.close(fd)
+
+        return held
+
+    @staticmethod
+    def _release(fds: List[int]):
+        for fd in fds:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+
+    def _wait_for(self, want: int) -> List[int]:
+        started = time.monotonic()
+        delay = 0.05
+
+        while True:
+            time.sleep(delay + random.uniform(0, delay))
+            delay = min(delay * 2, 1.0)
+
+            fds = self._try_take(want)
+            if fds:
+                return fds
+            if time.monotonic() - started > self.wait:
+                raise RuntimeError(
+                    f"No ffmpeg CPU slot free after {self.wait:.0f}s "
+                    f"({self.slots} slots in {self.slot_dir})"
+                )
+
+    @contextmanager
+    def acquire(self, want: Optional[int] = None) -> Iterator[Optional[int]]:
+        """
+        Yields the number of threads this job may use. Nested calls
+        reuse the outer grant. Disabled → yields None (ffmpeg decides).
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        held_outer = _granted.get()
+        if held_outer is not None:
+            yield held_outer
+            return
+
+        want = max(1, min(want or self.job_threads, self.slots))
+        fds = self._try_take(want)
+        if not fds:
+            # Host saturated → queue (own span, so waits show in timings)
+            with stage_span("cpu_wait", want=want) as span:
+                fds = self._wait_for(want)
+                span.meta["threads"] = len(fds)
+
+        token = _granted.set(len(fds))
+        try:
+            yield len(fds)
+        finally:
+            _granted.reset(token)
+            self._release(fds)
+
+
+# Singleton
+cpu_slots = CpuSlots()
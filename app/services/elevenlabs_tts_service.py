@@ -3,6 +3,8 @@ import uuid
 from elevenlabs.client import ElevenLabs
 from dotenv import load_dotenv
 
+from app.services.rate_limiter import rate_limiter
+
 load_dotenv()
 
 
@@ -23,6 +25,7 @@ class ElevenLabsTTSService:
 
         # Default natural female voice 
         self.voice_id = "EXAVITQu4vr4xnSDxMaL"
+        self.model_id = "eleven_multilingual_v2"
 
         print("ElevenLabs TTS Service initialized")
 
@@ -41,10 +44,12 @@ class ElevenLabsTTSService:
             f"voice_{uuid.uuid4().hex}.mp3"
         )
 
+        rate_limiter.acquire("elevenlabs_tts")
+
         audio_stream = self.client.text_to_speech.convert(
             voice_id=self.voice_id,
             text=text,
-            model_id="eleven_multilingual_v2",
+            model_id=self.model_id,
             output_format="mp3_44100_128"
         )
 
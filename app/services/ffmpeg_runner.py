@@ -0,0 +1,286 @@
+"""
+ffmpeg runner
+
+One entry point for every ffmpeg invocation of the merge / packaging
+steps:
+
+- Exit status checked → FFmpegError (a RuntimeError) with the step name,
+  exit code and the tail of stderr, raised where the step failed instead
+  of surfacing later as a missing file or an unreadable probe
+- Wall-clock timeout per step + stall timeout (no -progress update)
+  → the process is killed, the error says which step hung. Both are
+  per call; streamed encodes pass a longer stall limit
+- `-progress` is read from a dedicated pipe → percent complete for steps
+  with a known output duration (logged, and kept on the span)
+- rusage per invocation via os.wait4 (CPU user/sys, max RSS), added to
+  the innermost timing span so slow steps are attributed per stage
+- Runs inside a host CPU slot grant (see cpu_slots): the caller's grant
+  if it holds one, otherwise a single slot; filter threads follow it
+
+Usage:
+    run_ffmpeg(["-i", src, ..., out], step="fade", duration=8.0)
+
+    # stdout consumed while ffmpeg runs (e.g. streamed to S3)
+    result = run_ffmpeg([..., "pipe:1"], step="encode", stdout_consumer=upload.write_from)
+"""
+
+import os
+import time
+import logging
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.services.pipeline_timing import current_span
+from app.services.cpu_slots import cpu_slots
+
+
+logger = logging.getLogger("video_pipeline")
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+# Short steps (fit / strip / mux / fade) vs full-timeline encodes
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", "600"))
+FFMPEG_ENCODE_TIMEOUT = float(os.getenv("FFMPEG_ENCODE_TIMEOUT", "1800"))
+# No -progress update for this long → treated as hung
+FFMPEG_STALL_TIMEOUT = float(os.getenv("FFMPEG_STALL_TIMEOUT", "120"))
+# Encodes into a pipe legitimately stop while the reader is backpressured
+# (S3 multipart parts in flight) → longer limit, 0 = off
+FFMPEG_STREAM_STALL_TIMEOUT = float(os.getenv("FFMPEG_STREAM_STALL_TIMEOUT", "900"))
+
+STDERR_TAIL_LINES = 40
+
+
+class FFmpegError(RuntimeError):
+
+    def __init__(
+        self,
+        step: str,
+        returncode: Optional[int],
+        stderr_tail: str,
+        timed_out: Optional[str] = None,
+    ):
+        self.step = step
+        self.returncode = returncode
+        self.stderr_tail = stderr_tail
+        self.timed_out = timed_out
+
+        if timed_out:
+            reason = f"killed after {timed_out}"
+        else:
+            reason = f"exit code {returncode}"
+        super().__init__(f"ffmpeg {step} failed ({reason}): {stderr_tail[-1000:]}")
+
+
+@dataclass
+class FFmpegResult:
+    step: str
+    returncode: int
+    wall_seconds: float
+    cpu_user: float
+    cpu_system: float
+    max_rss_mb: float
+    stderr_tail: str
+    out_time: Optional[float] = None
+    speed: Optional[str] = None
+    stdout_result: object = None
+    threads: Optional[int] = None
+
+    @property
+    def cpu_seconds(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+
+class _Progress:
+    """Parses `-progress` key=value blocks from ffmpeg."""
+
+    def __init__(self, step: str, duration: Optional[float], on_progress: Optional[Callable[[float], None]]):
+        self.step = step
+        self.duration = duration
+        self.on_progress = on_progress
+        self.out_time: Optional[float] = None
+        self.speed: Optional[str] = None
+        self.last_update = time.monotonic()
+        self._logged_quarter = 0
+
+    def feed(self, line: str):
+        key, _, value = line.strip().partition("=")
+        self.last_update = time.monotonic()
+
+        if key in ("out_time_us", "out_time_ms"):
+            # Both are microseconds (out_time_ms is misnamed upstream)
+            try:
+                self.out_time = max(0.0, int(value) / 1_000_000)
+            except ValueError:
+                return
+        elif key == "speed":
+            self.speed = value
+        elif key == "progress":
+            self._report(done=value == "end")
+
+    @property
+    def percent(self) -> Optional[float]:
+        if not self.duration or self.out_time is None:
+            return None
+        return min(100.0, self.out_time / self.duration * 100)
+
+    def _report(self, done: bool):
+        pct = 100.0 if done and self.duration else self.percent
+        if pct is None:
+            return
+        if self.on_progress:
+            self.on_progress(pct)
+
+        quarter = int(pct // 25)
+        if quarter > self._logged_quarter and quarter < 4:
+            self._logged_quarter = quarter
+            logger.info("⏳ ffmpeg %s %d%% (speed %s)", self.step, pct, self.speed or "?")
+
+
+def _drain(stream, sink: Callable[[str], None]):
+    for raw in iter(stream.readline, b""):
+        sink(raw.decode(errors="ignore"))
+    stream.close()
+
+
+def run_ffmpeg(
+    args: List[str],
+    step: str,
+    duration: Optional[float] = None,
+    timeout: Optional[float] = None,
+    stall_timeout: Optional[float] = FFMPEG_STALL_TIMEOUT,
+    on_progress: Optional[Callable[[float], None]] = None,
+    stdout_consumer: Optional[Callable] = None,
+) -> FFmpegResult:
+    """
+    Runs `ffmpeg -y -nostats -progress pipe:N <args>` and waits for it.
+
+    duration        → expected output seconds, enables percent complete
+    timeout         → wall-clock limit (default FFMPEG_TIMEOUT)
+    stall_timeout   → limit without a progress update (None / 0 = off);
+                      see FFMPEG_STREAM_STALL_TIMEOUT for piped outputs
+    stdout_consumer → called with ffmpeg's stdout pipe in this thread
+                      while ffmpeg runs; its return value is kept in
+                      FFmpegResult.stdout_result
+    """
+    # Heavy steps acquire their grant before building args (-threads);
+    # anything else still counts as one busy core
+    with cpu_slots.acquire(want=1) as threads:
+        return _run(args, step, duration, timeout, stall_timeout, on_progress, stdout_consumer, threads)
+
+
+def _run(args, step, duration, timeout, stall_timeout, on_progress, stdout_consumer, threads):
+    timeout = timeout or FFMPEG_TIMEOUT
+    progress = _Progress(step, duration, on_progress)
+    stderr_tail: deque = deque(maxlen=STDERR_TAIL_LINES)
+
+    progress_r, progress_w = os.pipe()
+    cmd = [
+        FFMPEG_BINARY, "-y", "-nostats", "-hide_banner",
+        "-progress", f"pipe:{progress_w}",
+        *(["-filter_complex_threads", str(threads), "-filter_threads", str(threads)] if threads else []),
+        *args,
+    ]
+
+    started = time.monotonic()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE if stdout_consumer else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            pass_fds=(progress_w,),
+        )
+    except BaseException:
+        os.close(progress_r)
+        raise
+    finally:
+        os.close(progress_w)
+
+    progress_file = os.fdopen(progress_r, "rb")
+    readers = [
+        threading.Thread(target=_drain, args=(proc.stderr, stderr_tail.append), daemon=True),
+        threading.Thread(target=_drain, args=(progress_file, progress.feed), daemon=True),
+    ]
+    for t in readers:
+        t.start()
+
+    # ---- watchdog: wall-clock + stall limits
+    killed_for: List[str] = []
+    finished = threading.Event()
+
+    def _watch():
+        while not finished.wait(1.0):
+            now = time.monotonic()
+            if now - started > timeout:
+                killed_for.append(f"{timeout:.0f}s timeout")
+            elif stall_timeout and now - progress.last_update > stall_timeout:
+                killed_for.append(f"{stall_timeout:.0f}s without progress")
+            else:
+                continue
+            try:
+                proc.kill()
+            except OSError:
+                pass
+            return
+
+    watchdog = threading.Thread(target=_watch, daemon=True)
+    watchdog.start()
+
+    stdout_result = None
+    try:
+        if stdout_consumer:
+            stdout_result = stdout_consumer(proc.stdout)
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        # Reap with rusage (Popen must not wait again afterwards)
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        finished.set()
+        if proc.stdout:
+            proc.stdout.close()
+        for t in readers:
+            t.join(timeout=5)
+
+    tail = "".join(stderr_tail).strip()
+    result = FFmpegResult(
+        step=step,
+        returncode=proc.returncode,
+        wall_seconds=round(time.monotonic() - started, 3),
+        cpu_user=round(usage.ru_utime, 3),
+        cpu_system=round(usage.ru_stime, 3),
+        # ru_maxrss is KiB on Linux
+        max_rss_mb=round(usage.ru_maxrss / 1024, 1),
+        stderr_tail=tail,
+        out_time=progress.out_time,
+        speed=progress.speed,
+        stdout_result=stdout_result,
+        threads=threads,
+    )
+    _attribute(result)
+
+    if killed_for:
+        raise FFmpegError(step, proc.returncode, tail, timed_out=killed_for[0])
+    if proc.returncode != 0:
+        raise FFmpegError(step, proc.returncode, tail)
+
+    return result
+
+
+def _attribute(result: FFmpegResult):
+    """Accumulates ffmpeg resource usage on the innermost timing span."""
+    span = current_span()
+    if span is None:
+        return
+
+    meta = span.meta = span.meta or {}
+    meta["ffmpeg_runs"] = meta.get("ffmpeg_runs", 0) + 1
+    meta["ffmpeg_cpu_s"] = round(meta.get("ffmpeg_cpu_s", 0) + result.cpu_seconds, 3)
+    meta["ffmpeg_max_rss_mb"] = max(meta.get("ffmpeg_max_rss_mb", 0), result.max_rss_mb)
+    if result.speed:
+        meta["ffmpeg_speed"] = result.speed
+    if result.threads:
+        meta["ffmpeg_threads"] = max(meta.get("ffmpeg_threads", 0), result.threads)
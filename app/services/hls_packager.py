@@ -0,0 +1,220 @@
+"""
+HLS / CMAF packaging of final ads
+
+One ffmpeg run turns the merged master into an adaptive-bitrate ladder
+(short segments, one media playlist per rung, one master playlist).
+Segments and playlists are then uploaded to S3 in parallel.
+
+- Ladder rungs above the master's height are skipped (no upscaling)
+- Keyframes are forced on segment boundaries → every rung switches
+  cleanly at the same points
+- HLS_SEGMENT_TYPE=fmp4 → CMAF segments (.m4s + init.mp4),
+  mpegts → classic .ts segments
+- Playlists are uploaded after every segment, so a published master
+  URL never references a missing object
+
+Layout under campaigns/hls/<campaign_id>/<run>/ on S3:
+    master.m3u8
+    720p/index.m3u8, 720p/init.mp4, 720p/seg_000.m4s ...
+    480p/...
+"""
+
+import os
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from app.services.pipeline_timing import stage_span
+from app.services.ffmpeg_runner import FFMPEG_ENCODE_TIMEOUT, run_ffmpeg
+from app.services.cpu_slots import cpu_slots, granted_threads
+from app.services.media_probe import probe_media
+from app.services.s3_service import upload_to_s3, build_s3_url
+from app.constants.encoding_profiles import HLS_LADDER, get_encoding_profile
+
+
+logger = logging.getLogger("video_pipeline")
+
+VIDEO_HLS = os.getenv("VIDEO_HLS", "false").lower() == "true"
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", "4"))
+HLS_SEGMENT_TYPE = os.getenv("HLS_SEGMENT_TYPE", "fmp4").lower()
+HLS_UPLOAD_WORKERS = int(os.getenv("HLS_UPLOAD_WORKERS", "8"))
+
+CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+    ".ts": "video/mp2t",
+}
+
+
+class HLSPackager:
+
+    def __init__(
+        self,
+        enabled: bool = VIDEO_HLS,
+        segment_seconds: int = HLS_SEGMENT_SECONDS,
+        segment_type: str = HLS_SEGMENT_TYPE,
+        upload_workers: int = HLS_UPLOAD_WORKERS,
+    ):
+        self.enabled = enabled
+        self.segment_seconds = segment_seconds
+        self.segment_type = segment_type
+        self.upload_workers = max(1, upload_workers)
+
+    # ------------------------------------------------------------------
+    # LADDER
+    # ------------------------------------------------------------------
+    def ladder_for(self, master_path: str) -> List[dict]:
+        info = probe_media(master_path)
+        height = info.height or max(r["height"] for r in HLS_LADDER.values())
+
+        rungs = [
+            {"name": name, **spec}
+            for name, spec in HLS_LADDER.items()
+            if spec["height"] <= height
+        ]
+        if not rungs:
+            # Source smaller than the lowest rung → single rung at source size
+            lowest = min(HLS_LADDER.items(), key=lambda kv: kv[1]["height"])
+            rungs = [{"name": lowest[0], **lowest[1], "height": height}]
+
+        return sorted(rungs, key=lambda r: r["height"], reverse=True)
+
+    # ------------------------------------------------------------------
+    # PACKAGE (one decode, one encode per rung)
+    # ------------------------------------------------------------------
+    def package(self, master_path: str, out_dir: str, profile: Optional[str] = None) -> str:
+        """Writes the ladder into out_dir. Returns the master playlist path."""
+        with cpu_slots.acquire():
+            return self._package(master_path, out_dir, profile)
+
+    def _package(self, master_path: str, out_dir: str, profile: Optional[str]) -> str:
+        rungs = self.ladder_for(master_path)
+        p = get_encoding_profile(profile)
+        seg = self.segment_seconds
+        info = probe_media(master_path)
+        has_audio = info.has_audio
+
+        splits = "".join(f"[s{i}]" for i in range(len(rungs)))
+        graph = [f"[0:v]split={len(rungs)}{splits}"]
+        for i, r in enumerate(rungs):
+            graph.append(f"[s{i}]scale=-2:{r['height']},setsar=1[v{i}]")
+
+        cmd = [
+            "-i", master_path,
+            "-filter_complex", ";".join(graph),
+        ]
+
+        for i, r in enumerate(rungs):
+            cmd += ["-map", f"[v{i}]"]
+            if has_audio:
+                cmd += ["-map", "0:a"]
+
+            cmd += [
+                f"-c:v:{i}", "libx264",
+                f"-b:v:{i}", r["video_bitrate"],
+                f"-maxrate:v:{i}", r["maxrate"],
+                f"-bufsize:v:{i}", r["bufsize"],
+            ]
+            if has_audio:
+                cmd += [f"-c:a:{i}", "aac", f"-b:a:{i}", r["audio_bitrate"]]
+
+        cmd += [
+            "-preset", p["preset"],
+            "-pix_fmt", "yuv420p",
+            # Same keyframe grid on every rung → aligned segments
+            "-force_key_frames", f"expr:gte(t,n_forced*{seg})",
+            "-sc_threshold", "0",
+        ]
+        threads = granted_threads() or p["threads"]
+        if threads:
+            cmd += ["-threads", str(threads)]
+
+        var_map = " ".join(
+            f"v:{i},a:{i},name:{r['name']}" if has_audio else f"v:{i},name:{r['name']}"
+            for i, r in enumerate(rungs)
+        )
+        ext = "m4s" if self.segment_type == "fmp4" else "ts"
+
+        cmd += [
+            "-f", "hls",
+            "-hls_time", str(seg),
+            "-hls_playlist_type", "vod",
+            "-hls_flags", "independent_segments",
+            "-hls_segment_type", self.segment_type,
+            "-hls_segment_filename", os.path.join(out_dir, "%v", f"seg_%03d.{ext}"),
+            "-master_pl_name", "master.m3u8",
+            "-var_stream_map", var_map,
+        ]
+        if self.segment_type == "fmp4":
+            cmd += ["-hls_fmp4_init_filename", "init.mp4"]
+        cmd.append(os.path.join(out_dir, "%v", "index.m3u8"))
+
+        for r in rungs:
+            os.makedirs(os.path.join(out_dir, r["name"]), exist_ok=True)
+
+        with stage_span("hls_package", rungs=len(rungs)) as span:
+            run_ffmpeg(
+                cmd, step="hls_package", duration=info.duration, timeout=FFMPEG_ENCODE_TIMEOUT
+            )
+            span.bytes_moved = sum(
+                os.path.getsize(os.path.join(root, f))
+                for root, _, files in os.walk(out_dir)
+                for f in files
+            )
+
+        master = os.path.join(out_dir, "master.m3u8")
+        if not os.path.exists(master):
+            raise RuntimeError("HLS packaging produced no master playlist")
+
+        logger.info("📺 HLS ladder: %s", ", ".join(r["name"] for r in rungs))
+        return master
+
+    # ------------------------------------------------------------------
+    # UPLOAD (segments in parallel, playlists last)
+    # ------------------------------------------------------------------
+    def upload(self, out_dir: str, campaign_id: str) -> str:
+        """Uploads out_dir to S3. Returns the public master playlist URL."""
+        prefix = f"campaigns/hls/{campaign_id}/{uuid.uuid4().hex[:8]}"
+
+        files = [
+            os.path.join(root, f)
+            for root, _, names in os.walk(out_dir)
+            for f in names
+        ]
+        playlists = [f for f in files if f.endswith(".m3u8")]
+        media = [f for f in files if not f.endswith(".m3u8")]
+
+        def _put(path: str):
+            rel = os.path.relpath(path, out_dir).replace(os.sep, "/")
+            content_type = CONTENT_TYPES.get(os.path.splitext(path)[1], "application/octet-stream")
+            upload_to_s3(path, key=f"{prefix}/{rel}", content_type=content_type)
+
+        with stage_span("hls_upload", files=len(files)) as span:
+            span.bytes_moved = sum(os.path.getsize(f) for f in files)
+
+            with ThreadPoolExecutor(
+                max_workers=self.upload_workers, thread_name_prefix="hls_upload"
+            ) as pool:
+                # list() → re-raise the first failed upload
+                list(pool.map(_put, media))
+                list(pool.map(_put, [p for p in playlists if not p.endswith("master.m3u8")]))
+
+            _put(os.path.join(out_dir, "master.m3u8"))
+
+        return build_s3_url(f"{prefix}/master.m3u8")
+
+    def package_and_upload(
+        self,
+        master_path: str,
+        out_dir: str,
+        campaign_id: str,
+        profile: Optional[str] = None,
+    ) -> str:
+        self.package(master_path, out_dir, profile)
+        return self.upload(out_dir, campaign_id)
+
+
+# Singleton
+hls_packager = HLSPackager()
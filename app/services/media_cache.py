@@ -0,0 +1,193 @@
+"""
+Local content-addressed media cache
+
+VEO clips are kept on the worker that produced them, so the merge
+does not download from S3 the bytes this host just uploaded.
+
+Layout under MEDIA_CACHE_DIR:
+    blobs/<sha256>.<ext>     content (written once, shared by URLs)
+    refs/<sha1(url)>         → sha256 + ext of the blob for that URL
+
+- Lookups are by the S3 URL the rest of the pipeline already passes
+  around; S3 stays the fallback (other hosts, evicted entries)
+- Refs assume a URL always names the same bytes: VEO uploads put a
+  content digest in the key (veo3_video_generator), so a re-render gets
+  a new URL and no host can serve an earlier render from its cache
+- Blobs are hard-linked into the merge workspace (no copy) when the
+  filesystems allow it
+- Oldest blobs are evicted once MEDIA_CACHE_MAX_MB is exceeded; eviction
+  holds an flock on <root>/evict.lock, so one Celery child evicts at a time
+- Writes are atomic (tmp file + rename) → safe across Celery children
+"""
+
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:     # Windows dev boxes: single-process eviction
+    fcntl = None
+
+
+logger = logging.getLogger("video_pipeline")
+
+MEDIA_CACHE_ENABLED = os.getenv("MEDIA_CACHE_ENABLED", "true").lower() == "true"
+MEDIA_CACHE_DIR = os.getenv(
+    "MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "media_cache")
+)
+MEDIA_CACHE_MAX_MB = int(os.getenv("MEDIA_CACHE_MAX_MB", "5120"))
+
+
+class MediaCache:
+
+    def __init__(
+        self,
+        root: str = MEDIA_CACHE_DIR,
+        max_mb: int = MEDIA_CACHE_MAX_MB,
+        enabled: bool = MEDIA_CACHE_ENABLED,
+    ):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.enabled = enabled
+
+    # ------------------------------------------------------------------
+    # PATHS
+    # ------------------------------------------------------------------
+    def _blob_path(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, "blobs", f"{digest}{ext}")
+
+    def _ref_path(self, url: str) -> str:
+        key = hashlib.sha1(url.split("?")[0].encode("utf-8")).hexdigest()
+        return os.path.join(self.root, "refs", key)
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------------
+    def put(self, url: str, data: bytes) -> Optional[str]:
+        """Store bytes published at url. Returns the blob path."""
+        if not self.enabled:
+            return None
+
+        try:
+            digest = hashlib.sha256(data).hexdigest()
+            ext = os.path.splitext(url.split("?")[0])[1] or ".bin"
+            blob = self._blob_path(digest, ext)
+
+            if not os.path.exists(blob):
+                self._atomic_write(blob, data)
+
+            self._atomic_write(self._ref_path(url), f"{digest}{ext}".encode("utf-8"))
+            self._evict()
+            return blob
+
+        except OSError:
+            logger.warning("⚠️ Media cache write failed for %s", url, exc_info=True)
+            return None
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Local blob for url, or None (caller falls back to S3)."""
+        if not self.enabled:
+            return None
+
+        try:
+            with open(self._ref_path(url), "r") as f:
+                name = f.read().strip()
+        except OSError:
+            return None
+
+        blob = os.path.join(self.root, "blobs", name)
+        if not os.path.exists(blob):
+            return None
+
+        # Touch → recently used blobs survive eviction
+        try:
+            os.utime(blob)
+        except OSError:
+            pass
+        return blob
+
+    def link_to(self, url: str, dest: str) -> bool:
+        """Materialise the cached copy of url at dest. False on a miss."""
+        blob = self.lookup(url)
+        if not blob:
+            return False
+
+        try:
+            if os.path.exists(dest):
+                os.remove(dest)
+            try:
+                os.link(blob, dest)
+            except OSError:
+                # Different filesystem / no hard links
+                shutil.copyfile(blob, dest)
+            return True
+        except OSError:
+            logger.warning("⚠️ Media cache read failed for %s", url, exc_info=True)
+            return False
+
+    # ------------------------------------------------------------------
+    # EVICTION (oldest mtime first)
+    # ------------------------------------------------------------------
+    def _evict(self):
+        # Host-wide: every worker process shares the cache directory
+        lock_fd = os.open(os.path.join(self.root, "evict.lock"), os.O_CREAT | os.O_RDWR, 0o666)
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return      # another process is evicting right now
+            self._evict_locked()
+        finally:
+            os.close(lock_fd)   # releases the flock
+
+    def _evict_locked(self):
+        blob_dir = os.path.join(self.root, "blobs")
+
+        try:
+            entries = [
+                e for e in os.scandir(blob_dir)
+                if e.is_file() and not e.name.endswith(".tmp")
+            ]
+        except OSError:
+            return
+
+        total = 0
+        sized = []
+        for e in entries:
+            try:
+                st = e.stat()
+            except OSError:
+                continue    # removed meanwhile
+            total += st.st_size
+            sized.append((st.st_mtime, st.st_size, e.path))
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(sized):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        # Dangling refs are harmless: lookup() checks the blob exists
+
+
+# Singleton
+media_cache = MediaCache()
@@ -0,0 +1,211 @@
+"""
+Cached media probe
+
+One ffprobe per file version, returning a structured MediaInfo
+(duration, fps, resolution, codecs, audio streams, bitrate).
+
+- Cached by (path, mtime, size) → the same file is never probed twice
+  across the pipeline, a rewritten file is probed again
+- Unreadable / broken files raise MediaProbeError with ffprobe's stderr
+  instead of an opaque float('') error
+"""
+
+import os
+import json
+import threading
+import subprocess
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.services.pipeline_timing import stage_span
+
+
+PROBE_CACHE_SIZE = int(os.getenv("MEDIA_PROBE_CACHE_SIZE", "256"))
+PROBE_TIMEOUT = float(os.getenv("MEDIA_PROBE_TIMEOUT", "30"))
+
+
+class MediaProbeError(Exception):
+    pass
+
+
+@dataclass
+class AudioStream:
+    codec: str
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    channel_layout: Optional[str] = None
+
+
+@dataclass
+class MediaInfo:
+    path: str
+    duration: float
+    format_name: str
+    bit_rate: Optional[int] = None
+    video_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    pix_fmt: Optional[str] = None
+    audio_streams: List[AudioStream] = field(default_factory=list)
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    @property
+    def resolution(self) -> Optional[str]:
+        if self.width and self.height:
+            return f"{self.width}x{self.height}"
+        return None
+
+    def stream_signature(self) -> tuple:
+        """Codec parameters that must match for a stream-copy concat."""
+        audio = self.audio_streams[0] if self.audio_streams else None
+        return (
+            self.video_codec,
+            self.width,
+            self.height,
+            round(self.fps or 0, 3),
+            self.pix_fmt,
+            audio.codec if audio else None,
+            audio.sample_rate if audio else None,
+            audio.channels if audio else None,
+        )
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    if not rate or rate in ("0/0", "0"):
+        return None
+    if "/" in rate:
+        num, den = rate.split("/", 1)
+        return float(num) / float(den) if float(den) else None
+    return float(rate)
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse(path: str, data: dict) -> MediaInfo:
+    fmt = data.get("format") or {}
+    streams = data.get("streams") or []
+
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+
+    # Container duration first; "N/A" (e.g. some fragmented MP4s) → stream's
+    duration = next(
+        (d for d in (fmt.get("duration"), (video or {}).get("duration"))
+         if d not in (None, "", "N/A")),
+        None,
+    )
+    if duration is None:
+        raise MediaProbeError(f"No duration in {path}")
+
+    return MediaInfo(
+        path=path,
+        duration=float(duration),
+        format_name=fmt.get("format_name", ""),
+        bit_rate=_to_int(fmt.get("bit_rate")),
+        video_codec=video.get("codec_name") if video else None,
+        width=_to_int(video.get("width")) if video else None,
+        height=_to_int(video.get("height")) if video else None,
+        # avg_frame_rate is "0/0" when ffprobe can't average it
+        fps=(_parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))) if video else None,
+        pix_fmt=video.get("pix_fmt") if video else None,
+        audio_streams=[
+            AudioStream(
+                codec=s.get("codec_name", ""),
+                sample_rate=_to_int(s.get("sample_rate")),
+                channels=_to_int(s.get("channels")),
+                channel_layout=s.get("channel_layout"),
+            )
+            for s in audio
+        ],
+    )
+
+
+class MediaProbe:
+
+    def __init__(self, max_entries: int = PROBE_CACHE_SIZE, timeout: float = PROBE_TIMEOUT):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._cache: "OrderedDict[tuple, MediaInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, path: str) -> tuple:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise MediaProbeError(f"Cannot probe {path}: {e}")
+        return (os.path.realpath(path), st.st_mtime_ns, st.st_size)
+
+    def probe(self, path: str) -> MediaInfo:
+        key = self._cache_key(path)
+
+        with self._lock:
+            info = self._cache.get(key)
+            if info is not None:
+                self._cache.move_to_end(key)
+                return info
+
+        info = self._run_ffprobe(path)
+
+        with self._lock:
+            self._cache[key] = info
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return info
+
+    def _run_ffprobe(self, path: str) -> MediaInfo:
+        with stage_span("probe"):
+            try:
+                result = subprocess.run(
+                    [
+                        "ffprobe",
+                        "-v", "error",
+                        "-show_format",
+                        "-show_streams",
+                        "-of", "json",
+                        path,
+                    ],
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout,
+                )
+            except subprocess.TimeoutExpired:
+                raise MediaProbeError(f"ffprobe timed out on {path}")
+
+            if result.returncode != 0:
+                raise MediaProbeError(
+                    f"ffprobe failed on {path}: {result.stderr.strip()[-500:]}"
+                )
+
+            try:
+                data = json.loads(result.stdout or "{}")
+            except ValueError:
+                raise MediaProbeError(f"Unreadable ffprobe output for {path}")
+
+            return _parse(path, data)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Singleton
+media_probe = MediaProbe()
+
+
+def probe_media(path: str) -> MediaInfo:
+    return media_probe.probe(path)
@@ -20,6 +20,9 @@ from io import BytesIO
 import requests
 import boto3
 
+from app.services.rate_limiter import rate_limiter
+from app.services.pipeline_timing import timed_stage
+
 
 class NanoBananaGenerator:
     """Google Nano Banana — VEO-safe Image Generator"""
@@ -77,6 +80,7 @@ class NanoBananaGenerator:
 
     # CHARACTER GENERATION (MASTER REFERENCE)
  
+    @timed_stage("character_generation")
     async def generate_character(
         self,
         campaign_id: str,
@@ -111,6 +115,8 @@ class NanoBananaGenerator:
             "- No stylization, no CGI, no AI look\n"
         )
 
+        await rate_limiter.acquire_async("nano_banana_generate")
+
         response = await asyncio.to_thread(
             self.client.models.generate_content,
             model=self.model_name,
@@ -146,6 +152,7 @@ class NanoBananaGenerator:
     # -------------------------------------------------------------
     # SCENE GENERATION (FACE + OUTFIT LOCKED)
     # -------------------------------------------------------------
+    @timed_stage("scene_image")
     async def generate_scene_with_character(
         self,
         visual_prompt: str,
@@ -220,6 +227,8 @@ class NanoBananaGenerator:
         if outfit_img:
             contents.append(outfit_img)
 
+        await rate_limiter.acquire_async("nano_banana_generate")
+
         response = await asyncio.to_thread(
         self.client.models.generate_content,
         model=self.model_name,
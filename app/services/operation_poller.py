@@ -0,0 +1,243 @@
+"""
+Shared long-running-operation poller
+
+One poller thread per worker process tracks EVERY outstanding
+operation (VEO renders) instead of one sleep/poll loop per scene.
+
+- Callers hand over an operation and await a future
+- Poll interval adapts to elapsed vs expected render time:
+    * early in the render   → sparse polls (nothing to see yet)
+    * around expected time  → tight polls (notice completion quickly)
+    * overdue               → back off gradually until the timeout
+- Expected render time is learned from completed operations (EMA)
+- Status calls run on a small fixed pool, so polling cost stays flat
+  as the number of in-flight scenes grows
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+logger = logging.getLogger("video_pipeline")
+
+
+@dataclass
+class _TrackedOperation:
+    key: int
+    operation: Any
+    future: Future
+    started_at: float
+    timeout: float
+    next_poll_at: float
+    polls: int = 0
+    failures: int = 0
+    in_flight: bool = False
+
+
+class OperationPoller:
+
+    def __init__(
+        self,
+        get_operation: Callable[[Any], Any],
+        name: str = "operations",
+        expected_seconds: float = 60.0,
+        min_interval: float = 2.0,
+        max_interval: float = 15.0,
+        workers: int = 4,
+        max_failures: int = 5,
+    ):
+        self.get_operation = get_operation
+        self.name = name
+        self.expected_seconds = expected_seconds
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.workers = workers
+        self.max_failures = max_failures
+
+        self._lock = threading.Condition()
+        self._reset()
+
+    # ------------------------------------------------------------------
+    # Fork safety (Celery prefork): threads do not survive fork,
+    # so each child lazily starts its own poller.
+    # ------------------------------------------------------------------
+    def _reset(self):
+        self._pid = os.getpid()
+        self._ops: Dict[int, _TrackedOperation] = {}
+        self._next_key = 0
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix=f"{self.name}-poll",
+            )
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"{self.name}-poller",
+                daemon=True,
+            )
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # PUBLIC API
+    # ------------------------------------------------------------------
+    def track(self, operation: Any, timeout: float = 480) -> Future:
+        """Start tracking an operation. Future resolves to the done operation."""
+        future: Future = Future()
+        now = time.monotonic()
+
+        if self._pid != os.getpid():
+            self._lock = threading.Condition()
+            self._reset()
+
+        with self._lock:
+            self._ensure_started()
+
+            key = self._next_key
+            self._next_key += 1
+
+            self._ops[key] = _TrackedOperation(
+                key=key,
+                operation=operation,
+                future=future,
+                started_at=now,
+                timeout=timeout,
+                next_poll_at=now + self._interval(0.0),
+            )
+            self._lock.notify()
+
+        return future
+
+    async def wait(self, operation: Any, timeout: float = 480) -> Any:
+        """Await the finished operation from any event loop."""
+        if getattr(operation, "done", False):
+            return operation
+        return await asyncio.wrap_future(self.track(operation, timeout))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._ops)
+
+    # ------------------------------------------------------------------
+    # ADAPTIVE INTERVAL
+    # ------------------------------------------------------------------
+    def _interval(self, elapsed: float) -> float:
+        expected = self.expected_seconds
+        window_start = 0.6 * expected
+
+        if elapsed < window_start:
+            # Sleep until the completion window opens (bounded)
+            interval = window_start - elapsed
+        elif elapsed <= 1.5 * expected:
+            interval = self.min_interval
+        else:
+            # Overdue: back off proportionally to how late we are
+            interval = self.min_interval * (elapsed / expected)
+
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _record_completion(self, duration: float):
+        # EMA of observed render time (process-local)
+        self.expected_seconds = 0.8 * self.expected_seconds + 0.2 * duration
+
+    # ------------------------------------------------------------------
+    # POLLER THREAD
+    # ------------------------------------------------------------------
+    def _run(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                due = []
+                wake_at = now + self.max_interval
+
+                for key, tracked in list(self._ops.items()):
+                    if tracked.future.cancelled():
+                        del self._ops[key]
+                        continue
+
+                    if tracked.in_flight:
+                        continue
+
+                    if now - tracked.started_at > tracked.timeout:
+                        del self._ops[key]
+                        self._resolve(tracked, exc=Exception(
+                            f"{self.name} generation timed out"
+                        ))
+                        continue
+
+                    if tracked.next_poll_at <= now:
+                        tracked.in_flight = True
+                        due.append(tracked)
+                    else:
+                        wake_at = min(wake_at, tracked.next_poll_at)
+
+                if not due:
+                    self._lock.wait(timeout=max(0.05, wake_at - now))
+                    continue
+
+            for tracked in due:
+                self._executor.submit(self._poll, tracked)
+
+    def _poll(self, tracked: _TrackedOperation):
+        try:
+            operation = self.get_operation(tracked.operation)
+            error = None
+        except Exception as e:
+            operation = None
+            error = e
+
+        now = time.monotonic()
+        elapsed = now - tracked.started_at
+
+        with self._lock:
+            tracked.in_flight = False
+            tracked.polls += 1
+
+            if error is not None:
+                tracked.failures += 1
+                if tracked.failures >= self.max_failures:
+                    self._ops.pop(tracked.key, None)
+                    self._resolve(tracked, exc=error)
+                else:
+                    tracked.next_poll_at = now + self._interval(elapsed)
+                self._lock.notify()
+                return
+
+            tracked.operation = operation
+            tracked.failures = 0
+
+            if getattr(operation, "done", False):
+                self._ops.pop(tracked.key, None)
+                self._record_completion(elapsed)
+                logger.info(
+                    "✅ %s %s done after %.0fs (%d polls)",
+                    self.name,
+                    getattr(operation, "name", "N/A"),
+                    elapsed,
+                    tracked.polls,
+                )
+                self._resolve(tracked, result=operation)
+            else:
+                tracked.next_poll_at = now + self._interval(elapsed)
+
+            self._lock.notify()
+
+    @staticmethod
+    def _resolve(tracked: _TrackedOperation, result: Any = None, exc: Exception = None):
+        try:
+            if exc is not None:
+                tracked.future.set_exception(exc)
+            else:
+                tracked.future.set_result(result)
+        except InvalidStateError:
+            # Caller cancelled in the meantime
+            pass
@@ -0,0 +1,283 @@
+"""
+Per-stage timing spans for campaign runs
+
+Every pipeline stage is recorded as one PipelineSpan row tied to
+Campaign.id / CampaignScene.id (start, end, duration, attempt, Celery
+task retries, bytes).
+
+Usage:
+    with timing_context(campaign_id, scene_id=..., scene_number=...):
+        ...
+        with stage_span("veo_download") as span:
+            data = download()
+            span.bytes_moved = len(data)
+
+The campaign / scene / attempt are carried in contextvars, so services
+that do not know the campaign (VideoMerger) still attribute their spans
+correctly — including inside asyncio tasks and asyncio.to_thread.
+Spans outside a timing_context are not persisted.
+
+Finished spans are queued and written in batches by a background thread,
+so closing a span never blocks the event loop on a database commit.
+campaign_timing entry points flush the queue before they return.
+"""
+
+import time
+import uuid
+import queue
+import logging
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+
+logger = logging.getLogger("video_pipeline")
+
+_campaign_id: ContextVar[Optional[str]] = ContextVar("timing_campaign_id", default=None)
+_scene: ContextVar[tuple] = ContextVar("timing_scene", default=(None, None))
+_attempt: ContextVar[int] = ContextVar("timing_attempt", default=1)
+_task_retries: ContextVar[int] = ContextVar("timing_task_retries", default=0)
+_span: ContextVar[Optional["Span"]] = ContextVar("timing_span", default=None)
+
+
+class Span:
+
+    def __init__(self, stage: str, scene_number: Optional[int] = None, **meta):
+        self.stage = stage
+        self.campaign_id = _campaign_id.get()
+        self.scene_id, self.scene_number = _scene.get()
+        if scene_number is not None:
+            self.scene_number = scene_number
+        self.attempt = _attempt.get()
+        self.task_retries = _task_retries.get()
+        self.bytes_moved: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.meta = dict(meta) or None
+
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        self.ended_at: Optional[datetime] = None
+        self.duration_ms: Optional[int] = None
+
+    def finish(self):
+        self.duration_ms = int((time.perf_counter() - self._start) * 1000)
+        self.ended_at = datetime.utcnow()
+
+
+@contextmanager
+def timing_context(
+    campaign_id: str,
+    scene_id: Optional[str] = None,
+    scene_number: Optional[int] = None,
+):
+    campaign_token = _campaign_id.set(campaign_id)
+    scene_token = _scene.set((scene_id, scene_number))
+    try:
+        yield
+    finally:
+        _scene.reset(scene_token)
+        _campaign_id.reset(campaign_token)
+
+
+def bind_timing_context(
+    campaign_id: str,
+    scene_id: Optional[str] = None,
+    scene_number: Optional[int] = None,
+):
+    """
+    timing_context without a block, for coroutines that own their task
+    (FastAPI endpoints): the binding ends with the request's context.
+    """
+    _campaign_id.set(campaign_id)
+    _scene.set((scene_id, scene_number))
+
+
+def bind_task_retries(retries: int):
+    """Celery retries of the running task (self.request.retries)."""
+    return _task_retries.set(retries)
+
+
+def reset_task_retries(token):
+    _task_retries.reset(token)
+
+
+@contextmanager
+def timing_attempt(attempt: int):
+    token = _attempt.set(attempt)
+    try:
+        yield
+    finally:
+        _attempt.reset(token)
+
+
+@contextmanager
+def stage_span(stage: str, scene_number: Optional[int] = None, **meta):
+    span = Span(stage, scene_number=scene_number, **meta)
+    token = _span.set(span)
+
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.error = str(e)[:1000]
+        raise
+    finally:
+        _span.reset(token)
+        span.finish()
+        _persist(span)
+
+
+def current_span() -> Optional[Span]:
+    """Innermost open stage_span in this context (None outside one)."""
+    return _span.get()
+
+
+def timed_stage(stage: str):
+    """Decorator form of stage_span (sync or async functions)."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage_span(stage, scene_number=kwargs.get("scene_number")):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_span(stage, scene_number=kwargs.get("scene_number")):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def campaign_timing(fn):
+    """Entry-point decorator: fn(campaign_id, ...) runs inside timing_context."""
+
+    @functools.wraps(fn)
+    def wrapper(campaign_id, *args, **kwargs):
+        try:
+            with timing_context(campaign_id):
+                return fn(campaign_id, *args, **kwargs)
+        finally:
+            flush_spans()
+    return wrapper
+
+
+# ------------------------------------------------------------------
+# SPAN WRITER (background thread, one commit per batch)
+# ------------------------------------------------------------------
+_pending: "queue.Queue[Span]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+
+def _persist(span: Span):
+    if not span.campaign_id:
+        return
+
+    _ensure_writer()
+    _pending.put(span)
+
+
+def flush_spans():
+    """Blocks until every queued span is written."""
+    _pending.join()
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        # Not alive in a forked Celery child → start its own
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_write_loop, name="span-writer", daemon=True)
+            _writer.start()
+
+
+def _write_loop():
+    while True:
+        batch = [_pending.get()]
+        while True:
+            try:
+                batch.append(_pending.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            _write(batch)
+        finally:
+            for _ in batch:
+                _pending.task_done()
+
+
+def _write(spans: list):
+    # Lazy import: services stay importable without a database
+    from app.database import SessionLocal
+    from app.models.campaign import PipelineSpan
+
+    db = SessionLocal()
+    try:
+        for span in spans:
+            db.add(PipelineSpan(
+                id=f"span_{uuid.uuid4().hex[:16]}",
+                campaign_id=span.campaign_id,
+                scene_id=span.scene_id,
+                scene_number=span.scene_number,
+                stage=span.stage,
+                attempt=span.attempt,
+                task_retries=span.task_retries,
+                started_at=span.started_at,
+                ended_at=span.ended_at,
+                duration_ms=span.duration_ms,
+                bytes_moved=span.bytes_moved,
+                status=span.status,
+                error=span.error,
+                meta=span.meta,
+            ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.warning("⚠️ Could not persist %d spans", len(spans), exc_info=True)
+    finally:
+        db.close()
+
+
+def summarize_spans(spans) -> dict:
+    """Per-stage breakdown for GET /campaign/{id}/timings."""
+    stages: dict = {}
+
+    for s in spans:
+        entry = stages.setdefault(s.stage, {
+            "stage": s.stage,
+            "count": 0,
+            "errors": 0,
+            "total_ms": 0,
+            "max_ms": 0,
+            "bytes_moved": 0,
+        })
+        entry["count"] += 1
+        entry["errors"] += 1 if s.status != "ok" else 0
+        entry["total_ms"] += s.duration_ms or 0
+        entry["max_ms"] = max(entry["max_ms"], s.duration_ms or 0)
+        entry["bytes_moved"] += s.bytes_moved or 0
+
+    for entry in stages.values():
+        entry["avg_ms"] = int(entry["total_ms"] / entry["count"])
+
+    wall_ms = None
+    if spans:
+        wall_ms = int(
+            (max(s.ended_at for s in spans) - min(s.started_at for s in spans))
+            .total_seconds() * 1000
+        )
+
+    return {
+        "wall_ms": wall_ms,
+        "stages": sorted(stages.values(), key=lambda e: -e["total_ms"]),
+    }
@@ -0,0 +1,202 @@
+"""
+Cluster-wide token-bucket rate limiter (Redis)
+
+Every worker shares the same buckets on the Redis instance Celery
+already uses (REDIS_URL), so provider quotas are respected across the
+whole fleet instead of being discovered through 429 responses.
+
+Buckets:
+- veo_generate          → VEO generate_videos
+- nano_banana_generate  → Nano Banana generate_content
+- elevenlabs_tts        → ElevenLabs text_to_speech
+
+Tokens are reserved atomically in a Lua script: the caller is told how
+long to wait for its token and sleeps exactly that long (FIFO-fair, one
+round trip). Wait time is logged and accumulated in Redis under
+ratelimit:metrics:<bucket>.
+
+If Redis is unreachable the limiter fails OPEN (logs + no wait) —
+generation must not stop because the limiter is down.
+
+A bucket with *_RATE_PER_MIN=0 (or below) is not limited.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import redis
+
+
+logger = logging.getLogger("video_pipeline")
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+def _bucket(prefix: str, per_minute: str, burst: str) -> Tuple[float, float]:
+    """(capacity, refill tokens per second) from env."""
+    capacity = float(os.getenv(f"{prefix}_RATE_BURST", burst))
+    rate = float(os.getenv(f"{prefix}_RATE_PER_MIN", per_minute)) / 60.0
+    return capacity, rate
+
+
+RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "veo_generate": _bucket("VEO", "10", "2"),
+    "nano_banana_generate": _bucket("NANO_BANANA", "60", "5"),
+    "elevenlabs_tts": _bucket("ELEVENLABS", "60", "4"),
+}
+
+
+def token_bucket(
+    tokens: Optional[float],
+    ts: Optional[float],
+    now: float,
+    capacity: float,
+    rate: float,
+    requested: float,
+) -> Tuple[float, float]:
+    """
+    Token-bucket step: (tokens left, seconds to wait). Missing state =
+    full bucket. Tokens may go negative — that debt is what makes later
+    callers queue behind earlier ones (FIFO).
+    Same arithmetic as _TOKEN_BUCKET_LUA; keep the two in sync.
+    """
+    if rate <= 0:
+        return capacity, 0.0
+
+    tokens = capacity if tokens is None else tokens
+    ts = now if ts is None else ts
+
+    tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+    tokens -= requested
+
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return tokens, wait
+
+
+# KEYS[1] bucket key, KEYS[2] metrics key
+# ARGV: capacity, refill/sec, tokens requested
+# Returns the wait (seconds, as string) before the reserved token is valid
+# (arithmetic mirrored by token_bucket above)
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+if rate <= 0 then
+  return '0'
+end
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+tokens = tokens - requested
+
+local wait = 0
+if tokens < 0 then
+  wait = -tokens / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 3600)
+
+redis.call('HINCRBY', KEYS[2], 'acquired', 1)
+if wait > 0 then
+  redis.call('HINCRBY', KEYS[2], 'throttled', 1)
+  redis.call('HINCRBYFLOAT', KEYS[2], 'wait_seconds_total', tostring(wait))
+end
+
+return tostring(wait)
+"""
+
+
+class RateLimiter:
+    """Shared token buckets for external generation APIs."""
+
+    def __init__(self, redis_url: str = REDIS_URL, limits: Dict[str, Tuple[float, float]] = None):
+        self.redis_url = redis_url
+        self.limits = limits or RATE_LIMITS
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        self._redis = None
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            self._redis = redis.Redis.from_url(
+                self.redis_url,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+            self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        return self._script
+
+    # ------------------------------------------------------------------
+    # RESERVE A TOKEN → seconds to wait
+    # ------------------------------------------------------------------
+    def _reserve(self, bucket: str, tokens: int) -> float:
+        if not self.enabled:
+            return 0.0
+
+        if bucket not in self.limits:
+            raise ValueError(f"Unknown rate limit bucket: {bucket}")
+
+        capacity, rate = self.limits[bucket]
+        if rate <= 0:
+            # RATE_PER_MIN=0 → unlimited (and no division by zero)
+            return 0.0
+
+        try:
+            wait = self._get_script()(
+                keys=[f"ratelimit:bucket:{bucket}", f"ratelimit:metrics:{bucket}"],
+                args=[capacity, rate, tokens],
+            )
+            return float(wait)
+        except redis.RedisError:
+            logger.warning("⚠️ Rate limiter unavailable, bucket %s not enforced", bucket)
+            return 0.0
+
+    def _report(self, bucket: str, wait: float):
+        if wait > 0:
+            logger.info("⏳ Rate limit %s: waited %.2fs for a token", bucket, wait)
+
+    def acquire(self, bucket: str, tokens: int = 1) -> float:
+        """Blocking acquire. Returns seconds waited."""
+        wait = self._reserve(bucket, tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self._report(bucket, wait)
+        return wait
+
+    async def acquire_async(self, bucket: str, tokens: int = 1) -> float:
+        """Async acquire (Redis call in a thread). Returns seconds waited."""
+        wait = await asyncio.to_thread(self._reserve, bucket, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._report(bucket, wait)
+        return wait
+
+    # ------------------------------------------------------------------
+    # METRICS
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """acquired / throttled / wait_seconds_total per bucket."""
+        result = {}
+        self._get_script()
+
+        for bucket in self.limits:
+            raw = self._redis.hgetall(f"ratelimit:metrics:{bucket}")
+            result[bucket] = {
+                k.decode(): float(v) for k, v in raw.items()
+            }
+        return result
+
+
+# Singleton
+rate_limiter = RateLimiter()
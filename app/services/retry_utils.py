@@ -1,5 +1,7 @@
 import asyncio
 
+from app.services.pipeline_timing import timing_attempt
+
 
 async def generate_video_with_retries(
     generator,
@@ -18,15 +20,16 @@ async def generate_video_with_retries(
 
     for attempt in range(1, retries + 1):
         try:
-            return await generator.generate_video_with_text(
-                scene_image_url=scene_image_url,
-                motion_prompt=motion_prompt,
-                text_overlays=text_overlays,
-                campaign_id=campaign_id,
-                scene_number=scene_number,
-                business_info=business_info,
-                product_type=product_type,
-            )
+            with timing_attempt(attempt):
+                return await generator.generate_video_with_text(
+                    scene_image_url=scene_image_url,
+                    motion_prompt=motion_prompt,
+                    text_overlays=text_overlays,
+                    campaign_id=campaign_id,
+                    scene_number=scene_number,
+                    business_info=business_info,
+                    product_type=product_type,
+                )
 
         except Exception as e:
             last_exc = e
@@ -1,28 +1,182 @@
 import os
+import threading
 import boto3
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
 
-def upload_to_s3(local_path: str) -> str:
+_s3_client = None
+
+# Streaming multipart uploads (S3 minimum part size is 5 MB)
+S3_MULTIPART_PART_MB = max(5, int(os.getenv("S3_MULTIPART_PART_MB", "8")))
+S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", "4"))
+
+
+def get_s3_client():
+    """Shared boto3 client (created once per process)."""
+    global _s3_client
+
+    if _s3_client is None:
+        _s3_client = boto3.client(
+            "s3",
+            endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+            region_name=os.getenv("AWS_REGION"),
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        )
+    return _s3_client
+
+
+def build_s3_url(key: str) -> str:
     s3_bucket = os.getenv("S3_CAMPAIGN_BUCKET", "ai-images-2")
     s3_region = os.getenv("AWS_REGION")
 
-    s3_client = boto3.client(
-        "s3",
-        region_name=s3_region,
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    )
+    # CDN / MinIO / local stand-in
+    public_base = os.getenv("S3_PUBLIC_BASE_URL")
+    if public_base:
+        return f"{public_base.rstrip('/')}/{key}"
 
-    filename = os.path.basename(local_path)
-    key = f"campaigns/videos/{filename}"
+    if s3_region:
+        return f"https://{s3_bucket}.s3.{s3_region}.amazonaws.com/{key}"
+    return f"https://{s3_bucket}.s3.amazonaws.com/{key}"
 
-    s3_client.upload_file(
+
+def upload_to_s3(
+    local_path: str,
+    key: str | None = None,
+    content_type: str = "video/mp4",
+) -> str:
+    s3_bucket = os.getenv("S3_CAMPAIGN_BUCKET", "ai-images-2")
+
+    if key is None:
+        filename = os.path.basename(local_path)
+        key = f"campaigns/videos/{filename}"
+
+    get_s3_client().upload_file(
         local_path,
         s3_bucket,
         key,
-        ExtraArgs={"ContentType": "video/mp4"},
+        ExtraArgs={"ContentType": content_type},
     )
 
-    if s3_region:
-        return f"https://{s3_bucket}.s3.{s3_region}.amazonaws.com/{key}"
-    return f"https://{s3_bucket}.s3.amazonaws.com/{key}"
+    return build_s3_url(key)
+
+
+def s3_object_exists(key: str) -> bool:
+    s3_bucket = os.getenv("S3_CAMPAIGN_BUCKET", "ai-images-2")
+
+    try:
+        get_s3_client().head_object(Bucket=s3_bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+class MultipartStreamUpload:
+    """
+    Uploads a stream of unknown length (e.g. ffmpeg stdout) as S3
+    multipart parts while it is still being produced.
+
+    Memory stays bounded: at most `concurrency` parts in flight plus
+    the one being filled. Nothing touches the local disk.
+
+        upload = MultipartStreamUpload(key)
+        try:
+            upload.write_from(proc.stdout)
+            url = upload.complete()
+        except Exception:
+            upload.abort()
+            raise
+    """
+
+    def __init__(
+        self,
+        key: str,
+        content_type: str = "video/mp4",
+        part_mb: int = S3_MULTIPART_PART_MB,
+        concurrency: int = S3_MULTIPART_CONCURRENCY,
+    ):
+        self.bucket = os.getenv("S3_CAMPAIGN_BUCKET", "ai-images-2")
+        self.key = key
+        self.part_size = part_mb * 1024 * 1024
+        self.concurrency = max(1, concurrency)
+        self.bytes_sent = 0
+
+        self._client = get_s3_client()
+        self._upload_id = self._client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+        self._parts = []
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+
+    def _read_part(self, stream) -> bytes:
+        # Pipes return short reads → fill the part or hit EOF
+        chunks, size = [], 0
+        while size < self.part_size:
+            chunk = stream.read(self.part_size - size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks)
+
+    def _upload_part(self, number: int, data: bytes) -> dict:
+        try:
+            response = self._client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                PartNumber=number,
+                Body=data,
+            )
+            return {"PartNumber": number, "ETag": response["ETag"]}
+        finally:
+            self._slots.release()
+
+    def write_from(self, stream) -> int:
+        """Pumps stream to S3 until EOF. Returns the bytes uploaded."""
+        futures = []
+
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="s3_part"
+        ) as pool:
+            number = 1
+            while True:
+                data = self._read_part(stream)
+                if not data and number > 1:
+                    break
+
+                self._slots.acquire()
+                futures.append(pool.submit(self._upload_part, number, data))
+                self.bytes_sent += len(data)
+                number += 1
+
+                if len(data) < self.part_size:
+                    break
+
+                failed = [f for f in futures if f.done() and f.exception()]
+                if failed:
+                    break
+
+        # result() → re-raise the first failed part
+        self._parts = [f.result() for f in futures]
+        return self.bytes_sent
+
+    def complete(self) -> str:
+        self._client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        return build_s3_url(self.key)
+
+    def abort(self):
+        try:
+            self._client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+        except ClientError:
+            pass
@@ -0,0 +1,45 @@
+"""
+S3 keys of saved mezzanine segments (distributed merge)
+
+A segment is reused whenever its key already exists on S3, so the key
+must change with anything that changes the encoded bytes.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+from app.services.video_merger import FADE_DURATION
+from app.constants.encoding_profiles import MEZZANINE_SPEC, get_encoding_profile
+
+
+# Bump when the mezzanine encode changes → old segments stop matching
+SEGMENT_CACHE_VERSION = "1"
+
+
+def segment_s3_key(
+    campaign_id: str,
+    scene_result: dict,
+    index: int,
+    total: int,
+    encoding_profile: Optional[str] = None,
+) -> str:
+    # Video / voice URLs carry a digest of their content (VEO upload key,
+    # narration key) → a re-rendered scene gets a new URL and so a new
+    # segment; index + total decide the fades
+    digest = hashlib.sha1(
+        "|".join([
+            SEGMENT_CACHE_VERSION,
+            scene_result["video_url"],
+            scene_result["voice_url"],
+            f"{index}/{total}",
+            str(FADE_DURATION),
+            json.dumps(MEZZANINE_SPEC, sort_keys=True),
+            json.dumps(get_encoding_profile(encoding_profile), sort_keys=True),
+        ]).encode("utf-8")
+    ).hexdigest()[:16]
+
+    return (
+        f"campaigns/segments/{campaign_id}/"
+        f"scene_{scene_result['scene_number']}_{digest}.mp4"
+    )
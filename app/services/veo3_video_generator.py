@@ -3,6 +3,7 @@ from google.genai import types
 import os
 import time
 import asyncio
+import hashlib
 from typing import Optional, Dict
 import boto3
 from botocore.config import Config
@@ -10,6 +11,11 @@ import io
 from PIL import Image as PILImage
 from urllib.parse import urlparse
 
+from app.services.rate_limiter import rate_limiter
+from app.services.operation_poller import OperationPoller
+from app.services.pipeline_timing import stage_span
+from app.services.media_cache import media_cache
+
 
 class VEO3VideoGenerator:
 
@@ -32,6 +38,16 @@ class VEO3VideoGenerator:
             config=Config(signature_version="s3v4"),
         )
 
+        # One shared poller per worker process for every VEO operation
+        self.poller = OperationPoller(
+            self.client.operations.get,
+            name="VEO",
+            expected_seconds=float(os.getenv("VEO_EXPECTED_RENDER_SECONDS", "75")),
+            min_interval=float(os.getenv("VEO_POLL_MIN_INTERVAL", "3")),
+            max_interval=float(os.getenv("VEO_POLL_MAX_INTERVAL", "20")),
+            workers=int(os.getenv("VEO_POLL_WORKERS", "4")),
+        )
+
         print(" VEO 3.1 Generator Loaded — RAW IMAGE BYTES MODE")
 
     # ------------------------------------------------------------------
@@ -86,8 +102,12 @@ class VEO3VideoGenerator:
 
         print(f" Corrected S3 Key: {s3_key}")
 
-        #  KEY CHANGE: load bytes, not URL
-        image_bytes = self._get_image_bytes_from_s3(s3_key)
+        #  KEY CHANGE: load bytes, not URL (blocking S3 + PIL → thread)
+        with stage_span("s3_fetch_resize", scene_number=scene_number) as span:
+            image_bytes = await asyncio.to_thread(
+                self._get_image_bytes_from_s3, s3_key
+            )
+            span.bytes_moved = len(image_bytes)
 
         reference_image = types.VideoGenerationReferenceImage(
             image=types.Image(
@@ -103,28 +123,27 @@ class VEO3VideoGenerator:
             business_info
         )
 
-        operation = await asyncio.to_thread(
-            self.client.models.generate_videos,
-            model=self.model_name,
-            prompt=final_prompt,
-            config=types.GenerateVideosConfig(
-                reference_images=[reference_image],
-                aspect_ratio="16:9",
-            ),
-        )
+        with stage_span("veo_submit", scene_number=scene_number) as span:
+            # Cluster-wide quota guard (shared Redis bucket)
+            waited = await rate_limiter.acquire_async("veo_generate")
+            span.meta = {"rate_limit_wait_s": round(waited, 3)}
+
+            operation = await asyncio.to_thread(
+                self.client.models.generate_videos,
+                model=self.model_name,
+                prompt=final_prompt,
+                config=types.GenerateVideosConfig(
+                    reference_images=[reference_image],
+                    aspect_ratio="16:9",
+                ),
+            )
 
         print(" Operation started:", getattr(operation, "name", "N/A"))
 
         start = time.time()
-        while not operation.done:
-            elapsed = int(time.time() - start)
-            print(f"   [{elapsed}s] VEO generating...")
-            await asyncio.sleep(10)
-            operation = await asyncio.to_thread(
-                self.client.operations.get, operation
-            )
-            if elapsed > 480:
-                raise Exception("VEO generation timed out")
+        with stage_span("veo_wait", scene_number=scene_number):
+            operation = await self.poller.wait(operation, timeout=480)
+        print(f"   [{int(time.time() - start)}s] VEO operation finished")
 
         if getattr(operation, "error", None):
             raise Exception(f"VEO Error: {operation.error}")
@@ -142,14 +161,21 @@ class VEO3VideoGenerator:
             raise Exception("No videos generated")
 
         video_obj = videos[0].video
-        video_bytes = await asyncio.to_thread(
-            self.client.files.download,
-            file=video_obj
-        )
+        with stage_span("veo_download", scene_number=scene_number) as span:
+            video_bytes = await asyncio.to_thread(
+                self.client.files.download,
+                file=video_obj
+            )
+            span.bytes_moved = len(video_bytes)
 
-        url = await self._upload_to_s3(
-            video_bytes, campaign_id, scene_number, product_type
-        )
+        with stage_span("s3_upload", scene_number=scene_number) as span:
+            url = await self._upload_to_s3(
+                video_bytes, campaign_id, scene_number, product_type
+            )
+            span.bytes_moved = len(video_bytes)
+
+        # Keep a local copy → the merge on this host skips the S3 download
+        await asyncio.to_thread(media_cache.put, url, video_bytes)
 
         print(" VIDEO READY →", url)
         return url
@@ -182,12 +208,16 @@ class VEO3VideoGenerator:
         return " ".join(parts)
 
     # ------------------------------------------------------------------
-    # S3 VIDEO UPLOAD (UNCHANGED)
+    # S3 VIDEO UPLOAD
+    # Content digest in the key → every render gets its own URL, so
+    # anything keyed by the URL (media cache, merge segments) never
+    # serves an earlier render of the same scene
     # ------------------------------------------------------------------
     async def _upload_to_s3(
         self, video_bytes, campaign_id, scene_number, product_type
     ):
-        key = f"campaigns/{product_type}/{campaign_id}/scene_{scene_number}_video.mp4"
+        digest = hashlib.sha256(video_bytes).hexdigest()[:16]
+        key = f"campaigns/{product_type}/{campaign_id}/scene_{scene_number}_{digest}_video.mp4"
 
         await asyncio.to_thread(
             self.s3_client.put_object,
@@ -1,9 +1,82 @@
 import os
+import json
 import tempfile
-import subprocess
+import math
+import uuid
+import logging
 import requests
 import shutil
-from typing import List, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.services.pipeline_timing import stage_span, timed_stage
+from app.services.media_probe import AudioStream, MediaInfo, MediaProbeError, probe_media
+from app.constants.encoding_profiles import (
+    MEZZANINE_SPEC,
+    PREVIEW_SETTINGS,
+    RENDITIONS,
+    VIDEO_PREVIEWS,
+    get_encoding_profile,
+    get_rendition,
+)
+from app.services.media_cache import media_cache
+from app.services.s3_service import MultipartStreamUpload
+from app.services.ffmpeg_runner import (
+    FFMPEG_ENCODE_TIMEOUT,
+    FFMPEG_STREAM_STALL_TIMEOUT,
+    run_ffmpeg,
+)
+from app.services.cpu_slots import cpu_slots, granted_threads
+
+
+logger = logging.getLogger("video_pipeline")
+
+# ------------------------------------------------------------------
+# Merge engine
+# filtergraph → one ffmpeg run: fades + voice pad/trim + concat in a
+#               single filter_complex, encoded exactly once
+# legacy      → per-scene fit/strip/mux/fade files + re-encoding concat
+# ------------------------------------------------------------------
+MERGE_ENGINE = os.getenv("MERGE_ENGINE", "filtergraph").lower()
+
+# ------------------------------------------------------------------
+# Job workspaces
+# Every merge writes its intermediates into its own directory under
+# MERGE_WORK_ROOT, removed as a whole when the job ends — concurrent
+# merges on one host never share file names.
+# ------------------------------------------------------------------
+MERGE_WORK_ROOT = os.getenv("MERGE_WORK_ROOT", tempfile.gettempdir())
+MERGE_MIN_FREE_MB = int(os.getenv("MERGE_MIN_FREE_MB", "2048"))
+
+_current_workspace: ContextVar[Optional[str]] = ContextVar("merge_workspace", default=None)
+
+# Scenes preprocessed in parallel (download / probe / fit / mux / fade).
+# ffmpeg runs outside the GIL, so threads are enough.
+MERGE_PREP_WORKERS = int(os.getenv("MERGE_PREP_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Stream the single-pass master (fragmented MP4) straight into an S3
+# multipart upload while encoding — no full-size file on local disk
+MERGE_STREAM_UPLOAD = os.getenv("MERGE_STREAM_UPLOAD", "false").lower() == "true"
+
+# Fragmented MP4: moov up front, playable while parts are still arriving
+STREAM_MOVFLAGS = "frag_keyframe+empty_moov+default_base_moof"
+
+FADE_DURATION = 0.7
+AUDIO_FORMAT = "aformat=sample_fmts=fltp:sample_rates=44100:channel_layouts=stereo"
+
+
+@dataclass
+class SceneInput:
+    """Local inputs of one scene for the single-pass engine."""
+    video_path: str
+    voice_path: str
+    duration: float
+    info: Optional[MediaInfo] = None
+    temp_files: List[str] = field(default_factory=list)
 
 
 class VideoMerger:
@@ -11,10 +84,103 @@ class VideoMerger:
     VideoMerger
     - Uses local temp files ONLY because FFmpeg requires them
     - Guarantees cleanup after processing
-    - No database
+    - No database (stage timings go through pipeline_timing)
     - No image persistence
     """
 
+    def __init__(
+        self,
+        engine: str = MERGE_ENGINE,
+        work_root: str = MERGE_WORK_ROOT,
+        prep_workers: int = MERGE_PREP_WORKERS,
+        previews: bool = VIDEO_PREVIEWS,
+        stream_upload: bool = MERGE_STREAM_UPLOAD,
+    ):
+        self.engine = engine
+        self.work_root = work_root
+        self.prep_workers = max(1, prep_workers)
+        self.previews = previews
+        self.stream_upload = stream_upload
+
+
+    #  JOB WORKSPACE
+
+    def _check_disk_space(self):
+        os.makedirs(self.work_root, exist_ok=True)
+        free_mb = shutil.disk_usage(self.work_root).free // (1024 * 1024)
+        if free_mb < MERGE_MIN_FREE_MB:
+            raise RuntimeError(
+                f"Not enough disk space in {self.work_root}: "
+                f"{free_mb} MB free, {MERGE_MIN_FREE_MB} MB required"
+            )
+
+    @contextmanager
+    def workspace(self, campaign_id: str):
+        """
+        Job-scoped scratch directory for everything the merge (and TTS)
+        writes. Nested calls reuse the outer workspace. Removed on exit.
+        """
+        if _current_workspace.get():
+            yield _current_workspace.get()
+            return
+
+        self._check_disk_space()
+        path = tempfile.mkdtemp(prefix=f"merge_{campaign_id}_", dir=self.work_root)
+        token = _current_workspace.set(path)
+
+        try:
+            yield path
+        finally:
+            _current_workspace.reset(token)
+            shutil.rmtree(path, ignore_errors=True)
+
+    def workspace_dir(self) -> Optional[str]:
+        """Active job workspace (None outside video_merger.workspace)."""
+        return _current_workspace.get()
+
+    def _temp_path(self, name: str) -> str:
+        workspace = _current_workspace.get()
+        if workspace:
+            return os.path.join(workspace, name)
+        # No workspace: still never collide with another job
+        return os.path.join(tempfile.gettempdir(), f"{uuid.uuid4().hex[:8]}_{name}")
+
+    def _output_path(self, campaign_id: str, output_name: str) -> str:
+        # Final file outlives the workspace (publish may run in another task)
+        return os.path.join(
+            self.work_root, f"{campaign_id}_{uuid.uuid4().hex[:8]}_{output_name}"
+        )
+
+
+    #  ENCODER ARGS (see constants/encoding_profiles)
+
+    def _encoder_args(self, profile: Optional[str] = None, faststart: bool = True) -> List[str]:
+        p = get_encoding_profile(profile)
+        # Host CPU grant (cpu_slots) wins over the profile's thread count
+        threads = granted_threads() or p["threads"]
+
+        args = [
+            "-c:v", "libx264",
+            "-preset", p["preset"],
+            "-crf", str(p["crf"]),
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-b:a", p["audio_bitrate"],
+        ]
+        if threads:
+            args += ["-threads", str(threads)]
+        if faststart:
+            args += ["-movflags", "+faststart"]
+        return args
+
+    def _can_stream_copy(self, paths: List[str]) -> bool:
+        """True when every file shares codec parameters (concat -c copy safe)."""
+        try:
+            signatures = {self.probe(p).stream_signature() for p in paths}
+        except MediaProbeError:
+            return False
+        return len(signatures) == 1 and next(iter(signatures))[0] is not None
+
   
     #  SAFE DELETE
    
@@ -25,81 +191,90 @@ class VideoMerger:
         except Exception:
             pass
 
+    def discard(self, path: Optional[str]):
+        """Delete one file the merger handed out (voice, rendition, preview)."""
+        self._safe_remove(path)
+
+
+    #  PROBE (cached per file version, see media_probe)
+
+    def probe(self, path: str) -> MediaInfo:
+        return probe_media(path)
 
-    #  GET VIDEO DURATION
-  
     def get_video_duration(self, video_path: str) -> float:
-        result = subprocess.run(
-            [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                video_path
-            ],
-            capture_output=True,
-            text=True
-        )
-        return float(result.stdout.strip())
+        return self.probe(video_path).duration
 
    
     #  FIT AUDIO TO VIDEO DURATION
 
+    @timed_stage("fit")
     def fit_audio_to_duration(self, audio_path: str, duration: float) -> str:
-        temp_dir = tempfile.gettempdir()
-        output = os.path.join(temp_dir, f"fit_{os.path.basename(audio_path)}")
+        output = self._temp_path(f"fit_{os.path.basename(audio_path)}")
 
-        subprocess.run(
+        run_ffmpeg(
             [
-                "ffmpeg", "-y",
                 "-i", audio_path,
                 "-af", f"apad=pad_dur={duration}",
                 "-t", str(duration),
                 output
             ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            step="fit",
+            duration=duration,
         )
         return output
 
   
-    #  DOWNLOAD VIDEO (URL → TEMP FILE)
-   
-    def _download_video(self, source: str, index: int) -> str:
-        temp_dir = tempfile.gettempdir()
-        local_path = os.path.join(temp_dir, f"scene_{index}.mp4")
+    #  DOWNLOAD (URL / LOCAL PATH → TEMP FILE)
 
-        if source.startswith("http://") or source.startswith("https://"):
-            r = requests.get(source, stream=True, timeout=30)
-            r.raise_for_status()
-            with open(local_path, "wb") as f:
-                for chunk in r.iter_content(8192):
-                    f.write(chunk)
-        else:
-            if not os.path.exists(source):
-                raise FileNotFoundError(source)
-            shutil.copy(source, local_path)
+    def _download(self, source: str, local_path: str) -> str:
+        with stage_span("download") as span:
+            if media_cache.link_to(source, local_path):
+                # Produced on this host → no S3 round-trip
+                span.meta = {"cache": "hit"}
+            elif source.startswith("http://") or source.startswith("https://"):
+                r = requests.get(source, stream=True, timeout=30)
+                r.raise_for_status()
+                with open(local_path, "wb") as f:
+                    for chunk in r.iter_content(8192):
+                        f.write(chunk)
+            else:
+                if not os.path.exists(source):
+                    raise FileNotFoundError(source)
+                shutil.copy(source, local_path)
+
+            span.bytes_moved = os.path.getsize(local_path)
 
         return local_path
 
+    def _download_video(self, source: str, index: int) -> str:
+        return self._download(source, self._temp_path(f"scene_{index}.mp4"))
+
+    #  VOICE SOURCE (S3 URL → TEMP FILE, local path as-is)
+
+    def _resolve_voice(self, source: str, index: int) -> tuple[str, bool]:
+        """Returns (local_path, is_temp_copy)."""
+        if source.startswith("http://") or source.startswith("https://"):
+            ext = os.path.splitext(source.split("?")[0])[1] or ".mp3"
+            local_path = self._temp_path(f"voice_scene_{index}{ext}")
+            return self._download(source, local_path), True
+        return source, False
+
  
     #  REMOVE ORIGINAL AUDIO
   
+    @timed_stage("strip")
     def strip_audio(self, input_video: str) -> str:
-        output = os.path.join(
-            tempfile.gettempdir(),
-            f"silent_{os.path.basename(input_video)}"
-        )
+        output = self._temp_path(f"silent_{os.path.basename(input_video)}")
 
-        subprocess.run(
-            ["ffmpeg", "-y", "-i", input_video, "-map", "0:v", "-c:v", "copy", "-an", output],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+        run_ffmpeg(
+            ["-i", input_video, "-map", "0:v", "-c:v", "copy", "-an", output],
+            step="strip",
         )
         return output
 
     #  ADD VOICE (OPTIONAL MUSIC)
 
+    @timed_stage("mux")
     def add_voice_and_music(
         self,
         silent_video: str,
@@ -108,10 +283,7 @@ class VideoMerger:
         music_volume: float = 0.2
     ) -> str:
 
-        output = os.path.join(
-            tempfile.gettempdir(),
-            f"vo_{os.path.basename(silent_video)}"
-        )
+        output = self._temp_path(f"vo_{os.path.basename(silent_video)}")
 
         if music_path:
             filter_complex = (
@@ -120,7 +292,6 @@ class VideoMerger:
                 f"[a1][a2]amix=inputs=2:duration=shortest[a]"
             )
             cmd = [
-                "ffmpeg", "-y",
                 "-i", silent_video,
                 "-i", voice_path,
                 "-i", music_path,
@@ -133,7 +304,6 @@ class VideoMerger:
             ]
         else:
             cmd = [
-                "ffmpeg", "-y",
                 "-i", silent_video,
                 "-i", voice_path,
                 "-map", "0:v",
@@ -143,14 +313,386 @@ class VideoMerger:
                 output
             ]
 
-        subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        run_ffmpeg(cmd, step="mux")
+        return output
+
+
+    #  SINGLE-PASS MERGE (filtergraph engine)
+    #  inputs: [0..N-1] scene videos, [N..2N-1] voices, [2N] music
+
+    @staticmethod
+    def _fade_filters(duration: float, fade_in: bool, fade_out: bool) -> Tuple[List[str], List[str]]:
+        vf, af = [], []
+        if fade_in:
+            vf.append(f"fade=t=in:st=0:d={FADE_DURATION}")
+            af.append(f"afade=t=in:st=0:d={FADE_DURATION}")
+        if fade_out:
+            vf.append(f"fade=t=out:st={duration - FADE_DURATION}:d={FADE_DURATION}")
+            af.append(f"afade=t=out:st={duration - FADE_DURATION}:d={FADE_DURATION}")
+        return vf, af
+
+    def _build_filtergraph(self, scenes: List[SceneInput], music_volume: Optional[float]) -> str:
+        n = len(scenes)
+        parts = []
+        labels = []
+        target = scenes[0].info
+
+        for i, scene in enumerate(scenes):
+            d = scene.duration
+            vf = ["setpts=PTS-STARTPTS", "format=yuv420p", "setsar=1"]
+
+            # concat needs one resolution — only rescale scenes that differ
+            if target and scene.info and target.resolution and scene.info.resolution != target.resolution:
+                vf.insert(1, f"scale={target.width}:{target.height}")
+            af = [
+                AUDIO_FORMAT,
+                f"apad=whole_dur={d}",
+                f"atrim=end={d}",
+                "asetpts=PTS-STARTPTS",
+            ]
+
+            fade_vf, fade_af = self._fade_filters(d, i != 0, i != n - 1)
+            vf += fade_vf
+            af += fade_af
+
+            parts.append(f"[{i}:v]{','.join(vf)}[v{i}]")
+            parts.append(f"[{n + i}:a]{','.join(af)}[a{i}]")
+            labels.append(f"[v{i}][a{i}]")
+
+        concat_audio = "[aout]" if music_volume is None else "[acat]"
+        parts.append(f"{''.join(labels)}concat=n={n}:v=1:a=1[vout]{concat_audio}")
+
+        if music_volume is not None:
+            parts.append(f"[{2 * n}:a]{AUDIO_FORMAT},volume={music_volume}[mus]")
+            parts.append("[acat][mus]amix=inputs=2:duration=first:dropout_transition=0[aout]")
+
+        return ";".join(parts)
+
+    def render_single_pass(
+        self,
+        scenes: List[SceneInput],
+        campaign_id: str,
+        output_name: str,
+        background_music: Optional[str] = None,
+        music_volume: float = 0.2,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+        stream_upload: Optional[bool] = None,
+    ) -> str:
+        """
+        Fades, voice fit, concat (+ music) in one ffmpeg run, one encode.
+        Renditions and previews branch off the same decoded timeline
+        (see rendition_paths / preview_paths).
+        stream_upload → the master goes to S3 during the encode and is
+        never written locally (see stream_manifest).
+        """
+        output = self._output_path(campaign_id, output_name)
+        duration = sum(sc.duration for sc in scenes)
+        if stream_upload is None:
+            stream_upload = self.stream_upload
+
+        cmd = []
+        for scene in scenes:
+            cmd += ["-i", scene.video_path]
+        for scene in scenes:
+            cmd += ["-i", scene.voice_path]
+        if background_music:
+            cmd += ["-i", background_music]
+
+        graph = self._build_filtergraph(scenes, music_volume if background_music else None)
+
+        try:
+            # One host CPU grant for the whole encode → -threads on every output
+            with cpu_slots.acquire():
+                if renditions or self.previews:
+                    split_parts, outputs = self._derived_graph(
+                        "[vout]", "[aout]", output, duration,
+                        renditions, self.previews, profile, include_master=True,
+                    )
+                    graph = ";".join([graph, *split_parts])
+                else:
+                    outputs = [["-map", "[vout]", "-map", "[aout]", *self._encoder_args(profile), output]]
+
+                if stream_upload:
+                    # Master is always outputs[0]: swap its file for stdout
+                    # (+faststart needs a seekable file)
+                    master = outputs[0][:-1]
+                    if "+faststart" in master:
+                        i = master.index("+faststart")
+                        del master[i - 1:i + 1]
+                    outputs[0] = [*master, "-movflags", STREAM_MOVFLAGS, "-f", "mp4", "pipe:1"]
+
+                cmd += ["-filter_complex", graph]
+                for args in outputs:
+                    cmd += args
+
+                if stream_upload:
+                    return self._encode_streaming(cmd, output, outputs[1:], duration, len(scenes))
+
+                with stage_span("encode", engine="filtergraph", segments=len(scenes), outputs=len(outputs)) as span:
+                    run_ffmpeg(cmd, step="encode", duration=duration, timeout=FFMPEG_ENCODE_TIMEOUT)
+                    span.bytes_moved = sum(
+                        os.path.getsize(args[-1]) for args in outputs if os.path.exists(args[-1])
+                    )
+        except BaseException:
+            # Partial master / renditions / previews sit outside the workspace
+            self.discard_outputs(output)
+            raise
+
+        return output
+
+
+    #  STREAMING MASTER (ffmpeg stdout → S3 multipart)
+    #  The master never exists on disk; a small manifest next to where
+    #  it would have been tells the publish step where it went.
+
+    def discard_outputs(self, master_path: str):
+        """Master + everything written next to it (outside any workspace)."""
+        self._safe_remove(master_path)
+        self._safe_remove(self.stream_manifest_path(master_path))
+        self._discard_derivatives(master_path)
+
+    def _discard_derivatives(self, master_path: str):
+        for path in (
+            *self.rendition_paths(master_path, list(RENDITIONS)).values(),
+            *self.preview_paths(master_path).values(),
+        ):
+            self._safe_remove(path)
+
+    def stream_manifest_path(self, master_path: str) -> str:
+        return f"{master_path}.stream.json"
+
+    def stream_manifest(self, master_path: str) -> Optional[dict]:
+        """{"url", "bytes", "duration"} if master_path was streamed to S3."""
+        try:
+            with open(self.stream_manifest_path(master_path)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _encode_streaming(
+        self,
+        cmd: List[str],
+        output: str,
+        side_outputs: List[List[str]],
+        duration: float,
+        segments: int,
+    ) -> str:
+        key = f"campaigns/videos/{os.path.basename(output)}"
+
+        with stage_span("encode", engine="filtergraph", segments=segments,
+                        outputs=len(side_outputs) + 1, streamed=True) as span:
+            upload = MultipartStreamUpload(key)
+
+            try:
+                # ffmpeg blocks on stdout while S3 parts are in flight
+                sent = run_ffmpeg(
+                    cmd, step="encode", duration=duration,
+                    timeout=FFMPEG_ENCODE_TIMEOUT,
+                    stall_timeout=FFMPEG_STREAM_STALL_TIMEOUT,
+                    stdout_consumer=upload.write_from,
+                ).stdout_result
+                url = upload.complete()
+            except BaseException:
+                upload.abort()
+                raise
+
+            span.bytes_moved = sent + sum(
+                os.path.getsize(args[-1]) for args in side_outputs if os.path.exists(args[-1])
+            )
+
+        with open(self.stream_manifest_path(output), "w") as f:
+            json.dump({"url": url, "bytes": sent, "duration": duration}, f)
+
+        logger.info("📡 Master streamed to S3 (%d KB)", sent // 1024)
         return output
 
 
+    #  DERIVED OUTPUTS FROM ONE DECODE
+    #  The assembled timeline is split into: master (single-pass only),
+    #  aspect-ratio renditions, poster JPEG, thumbnail sprite, preview loop.
+    #  Files sit next to the master: <master>.<name>.<ext>
+
+    def rendition_paths(self, master_path: str, renditions: Optional[List[str]]) -> Dict[str, str]:
+        base, ext = os.path.splitext(master_path)
+        return {name: f"{base}.{name}{ext}" for name in (renditions or [])}
+
+    def preview_paths(self, master_path: str) -> Dict[str, str]:
+        base, _ = os.path.splitext(master_path)
+        return {
+            "poster": f"{base}.poster.jpg",
+            "sprite": f"{base}.sprite.jpg",
+            "preview": f"{base}.preview.mp4",
+        }
+
+    def sprite_layout(self, duration: float) -> dict:
+        """Grid of the thumbnail sprite for a timeline of this duration."""
+        cfg = PREVIEW_SETTINGS
+        frames = max(1, math.ceil(duration / cfg["sprite_interval"]))
+        columns = min(cfg["sprite_columns"], frames)
+        return {
+            "interval": cfg["sprite_interval"],
+            "columns": columns,
+            "rows": math.ceil(frames / columns),
+            "tile_width": cfg["sprite_width"],
+            "frames": frames,
+        }
+
+    def _derived_graph(
+        self,
+        video_in: str,
+        audio_in: Optional[str],
+        master_path: str,
+        duration: float,
+        renditions: Optional[List[str]],
+        previews: bool,
+        profile: Optional[str],
+        include_master: bool,
+    ) -> Tuple[List[str], List[List[str]]]:
+        """
+        Returns (filter parts, ffmpeg output args per output).
+        audio_in None → the input's own audio is mapped ("0:a?").
+        """
+        renditions = renditions or []
+        parts: List[str] = []
+        outputs: List[List[str]] = []
+
+        video_branches = (1 if include_master else 0) + len(renditions) + (3 if previews else 0)
+        audio_branches = (1 if include_master else 0) + len(renditions)
+
+        v = [f"[vb{i}]" for i in range(video_branches)]
+        parts.append(f"{video_in}split={video_branches}{''.join(v)}")
+
+        if audio_in is None:
+            a = ["0:a?"] * audio_branches
+        elif audio_branches == 1:
+            a = [audio_in]
+        else:
+            a = [f"[ab{i}]" for i in range(audio_branches)]
+            parts.append(f"{audio_in}asplit={audio_branches}{''.join(a)}")
+
+        if include_master:
+            outputs.append(["-map", v.pop(0), "-map", a.pop(0), *self._encoder_args(profile), master_path])
+
+        for i, (name, path) in enumerate(self.rendition_paths(master_path, renditions).items()):
+            r = get_rendition(name)
+            w, h = r["width"], r["height"]
+            # Fill the frame, center crop the overflow
+            parts.append(
+                f"{v.pop(0)}scale={w}:{h}:force_original_aspect_ratio=increase,"
+                f"crop={w}:{h},setsar=1[vr{i}]"
+            )
+            outputs.append(["-map", f"[vr{i}]", "-map", a.pop(0), *self._encoder_args(profile), path])
+
+        if previews:
+            cfg = PREVIEW_SETTINGS
+            paths = self.preview_paths(master_path)
+            layout = self.sprite_layout(duration)
+            poster_at = min(cfg["poster_at"], duration / 2)
+
+            parts.append(
+                f"{v.pop(0)}trim=start={poster_at},setpts=PTS-STARTPTS,"
+                f"scale={cfg['poster_width']}:-2[vposter]"
+            )
+            outputs.append(["-map", "[vposter]", "-frames:v", "1", "-q:v", "3", paths["poster"]])
+
+            parts.append(
+                f"{v.pop(0)}fps=1/{layout['interval']},scale={layout['tile_width']}:-2,"
+                f"tile={layout['columns']}x{layout['rows']}[vsprite]"
+            )
+            outputs.append(["-map", "[vsprite]", "-frames:v", "1", "-q:v", "4", paths["sprite"]])
+
+            parts.append(
+                f"{v.pop(0)}trim=end={cfg['preview_seconds']},setpts=PTS-STARTPTS,"
+                f"fps={cfg['preview_fps']},scale={cfg['preview_width']}:-2[vpreview]"
+            )
+            outputs.append([
+                "-map", "[vpreview]", "-an",
+                "-c:v", "libx264", "-preset", "veryfast",
+                "-crf", str(cfg["preview_crf"]), "-pix_fmt", "yuv420p",
+                "-movflags", "+faststart",
+                paths["preview"],
+            ])
+
+        return parts, outputs
+
+    def render_derivatives(
+        self,
+        master_path: str,
+        renditions: Optional[List[str]] = None,
+        profile: Optional[str] = None,
+    ) -> None:
+        """Renditions + previews of an existing master (legacy engine) — one decode."""
+        if not renditions and not self.previews:
+            return
+
+        duration = self.get_video_duration(master_path)
+
+        with cpu_slots.acquire():
+            parts, outputs = self._derived_graph(
+                "[0:v]", None, master_path, duration,
+                renditions, self.previews, profile, include_master=False,
+            )
+
+            cmd = ["-i", master_path, "-filter_complex", ";".join(parts)]
+            for args in outputs:
+                cmd += args
+
+            try:
+                with stage_span("derivatives", outputs=len(outputs)) as span:
+                    run_ffmpeg(cmd, step="derivatives", duration=duration, timeout=FFMPEG_ENCODE_TIMEOUT)
+                    span.bytes_moved = sum(
+                        os.path.getsize(args[-1]) for args in outputs if os.path.exists(args[-1])
+                    )
+            except BaseException:
+                # The master belongs to the caller, only drop what was derived
+                self._discard_derivatives(master_path)
+                raise
+
+    def fetch_scene_input(self, source: str, voice_path: str, index: int) -> SceneInput:
+        """Download one scene's video/voice and probe it (no encode)."""
+        scene = SceneInput(video_path="", voice_path="", duration=0.0)
+
+        try:
+            scene.video_path = self._download_video(source, index)
+            scene.temp_files.append(scene.video_path)
+
+            scene.voice_path, is_temp_voice = self._resolve_voice(voice_path, index)
+            if is_temp_voice:
+                scene.temp_files.append(scene.voice_path)
+
+            scene.info = self.probe(scene.video_path)
+            scene.duration = scene.info.duration
+            return scene
+
+        except Exception:
+            self.release(scene)
+            raise
+
+    def release(self, prepared: Union[str, SceneInput, None]):
+        """Delete a prepared segment file or a SceneInput's temp files."""
+        if isinstance(prepared, SceneInput):
+            for f in prepared.temp_files:
+                self._safe_remove(f)
+        else:
+            self._safe_remove(prepared)
+
+
     #  APPLY FADE
  
-    def _fade_video(self, input_path: str, output_path: str, fade_in: bool, fade_out: bool, duration=0.7):
-        total_dur = self.get_video_duration(input_path)
+    @timed_stage("fade")
+    def _fade_video(
+        self,
+        input_path: str,
+        output_path: str,
+        fade_in: bool,
+        fade_out: bool,
+        duration=0.7,
+        info: Optional[MediaInfo] = None,
+        profile: Optional[str] = None,
+    ):
+        info = info or self.probe(input_path)
+        total_dur = info.duration
 
         vf, af = [], []
         if fade_in:
@@ -160,49 +702,266 @@ class VideoMerger:
             vf.append(f"fade=t=out:st={total_dur-duration}:d={duration}")
             af.append(f"afade=t=out:st={total_dur-duration}:d={duration}")
 
-        subprocess.run(
-            [
-                "ffmpeg", "-y",
-                "-i", input_path,
-                "-vf", ",".join(vf) if vf else "null",
-                "-af", ",".join(af) if af else "anull",
-                output_path
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        with cpu_slots.acquire():
+            run_ffmpeg(
+                [
+                    "-i", input_path,
+                    "-vf", ",".join(vf) if vf else "null",
+                    *(["-af", ",".join(af) if af else "anull"] if info.has_audio else []),
+                    # Intermediate segment: no faststart, concat copies it later
+                    *self._encoder_args(profile, faststart=False),
+                    output_path
+                ],
+                step="fade",
+                duration=total_dur,
+            )
 
 
-    #  MERGE ALL SCENES
+    #  MEZZANINE SEGMENT (distributed merge)
+    #  One scene → MEZZANINE_SPEC (size / fps / pix_fmt / audio layout /
+    #  timescale) with its fades and fitted voice, in one encode. Segments
+    #  encoded on different workers then join with a stream-copy concat.
 
-    def merge_videos(self, video_paths: List[str], campaign_id: str, output_name: str) -> str:
-        temp_dir = tempfile.gettempdir()
-        processed = []
+    def encode_mezzanine(
+        self,
+        source: str,
+        voice_path: str,
+        index: int,
+        total: int,
+        profile: Optional[str] = None,
+    ) -> str:
+        """Returns the local segment path (inside the job workspace)."""
+        spec = MEZZANINE_SPEC
+        w, h = spec["width"], spec["height"]
+        scene = self.fetch_scene_input(source, voice_path, index)
+
+        try:
+            d = scene.duration
+            fade_vf, fade_af = self._fade_filters(d, index != 0, index != total - 1)
+            vf = [
+                "setpts=PTS-STARTPTS",
+                # Letterbox instead of crop: never cut into the scene
+                f"scale={w}:{h}:force_original_aspect_ratio=decrease",
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2",
+                f"fps={spec['fps']}",
+                "format=yuv420p",
+                "setsar=1",
+                *fade_vf,
+            ]
+            af = [
+                AUDIO_FORMAT,
+                f"apad=whole_dur={d}",
+                f"atrim=end={d}",
+                "asetpts=PTS-STARTPTS",
+                *fade_af,
+            ]
+
+            output = self._temp_path(f"mezzanine_{index}.mp4")
+            with stage_span("mezzanine", scene_number=index + 1) as span, cpu_slots.acquire():
+                run_ffmpeg(
+                    [
+                        "-i", scene.video_path,
+                        "-i", scene.voice_path,
+                        "-filter_complex", f"[0:v]{','.join(vf)}[v];[1:a]{','.join(af)}[a]",
+                        "-map", "[v]", "-map", "[a]",
+                        *self._encoder_args(profile, faststart=False),
+                        "-video_track_timescale", str(spec["timescale"]),
+                        output,
+                    ],
+                    step="mezzanine",
+                    duration=d,
+                    timeout=FFMPEG_ENCODE_TIMEOUT,
+                )
+                span.bytes_moved = os.path.getsize(output)
+
+            return output
+
+        finally:
+            self.release(scene)
+
+    def concat_remote_segments(
+        self,
+        segment_urls: List[str],
+        campaign_id: str,
+        output_name: str,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+    ) -> str:
+        """Downloads mezzanine segments (in order) and concats them."""
+        with self.workspace(campaign_id):
+            segments = self._prepare_all(
+                lambda url, _, i, total: self._download(url, self._temp_path(f"segment_{i}.mp4")),
+                segment_urls,
+                [None] * len(segment_urls),
+            )
+            try:
+                return self.concat_segments(segments, campaign_id, output_name, profile, renditions)
+            finally:
+                for f in segments:
+                    self._safe_remove(f)
+
+
+    #  PREPARE ONE SCENE FOR THE CONFIGURED ENGINE (incremental merge)
+    #  filtergraph → SceneInput (download + probe, encode happens at the end)
+    #  legacy      → faded segment file
+
+    def prepare_scene(
+        self,
+        source: str,
+        voice_path: str,
+        index: int,
+        total: int,
+        profile: Optional[str] = None,
+    ) -> Union[str, SceneInput]:
+        if self.engine == "legacy":
+            return self.prepare_segment(source, voice_path, index, total, profile)
+        return self.fetch_scene_input(source, voice_path, index)
+
+    def finish_prepared(
+        self,
+        prepared: List[Union[str, SceneInput]],
+        campaign_id: str,
+        output_name: str,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+        stream_upload: Optional[bool] = None,
+    ) -> str:
+        """Final output from prepare_scene results (caller releases them)."""
+        if prepared and isinstance(prepared[0], SceneInput):
+            return self.render_single_pass(
+                prepared, campaign_id, output_name, profile=profile,
+                renditions=renditions, stream_upload=stream_upload,
+            )
+        return self.concat_segments(prepared, campaign_id, output_name, profile, renditions)
+
+
+    #  PREPARE ONE SCENE (download → fit voice → strip → mux → fade)
+    #  Independent of the other scenes, so it can run as soon as this
+    #  scene's video + voice exist (incremental merge).
+
+    def prepare_segment(
+        self,
+        source: str,
+        voice_path: str,
+        index: int,
+        total: int,
+        profile: Optional[str] = None,
+    ) -> str:
+        temp_files = []
+
+        try:
+            video = self._download_video(source, index)
+            temp_files.append(video)
+
+            voice, is_temp_voice = self._resolve_voice(voice_path, index)
+            if is_temp_voice:
+                temp_files.append(voice)
+
+            info = self.probe(video)
+            duration = info.duration
+            fitted_voice = self.fit_audio_to_duration(voice, duration)
+            temp_files.append(fitted_voice)
+
+            # Already silent → skip the strip pass
+            if info.has_audio:
+                silent = self.strip_audio(video)
+                temp_files.append(silent)
+            else:
+                silent = video
+
+            voiced = self.add_voice_and_music(
+                silent_video=silent,
+                voice_path=fitted_voice,
+                music_path=None
+            )
+            temp_files.append(voiced)
+
+            segment = self._temp_path(f"fade_{index}.mp4")
+            # Voice is fitted to the video → same duration, no second probe
+            voiced_info = replace(
+                info, path=voiced, audio_streams=[AudioStream("aac", None, None)]
+            )
+            self._fade_video(
+                voiced, segment, index != 0, index != total - 1,
+                info=voiced_info, profile=profile,
+            )
+            return segment
+
+        finally:
+            for f in temp_files:
+                self._safe_remove(f)
 
-        for i, p in enumerate(video_paths):
-            out = os.path.join(temp_dir, f"fade_{i}.mp4")
-            self._fade_video(p, out, i != 0, i != len(video_paths)-1)
-            processed.append(out)
 
-        concat_file = os.path.join(temp_dir, f"concat_{campaign_id}.txt")
+    #  CONCAT PREPARED SEGMENTS (caller owns the segment files)
+    #  Segments with identical codec parameters are stream-copied;
+    #  anything else is re-encoded with the profile.
+
+    def concat_segments(
+        self,
+        segment_paths: List[str],
+        campaign_id: str,
+        output_name: str,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+    ) -> str:
+        concat_file = self._temp_path(f"concat_{campaign_id}.txt")
         with open(concat_file, "w") as f:
-            for p in processed:
+            for p in segment_paths:
                 f.write(f"file '{p}'\n")
 
-        output = os.path.join(temp_dir, f"{campaign_id}_{output_name}")
-        subprocess.run(
-            ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_file, "-c:v", "libx264", "-c:a", "aac", output],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        stream_copy = self._can_stream_copy(segment_paths)
 
-        # cleanup intermediate fade files + concat file
-        for p in processed:
-            self._safe_remove(p)
-        self._safe_remove(concat_file)
+        output = self._output_path(campaign_id, output_name)
+        try:
+            with stage_span("concat", segments=len(segment_paths), stream_copy=stream_copy) as span, \
+                    cpu_slots.acquire(want=1 if stream_copy else None):
+                codec_args = (
+                    ["-c", "copy", "-movflags", "+faststart"]
+                    if stream_copy
+                    else self._encoder_args(profile)
+                )
+                run_ffmpeg(
+                    ["-f", "concat", "-safe", "0", "-i", concat_file, *codec_args, output],
+                    step="concat",
+                    timeout=FFMPEG_ENCODE_TIMEOUT,
+                )
+                span.bytes_moved = os.path.getsize(output)
+
+            self.render_derivatives(output, renditions, profile)
+        except BaseException:
+            self.discard_outputs(output)
+            raise
+        finally:
+            self._safe_remove(concat_file)
 
         return output
 
+
+    #  MERGE ALL SCENES
+
+    def merge_videos(
+        self,
+        video_paths: List[str],
+        campaign_id: str,
+        output_name: str,
+        profile: Optional[str] = None,
+    ) -> str:
+        processed = []
+
+        with self.workspace(campaign_id):
+            try:
+                for i, p in enumerate(video_paths):
+                    out = self._temp_path(f"fade_{i}.mp4")
+                    self._fade_video(p, out, i != 0, i != len(video_paths)-1, profile=profile)
+                    processed.append(out)
+
+                return self.concat_segments(processed, campaign_id, output_name, profile)
+
+            finally:
+                # cleanup intermediate fade files
+                for p in processed:
+                    self._safe_remove(p)
+
   
     # FULL PIPELINE (AUTO CLEANUP)
 
@@ -212,40 +971,94 @@ class VideoMerger:
         voice_paths: List[str],
         campaign_id: str,
         output_name: str,
-        background_music: Optional[str] = None
+        background_music: Optional[str] = None,
+        profile: Optional[str] = None,
+        renditions: Optional[List[str]] = None,
+        stream_upload: Optional[bool] = None,
     ) -> str:
+        """
+        Returns the master path; renditions and previews are written
+        next to it (rendition_paths / preview_paths).
+        A streamed master (filtergraph engine only) is already on S3,
+        see stream_manifest.
+        """
 
-        temp_files = []
-        voiced_scenes = []
+        with self.workspace(campaign_id):
+            if self.engine != "legacy":
+                return self._single_pass_pipeline(
+                    scene_video_urls, voice_paths, campaign_id, output_name,
+                    background_music, profile, renditions, stream_upload,
+                )
+            return self._segment_pipeline(
+                scene_video_urls, voice_paths, campaign_id, output_name,
+                profile, renditions,
+            )
 
-        try:
-            for i, url in enumerate(scene_video_urls):
-                video = self._download_video(url, i)
-                temp_files.append(video)
+    #  PARALLEL PER-SCENE PREPROCESSING
+    #  Bounded pool, results in scene order. Each task runs in a copy of
+    #  the caller's context (job workspace + timing attribution).
+    #  On failure every finished result is released before re-raising.
 
-                duration = self.get_video_duration(video)
-                fitted_voice = self.fit_audio_to_duration(voice_paths[i], duration)
-                temp_files.append(fitted_voice)
+    def _prepare_all(self, fn, scene_video_urls: List[str], voice_paths: List[str]) -> list:
+        total = len(scene_video_urls)
+        workers = min(self.prep_workers, total)
 
-                silent = self.strip_audio(video)
-                temp_files.append(silent)
+        if workers <= 1:
+            results = []
+            try:
+                for i, url in enumerate(scene_video_urls):
+                    results.append(fn(url, voice_paths[i], i, total))
+                return results
+            except Exception:
+                for r in results:
+                    self.release(r)
+                raise
 
-                voiced = self.add_voice_and_music(
-                    silent_video=silent,
-                    voice_path=fitted_voice,
-                    music_path=None
-                )
-                voiced_scenes.append(voiced)
-                temp_files.append(voiced)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merge-prep") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, fn, url, voice_paths[i], i, total)
+                for i, url in enumerate(scene_video_urls)
+            ]
+
+        errors = [f.exception() for f in futures if f.exception() is not None]
+        if errors:
+            for f in futures:
+                if f.exception() is None:
+                    self.release(f.result())
+            raise errors[0]
 
-            merged = self.merge_videos(voiced_scenes, campaign_id, output_name)
-            return merged
+        return [f.result() for f in futures]
 
+    def _single_pass_pipeline(
+        self, scene_video_urls, voice_paths, campaign_id, output_name,
+        background_music, profile, renditions, stream_upload=None,
+    ):
+        scenes = self._prepare_all(
+            lambda url, voice, i, total: self.fetch_scene_input(url, voice, i),
+            scene_video_urls,
+            voice_paths,
+        )
+        try:
+            return self.render_single_pass(
+                scenes, campaign_id, output_name, background_music,
+                profile=profile, renditions=renditions, stream_upload=stream_upload,
+            )
         finally:
-  
-            for f in temp_files:
-                self._safe_remove(f)
+            for scene in scenes:
+                self.release(scene)
+
+    def _segment_pipeline(self, scene_video_urls, voice_paths, campaign_id, output_name, profile, renditions):
+        segments = self._prepare_all(
+            lambda url, voice, i, total: self.prepare_segment(url, voice, i, total, profile),
+            scene_video_urls,
+            voice_paths,
+        )
 
+        try:
+            return self.concat_segments(segments, campaign_id, output_name, profile, renditions)
+        finally:
+            for f in segments:
+                self._safe_remove(f)
 
 
 video_merger = VideoMerger()
@@ -1,16 +1,31 @@
 import asyncio
+import contextvars
+import hashlib
 import logging
+import os
+import threading
+import uuid
+from datetime import datetime
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
-from app.models.campaign import Campaign, CampaignScene
+from app.models.campaign import Campaign, CampaignScene, CampaignOutput
 from app.services.veo3_video_generator import veo3_video_generator
 from app.services.elevenlabs_tts_service import elevenlabs_tts_service
 from app.services.video_merger import video_merger
-from app.services.s3_service import upload_to_s3
+from app.services.hls_packager import hls_packager
+from app.services.s3_service import upload_to_s3, build_s3_url, s3_object_exists
 from app.services.retry_utils import generate_video_with_retries
 from app.services.narration import build_scene_narration
+from app.services.campaign_scenes import load_video_scenes
+from app.services.segment_cache import segment_s3_key
+from app.services.pipeline_timing import stage_span, timing_context, campaign_timing
+from app.services.media_probe import MediaProbeError, probe_media
 from app.constants.motion_presets import VEO_MOTION_PRESETS
+from app.constants.encoding_profiles import (
+    DEFAULT_RENDITIONS,
+    RENDITIONS,
+)
 
 
 # ------------------------------------------------------------------
@@ -25,15 +40,590 @@ logging.getLogger("google").setLevel(logging.WARNING)
 logging.getLogger("botocore").setLevel(logging.WARNING)
 
 
-def run_video_generation(campaign_id: str, business_info: dict | None):
+# ------------------------------------------------------------------
+# Scene concurrency (per campaign)
+# 1 = scenes rendered one after another (previous behaviour)
+# ------------------------------------------------------------------
+DEFAULT_SCENE_CONCURRENCY = int(os.getenv("VIDEO_SCENE_CONCURRENCY", "1"))
+
+
+DEFAULT_TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+
+# Incremental merge: prepare each scene's segment as soon as it is ready
+# (Celery: a merge-queue segment task per rendered scene + concat task)
+DEFAULT_INCREMENTAL_MERGE = os.getenv("VIDEO_INCREMENTAL_MERGE", "false").lower() == "true"
+SEGMENT_PREP_CONCURRENCY = int(os.getenv("SEGMENT_PREP_CONCURRENCY", "2"))
+
+# Distributed merge: one mezzanine encode task per scene (any merge
+# worker) + a stream-copy concat task, instead of one merge task
+DEFAULT_DISTRIBUTED_MERGE = os.getenv("MERGE_DISTRIBUTED", "false").lower() == "true"
+
+
+# ------------------------------------------------------------------
+# Stage checkpoints (a Celery retry only re-runs what failed)
+# - VEO:       CampaignScene.status == "video_generated" + video_url
+# - Narration: S3 object keyed by scene + narration content
+# - Segment:   S3 object keyed by every input of the mezzanine encode
+#              (distributed merge / scene re-render)
+# ------------------------------------------------------------------
+
+def _is_video_checkpointed(scene: CampaignScene) -> bool:
+    return scene.status == "video_generated" and bool(scene.video_url)
+
+
+def _narration_s3_key(
+    product_type: str,
+    campaign_id: str,
+    scene_number: int,
+    narration_text: str,
+) -> str:
+    digest = hashlib.sha1(
+        "|".join([
+            elevenlabs_tts_service.voice_id,
+            elevenlabs_tts_service.model_id,
+            narration_text,
+        ]).encode("utf-8")
+    ).hexdigest()[:16]
+
+    return (
+        f"campaigns/{product_type}/{campaign_id}/narration/"
+        f"scene_{scene_number}_{digest}.mp3"
+    )
+
+
+def _ensure_narration(
+    product_type: str,
+    campaign_id: str,
+    scene_number: int,
+    narration_text: str,
+) -> tuple[str, str | None]:
+    """
+    Returns (voice_url, local_path).
+    local_path is None when the saved narration was reused.
+    Blocking — call from a thread inside the event loop.
+    """
+
+    key = _narration_s3_key(product_type, campaign_id, scene_number, narration_text)
+
+    if s3_object_exists(key):
+        logger.info("♻️ Scene %s: saved narration reused", scene_number)
+        return build_s3_url(key), None
+
+    with stage_span("tts", scene_number=scene_number) as span:
+        # Inside a job workspace the file is removed with it
+        voice_path = elevenlabs_tts_service.generate_voice(
+            narration_text, output_dir=video_merger.workspace_dir()
+        )
+        span.bytes_moved = os.path.getsize(voice_path)
+
+    voice_url = upload_to_s3(voice_path, key=key, content_type="audio/mpeg")
+
+    logger.info("✅ Scene %s: voice generated", scene_number)
+    return voice_url, voice_path
+
+
+async def _in_scene_timing(campaign_id: str, scene: CampaignScene, coro):
+    """Runs coro with spans attributed to this scene."""
+    with timing_context(campaign_id, scene.id, scene.scene_number):
+        return await coro
+
+
+async def _cancel_all(tasks: list[asyncio.Task]):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class _SceneThreads:
+    """
+    Blocking scene work (TTS, segment prep) runs in threads, and
+    cancelling the awaiting task does not stop a thread → on failure,
+    work not started yet is skipped and running work is waited for,
+    so nothing writes into the job workspace once it is removed.
+    """
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self._futures: list[asyncio.Future] = []
+
+    async def run(self, fn, *args):
+        def guarded():
+            if self.cancelled.is_set():
+                raise RuntimeError("Scene generation cancelled")
+            return fn(*args)
+
+        # Same context as asyncio.to_thread (timing attribution, workspace)
+        ctx = contextvars.copy_context()
+        future = asyncio.get_running_loop().run_in_executor(None, ctx.run, guarded)
+        self._futures.append(future)
+        # Shielded: a cancelled caller leaves the thread's future to cancel()
+        return await asyncio.shield(future)
+
+    async def cancel(self):
+        self.cancelled.set()
+        await asyncio.gather(*self._futures, return_exceptions=True)
+
+
+async def _generate_scene_assets(
+    db: Session,
+    campaign: Campaign,
+    scenes: list[CampaignScene],
+    business_info: dict | None,
+    concurrency: int,
+    incremental_merge: bool = False,
+    local_voices: bool = True,
+    encoding_profile: str | None = None,
+) -> tuple[list[str], list[str], list[str] | None]:
+    """
+    Drives every scene inside ONE event loop.
+    - Narration (TTS) for every scene starts immediately and
+      runs while VEO is rendering — it does not depend on the video
+    - At most `concurrency` scenes talk to VEO at the same time
+    - incremental_merge: each scene is prepared for the merge engine as
+      soon as its video + voice exist (filtergraph: local inputs + probe,
+      legacy: fit/strip/mux/fade segment)
+    - local_voices=False returns S3 narration URLs only (merge runs on
+      another worker)
+    - Results keep scene order
+    - First failure cancels the remaining work and is re-raised
+
+    Returns (video_urls, voice_sources, prepared_segments | None).
+    """
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    threads = _SceneThreads()
+    tts_semaphore = asyncio.Semaphore(max(1, DEFAULT_TTS_CONCURRENCY))
+    prep_semaphore = asyncio.Semaphore(max(1, SEGMENT_PREP_CONCURRENCY))
+    campaign_id = campaign.id
+    product_type = campaign.product_type or "beauty"
+
+    motion_prompt = VEO_MOTION_PRESETS.get(
+        "brand", VEO_MOTION_PRESETS["brand"]
+    )
+
+    async def generate_voice(scene_number: int) -> str:
+        async with tts_semaphore:
+            narration_text = build_scene_narration({}, business_info) or ""
+
+            # Blocking SDK + S3 → thread
+            voice_url, voice_path = await threads.run(
+                _ensure_narration,
+                product_type,
+                campaign_id,
+                scene_number,
+                narration_text,
+            )
+
+            if not local_voices:
+                video_merger.discard(voice_path)
+                return voice_url
+
+            # Prefer the fresh local copy, fall back to the saved one
+            return voice_path or voice_url
+
+    async def generate_video(scene: CampaignScene) -> str:
+        # Read ORM attributes up front (commits expire them)
+        scene_number = scene.scene_number
+        image_url = scene.selected_image_url
+
+        if _is_video_checkpointed(scene):
+            logger.info(
+                "♻️ Scene %s: video already generated, skipping VEO",
+                scene_number,
+            )
+            return scene.video_url
+
+        async with semaphore:
+            logger.info(
+                "🎬 Scene %s: processing started",
+                scene_number,
+            )
+
+            video_url = await generate_video_with_retries(
+                veo3_video_generator,
+                scene_image_url=image_url,
+                motion_prompt=motion_prompt,
+                text_overlays={},
+                campaign_id=campaign_id,
+                scene_number=scene_number,
+                business_info=business_info,
+                product_type=product_type,
+                retries=4,
+                base_delay=6,
+            )
+
+            logger.info(
+                "✅ Scene %s: video generated",
+                scene_number,
+            )
+
+            # ---- Persist scene result
+            scene.video_url = video_url
+            scene.status = "video_generated"
+            db.commit()
+
+            return video_url
+
+    async def prepare_segment(
+        index: int,
+        total: int,
+        video_task: asyncio.Task,
+        voice_task: asyncio.Task,
+    ) -> str:
+        video_url = await video_task
+        voice_source = await voice_task
+
+        async with prep_semaphore:
+            segment = await threads.run(
+                video_merger.prepare_scene,
+                video_url,
+                voice_source,
+                index,
+                total,
+                encoding_profile,
+            )
+
+        logger.info("🧩 Segment %d/%d prepared", index + 1, total)
+        return segment
+
+    active_scenes = [scene for scene in scenes if scene.selected_image_url]
+
+    # Narration first so it overlaps with VEO polling
+    voice_tasks = [
+        asyncio.create_task(_in_scene_timing(
+            campaign_id, scene, generate_voice(scene.scene_number)
+        ))
+        for scene in active_scenes
+    ]
+    video_tasks = [
+        asyncio.create_task(_in_scene_timing(
+            campaign_id, scene, generate_video(scene)
+        ))
+        for scene in active_scenes
+    ]
+    segment_tasks = []
+    if incremental_merge:
+        segment_tasks = [
+            asyncio.create_task(_in_scene_timing(
+                campaign_id,
+                scene,
+                prepare_segment(i, len(active_scenes), video_task, voice_task),
+            ))
+            for i, (scene, video_task, voice_task) in enumerate(
+                zip(active_scenes, video_tasks, voice_tasks)
+            )
+        ]
+
+    all_tasks = video_tasks + voice_tasks + segment_tasks
+
+    try:
+        # Wait on everything together → a failed narration cancels the
+        # VEO renders right away instead of after all of them finished
+        if all_tasks:
+            done, _ = await asyncio.wait(all_tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+
+        scene_video_urls = [task.result() for task in video_tasks]
+        scene_voice_paths = [task.result() for task in voice_tasks]
+        segments = [task.result() for task in segment_tasks]
+    except Exception:
+        await _cancel_all(all_tasks)
+        await threads.cancel()
+        for task in segment_tasks:
+            if not task.cancelled() and task.exception() is None:
+                video_merger.release(task.result())
+        raise
+
+    return (
+        list(scene_video_urls),
+        list(scene_voice_paths),
+        list(segments) if incremental_merge else None,
+    )
+
+
+def _campaign_renditions(campaign: Campaign) -> list[str]:
+    """Extra renditions for this campaign (falls back to VIDEO_RENDITIONS)."""
+    if campaign.output_renditions is not None:
+        return list(campaign.output_renditions)
+    return list(DEFAULT_RENDITIONS)
+
+
+def _merge(
+    db: Session,
+    campaign: Campaign,
+    scene_video_urls: list[str],
+    scene_voice_paths: list[str],
+    segments: list[str] | None = None,
+    encoding_profile: str | None = None,
+) -> str:
+    campaign_id = campaign.id
+    renditions = _campaign_renditions(campaign)
+    # The HLS ladder is packaged from the local master → no streaming then
+    stream_upload = False if _campaign_hls(campaign) else None
+
+    campaign.status = "merging_video"
+    db.commit()
+    logger.info("🧩 Merging final video")
+
+    if segments is not None:
+        # Incremental mode: scenes are already prepared, only concat left
+        try:
+            return video_merger.finish_prepared(
+                segments, campaign_id, "final_ad.mp4", encoding_profile, renditions,
+                stream_upload=stream_upload,
+            )
+        finally:
+            for segment in segments:
+                video_merger.release(segment)
+
+    return video_merger.process_full_pipeline(
+        scene_video_urls=scene_video_urls,
+        voice_paths=scene_voice_paths,
+        campaign_id=campaign_id,
+        output_name="final_ad.mp4",
+        profile=encoding_profile,
+        renditions=renditions,
+        stream_upload=stream_upload,
+    )
+
+
+def _upload_renditions(campaign: Campaign, final_path: str) -> list[dict]:
+    """Uploads the renditions written next to the master, if any."""
+    uploaded = []
+
+    for name, path in video_merger.rendition_paths(
+        final_path, _campaign_renditions(campaign)
+    ).items():
+        if not os.path.exists(path):
+            logger.warning("⚠️ Rendition %s missing, skipped", name)
+            continue
+
+        size = os.path.getsize(path)
+        with stage_span("rendition_upload", rendition=name) as span:
+            span.bytes_moved = size
+            url = upload_to_s3(path)
+        video_merger.discard(path)
+
+        spec = RENDITIONS[name]
+        uploaded.append({
+            "name": name,
+            "aspect_ratio": spec["aspect_ratio"],
+            "width": spec["width"],
+            "height": spec["height"],
+            "url": url,
+            "bytes": size,
+        })
+
+    return uploaded
+
+
+def _upload_previews(campaign: Campaign, final_path: str, duration: float | None) -> dict:
+    """Uploads poster / sprite / preview written next to the master, if any."""
+    if not video_merger.previews:
+        return {}
+
+    layout = video_merger.sprite_layout(duration) if duration else None
+
+    content_types = {"poster": "image/jpeg", "sprite": "image/jpeg", "preview": "video/mp4"}
+    uploaded = {}
+
+    for name, path in video_merger.preview_paths(final_path).items():
+        if not os.path.exists(path):
+            logger.warning("⚠️ Preview %s missing, skipped", name)
+            continue
+
+        with stage_span("preview_upload", artifact=name) as span:
+            span.bytes_moved = os.path.getsize(path)
+            uploaded[name] = upload_to_s3(path, content_type=content_types[name])
+        video_merger.discard(path)
+
+    if "sprite" in uploaded and layout:
+        uploaded["sprite_meta"] = layout
+
+    return uploaded
+
+
+def _campaign_hls(campaign: Campaign) -> bool:
+    """HLS packaging for this campaign (falls back to VIDEO_HLS)."""
+    if campaign.output_hls is not None:
+        return bool(campaign.output_hls)
+    return hls_packager.enabled
+
+
+def _publish_hls(
+    campaign: Campaign,
+    final_path: str,
+    encoding_profile: str | None = None,
+) -> str | None:
+    """
+    Packages + uploads the ABR ladder. Optional on top of the MP4:
+    a failure is logged and the campaign still completes.
+    """
+    if not _campaign_hls(campaign):
+        return None
+
+    try:
+        with video_merger.workspace(campaign.id) as out_dir:
+            url = hls_packager.package_and_upload(
+                final_path, out_dir, campaign.id, encoding_profile
+            )
+        logger.info("📺 HLS master playlist: %s", url)
+        return url
+    except Exception:
+        logger.exception("⚠️ HLS packaging failed for %s, MP4 only", campaign.id)
+        return None
+
+
+def _record_output(
+    db: Session,
+    campaign: Campaign,
+    final_url: str,
+    renditions: list[dict],
+    duration: float | None,
+):
+    scene_urls = [
+        s.video_url
+        for s in db.query(CampaignScene)
+        .filter(CampaignScene.campaign_id == campaign.id)
+        .order_by(CampaignScene.scene_number)
+        .all()
+        if s.video_url
+    ]
+
+    db.add(CampaignOutput(
+        id=f"out_{uuid.uuid4().hex[:12]}",
+        campaign_id=campaign.id,
+        scene_video_urls=scene_urls,
+        final_ad_url=final_url,
+        final_ad_duration=int(round(duration)) if duration else None,
+        renditions=renditions or None,
+        status="completed",
+        completed_at=datetime.utcnow(),
+    ))
+
+
+def _publish(
+    db: Session,
+    campaign: Campaign,
+    final_path: str,
+    encoding_profile: str | None = None,
+    keep_on_error: bool = False,
+) -> str:
+    """
+    The master and its renditions / previews / stream manifest sit in
+    MERGE_WORK_ROOT, outside any job workspace → removed here, also when
+    publishing fails (unless keep_on_error: a Celery retry of the
+    publish task still needs them).
+    """
+    try:
+        return _publish_outputs(db, campaign, final_path, encoding_profile)
+    except Exception:
+        if not keep_on_error:
+            video_merger.discard_outputs(final_path)
+        raise
+
+
+def _publish_outputs(
+    db: Session,
+    campaign: Campaign,
+    final_path: str,
+    encoding_profile: str | None,
+) -> str:
+    campaign_id = campaign.id
+    streamed = video_merger.stream_manifest(final_path)
+
+    if streamed:
+        # Master already uploaded during the encode
+        final_url = streamed["url"]
+        duration = streamed["duration"]
+    else:
+        with stage_span("final_upload") as span:
+            span.bytes_moved = os.path.getsize(final_path)
+            final_url = upload_to_s3(final_path)
+        try:
+            duration = probe_media(final_path).duration
+        except MediaProbeError:
+            duration = None
+
+    renditions = _upload_renditions(campaign, final_path)
+    previews = _upload_previews(campaign, final_path, duration)
+    hls_url = _publish_hls(campaign, final_path, encoding_profile) if not streamed else None
+    _record_output(db, campaign, final_url, renditions, duration)
+    video_merger.discard_outputs(final_path)
+
+    campaign.final_video_url = final_url
+    campaign.poster_url = previews.get("poster")
+    campaign.thumbnail_sprite_url = previews.get("sprite")
+    campaign.thumbnail_sprite_meta = previews.get("sprite_meta")
+    campaign.preview_url = previews.get("preview")
+    campaign.hls_master_url = hls_url
+    campaign.status = "videos_generated"
+    db.commit()
+
+    # ==================================================
+    # DONE
+    # ==================================================
+    logger.info(
+        "🏁 Campaign %s completed successfully",
+        campaign_id,
+    )
+    logger.info("✅ Final video URL: %s", final_url)
+
+    return final_url
+
+
+def _load_campaign_and_scenes(
+    db: Session,
+    campaign_id: str,
+) -> tuple[Campaign, list[CampaignScene]]:
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise Exception("Campaign not found")
+
+    campaign.status = "veo_generating"
+    db.commit()
+    logger.info("✅ Campaign loaded")
+
+    # Same scene set as the fan-out dispatch (see campaign_scenes)
+    scenes = load_video_scenes(db, campaign)
+
+    if not scenes:
+        raise Exception("No scenes with a selected image")
+
+    logger.info("✅ %d scenes loaded", len(scenes))
+    return campaign, scenes
+
+
+@campaign_timing
+def run_video_generation(
+    campaign_id: str,
+    business_info: dict | None,
+    scene_concurrency: int | None = None,
+    incremental_merge: bool | None = None,
+    encoding_profile: str | None = None,
+):
     """
     FULL VIDEO GENERATION PIPELINE
     --------------------------------
-    Runs ONLY inside Celery worker.
+    Generation, merge and upload in ONE process (the Celery tasks
+    split them across queues instead — see app/tasks/video_tasks).
     Uses runtime business_info (Option 1).
+    scene_concurrency caps how many scenes render at once
+    (defaults to VIDEO_SCENE_CONCURRENCY).
+    incremental_merge prepares merge segments while other scenes
+    are still rendering (defaults to VIDEO_INCREMENTAL_MERGE).
+    encoding_profile picks the x264 settings (defaults to ENCODING_PROFILE).
     """
 
+    if scene_concurrency is None:
+        scene_concurrency = DEFAULT_SCENE_CONCURRENCY
+    if incremental_merge is None:
+        incremental_merge = DEFAULT_INCREMENTAL_MERGE
+
     db: Session = SessionLocal()
+    campaign = None
 
     try:
         # ==================================================
@@ -42,127 +632,433 @@ def run_video_generation(campaign_id: str, business_info: dict | None):
         logger.info("▶️ Campaign %s: video generation started", campaign_id)
 
         # --------------------------------------------------
-        # 1️⃣ Load campaign
+        # 1️⃣ Load campaign + scenes
         # --------------------------------------------------
-        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-        if not campaign:
-            raise Exception("Campaign not found")
-
-        campaign.status = "veo_generating"
-        db.commit()
-        logger.info("✅ Campaign loaded")
+        campaign, scenes = _load_campaign_and_scenes(db, campaign_id)
 
         # --------------------------------------------------
-        # 2️⃣ Load scenes
+        # 2️⃣ Generate scene videos + narration
         # --------------------------------------------------
-        scenes = (
-            db.query(CampaignScene)
-            .filter(CampaignScene.campaign_id == campaign_id)
-            .order_by(CampaignScene.scene_number)
-            .all()
-        )
+        logger.info("⚙️ Scene concurrency: %d", scene_concurrency)
 
-        if not scenes:
-            raise Exception("No scenes found")
+        # Narration + merge intermediates live in one job workspace
+        with video_merger.workspace(campaign_id):
+            scene_video_urls, scene_voice_paths, segments = asyncio.run(
+                _generate_scene_assets(
+                    db,
+                    campaign,
+                    scenes,
+                    business_info,
+                    scene_concurrency,
+                    incremental_merge,
+                    encoding_profile=encoding_profile,
+                )
+            )
 
-        logger.info("✅ %d scenes loaded", len(scenes))
+            if not scene_video_urls:
+                raise Exception("No scene videos generated")
 
-        # --------------------------------------------------
-        # 3️⃣ Generate scene videos + narration
-        # --------------------------------------------------
-        scene_video_urls: list[str] = []
-        scene_voice_paths: list[str] = []
+            # --------------------------------------------------
+            # 3️⃣ Merge final video
+            # --------------------------------------------------
+            final_path = _merge(
+                db, campaign, scene_video_urls, scene_voice_paths, segments,
+                encoding_profile,
+            )
 
-        for scene in scenes:
-            if not scene.selected_image_url:
-                continue
+        return _publish(db, campaign, final_path, encoding_profile)
 
-            logger.info(
-                "🎬 Scene %s: processing started",
-                scene.scene_number,
-            )
+    except Exception:
+        if campaign is not None:
+            campaign.status = "video_failed"
+            db.commit()
+        logger.exception("❌ Campaign %s failed", campaign_id)
+        raise
 
-            motion_prompt = VEO_MOTION_PRESETS.get(
-                "brand", VEO_MOTION_PRESETS["brand"]
-            )
+    finally:
+        db.close()
+
+
+# ==================================================================
+# QUEUE-SPLIT MODE
+# generation queue → merge queue → upload queue
+# ==================================================================
+
+@campaign_timing
+def run_scene_generation(
+    campaign_id: str,
+    business_info: dict | None,
+    scene_concurrency: int | None = None,
+) -> list[dict]:
+    """
+    GENERATION STAGE ONLY (VEO + TTS for every scene)
+    Returns scene results for merge_campaign_video — narration as
+    S3 URLs, so the merge can run on a merge worker.
+    """
 
-            # ---- Video generation (async → sync boundary)
-            video_url = asyncio.run(
-                generate_video_with_retries(
-                    veo3_video_generator,
-                    scene_image_url=scene.selected_image_url,
-                    motion_prompt=motion_prompt,
-                    text_overlays={},
-                    campaign_id=campaign_id,
-                    scene_number=scene.scene_number,
-                    business_info=business_info,
-                    product_type=campaign.product_type or "beauty",
-                    retries=4,
-                    base_delay=6,
+    if scene_concurrency is None:
+        scene_concurrency = DEFAULT_SCENE_CONCURRENCY
+
+    db: Session = SessionLocal()
+    campaign = None
+
+    try:
+        logger.info("▶️ Campaign %s: scene generation started", campaign_id)
+
+        campaign, scenes = _load_campaign_and_scenes(db, campaign_id)
+        scene_numbers = [s.scene_number for s in scenes if s.selected_image_url]
+
+        logger.info("⚙️ Scene concurrency: %d", scene_concurrency)
+
+        with video_merger.workspace(campaign_id):
+            scene_video_urls, scene_voice_urls, _ = asyncio.run(
+                _generate_scene_assets(
+                    db,
+                    campaign,
+                    scenes,
+                    business_info,
+                    scene_concurrency,
+                    local_voices=False,
                 )
             )
 
-            logger.info(
-                "✅ Scene %s: video generated",
-                scene.scene_number,
+        if not scene_video_urls:
+            raise Exception("No scene videos generated")
+
+        return [
+            {
+                "scene_number": scene_number,
+                "video_url": video_url,
+                "voice_url": voice_url,
+            }
+            for scene_number, video_url, voice_url in zip(
+                scene_numbers, scene_video_urls, scene_voice_urls
             )
+        ]
 
-            # ---- Voice generation
-            narration_text = build_scene_narration({}, business_info) or ""
-            voice_path = elevenlabs_tts_service.generate_voice(narration_text)
+    except Exception:
+        if campaign is not None:
+            campaign.status = "video_failed"
+            db.commit()
+        logger.exception("❌ Campaign %s generation failed", campaign_id)
+        raise
 
-            logger.info(
-                "✅ Scene %s: voice generated",
-                scene.scene_number,
+    finally:
+        db.close()
+
+
+# ==================================================================
+# FAN-OUT MODE (one Celery task per scene + chord merge)
+# ==================================================================
+
+def load_campaign_scene_ids(campaign_id: str) -> list[str]:
+    """
+    Marks the campaign as generating and returns the ids of the scenes
+    that go into its video (fan-out dispatch from a worker).
+    """
+
+    db: Session = SessionLocal()
+
+    try:
+        _, scenes = _load_campaign_and_scenes(db, campaign_id)
+        return [s.id for s in scenes]
+    finally:
+        db.close()
+
+
+@campaign_timing
+def generate_scene_assets(
+    campaign_id: str,
+    scene_id: str,
+    business_info: dict | None,
+) -> dict:
+    """
+    SINGLE SCENE PIPELINE (image fetch → VEO → TTS)
+    -----------------------------------------------
+    Runs inside a per-scene Celery task, on any worker.
+    Narration is uploaded to S3 so the merge step can run elsewhere.
+    """
+
+    db: Session = SessionLocal()
+
+    try:
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        if not campaign:
+            raise Exception("Campaign not found")
+
+        scene = db.query(CampaignScene).filter(CampaignScene.id == scene_id).first()
+        if not scene or not scene.selected_image_url:
+            raise Exception(f"Scene {scene_id} has no selected image")
+
+        if campaign.status == "video_queued":
+            campaign.status = "veo_generating"
+            db.commit()
+
+        scene_number = scene.scene_number
+        image_url = scene.selected_image_url
+        product_type = campaign.product_type or "beauty"
+
+        logger.info(
+            "🎬 Campaign %s / scene %s: processing started",
+            campaign_id,
+            scene_number,
+        )
+
+        narration_text = build_scene_narration({}, business_info) or ""
+
+        async def render_video() -> str:
+            if _is_video_checkpointed(scene):
+                logger.info(
+                    "♻️ Scene %s: video already generated, skipping VEO",
+                    scene_number,
+                )
+                return scene.video_url
+
+            video_url = await generate_video_with_retries(
+                veo3_video_generator,
+                scene_image_url=image_url,
+                motion_prompt=VEO_MOTION_PRESETS["brand"],
+                text_overlays={},
+                campaign_id=campaign_id,
+                scene_number=scene_number,
+                business_info=business_info,
+                product_type=product_type,
+                retries=4,
+                base_delay=6,
             )
 
-            # ---- Persist scene result
+            # Checkpoint right away — a TTS failure must not cost a re-render
             scene.video_url = video_url
             scene.status = "video_generated"
             db.commit()
 
-            scene_video_urls.append(video_url)
-            scene_voice_paths.append(voice_path)
+            return video_url
 
-        if not scene_video_urls:
+        async def render() -> tuple[str, tuple[str, str | None]]:
+            threads = _SceneThreads()
+
+            # TTS runs while VEO renders
+            voice_task = asyncio.create_task(
+                threads.run(
+                    _ensure_narration,
+                    product_type,
+                    campaign_id,
+                    scene_number,
+                    narration_text,
+                )
+            )
+
+            video_task = asyncio.create_task(render_video())
+
+            try:
+                # First failure (VEO or TTS) surfaces immediately
+                video_url, voice = await asyncio.gather(video_task, voice_task)
+            except Exception:
+                await _cancel_all([video_task, voice_task])
+                await threads.cancel()
+                raise
+
+            return video_url, voice
+
+        # Merge runs on another worker — only the S3 copy matters,
+        # the local narration goes away with the workspace
+        with timing_context(campaign_id, scene_id, scene_number), \
+                video_merger.workspace(campaign_id):
+            video_url, (voice_url, _) = asyncio.run(render())
+
+        logger.info("✅ Scene %s: video + voice ready", scene_number)
+
+        return {
+            "scene_number": scene_number,
+            "video_url": video_url,
+            "voice_url": voice_url,
+        }
+
+    finally:
+        db.close()
+
+
+@campaign_timing
+def merge_campaign_video(
+    campaign_id: str,
+    scene_results: list[dict],
+    encoding_profile: str | None = None,
+) -> str:
+    """
+    MERGE STAGE — runs once every scene is done (chord callback in
+    fan-out mode). Merges in scene order and returns the local path
+    of the final ad for publish_campaign_video.
+    """
+
+    db: Session = SessionLocal()
+    campaign = None
+
+    try:
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        if not campaign:
+            raise Exception("Campaign not found")
+
+        ordered = sorted(scene_results, key=lambda r: r["scene_number"])
+        if not ordered:
             raise Exception("No scene videos generated")
 
-        # --------------------------------------------------
-        # 4️⃣ Merge final video
-        # --------------------------------------------------
-        campaign.status = "merging_video"
-        db.commit()
-        logger.info("🧩 Merging final video")
+        return _merge(
+            db,
+            campaign,
+            [r["video_url"] for r in ordered],
+            [r["voice_url"] for r in ordered],
+            encoding_profile=encoding_profile,
+        )
+
+    except Exception:
+        if campaign is not None:
+            campaign.status = "video_failed"
+            db.commit()
+        logger.exception("❌ Campaign %s merge failed", campaign_id)
+        raise
 
-        final_path = video_merger.process_full_pipeline(
-            scene_video_urls=scene_video_urls,
-            voice_paths=scene_voice_paths,
-            campaign_id=campaign_id,
-            output_name="final_ad.mp4",
+    finally:
+        db.close()
+
+
+@campaign_timing
+def encode_campaign_segment(
+    campaign_id: str,
+    scene_result: dict,
+    index: int,
+    total: int,
+    encoding_profile: str | None = None,
+) -> dict:
+    """
+    SEGMENT STAGE (distributed merge) — one scene → mezzanine segment
+    on S3. `index` / `total` decide the scene's fades, so every segment
+    is final and the concat step only stream-copies.
+    A segment already on S3 for the same inputs is reused as-is.
+    """
+
+    scene_number = scene_result["scene_number"]
+    key = segment_s3_key(campaign_id, scene_result, index, total, encoding_profile)
+
+    if s3_object_exists(key):
+        logger.info("♻️ Scene %s: saved segment reused", scene_number)
+        return {**scene_result, "index": index, "segment_url": build_s3_url(key)}
+
+    with timing_context(campaign_id, scene_number=scene_number), \
+            video_merger.workspace(campaign_id):
+        segment = video_merger.encode_mezzanine(
+            scene_result["video_url"],
+            scene_result["voice_url"],
+            index,
+            total,
+            encoding_profile,
         )
 
-        final_url = upload_to_s3(final_path)
+        with stage_span("segment_upload") as span:
+            span.bytes_moved = os.path.getsize(segment)
+            segment_url = upload_to_s3(segment, key=key)
+
+    logger.info("🎞️ Scene %s: segment %s/%s encoded", scene_number, index + 1, total)
+
+    return {**scene_result, "index": index, "segment_url": segment_url}
+
+
+@campaign_timing
+def concat_campaign_segments(
+    campaign_id: str,
+    segment_results: list[dict],
+    encoding_profile: str | None = None,
+) -> str:
+    """
+    CONCAT STAGE (distributed merge) — joins the uploaded segments in
+    scene order and returns the local path of the final ad for
+    publish_campaign_video.
+    """
+
+    db: Session = SessionLocal()
+    campaign = None
+
+    try:
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        if not campaign:
+            raise Exception("Campaign not found")
+
+        ordered = sorted(segment_results, key=lambda r: r["index"])
+        if not ordered:
+            raise Exception("No scene segments encoded")
 
-        campaign.final_video_url = final_url
-        campaign.status = "videos_generated"
+        campaign.status = "merging_video"
         db.commit()
+        logger.info("🧩 Concatenating %s segments", len(ordered))
 
-        # ==================================================
-        # DONE
-        # ==================================================
-        logger.info(
-            "🏁 Campaign %s completed successfully",
+        return video_merger.concat_remote_segments(
+            [r["segment_url"] for r in ordered],
             campaign_id,
+            "final_ad.mp4",
+            encoding_profile,
+            _campaign_renditions(campaign),
         )
-        logger.info("✅ Final video URL: %s", final_url)
 
-        return final_url
+    except Exception:
+        if campaign is not None:
+            campaign.status = "video_failed"
+            db.commit()
+        logger.exception("❌ Campaign %s concat failed", campaign_id)
+        raise
+
+    finally:
+        db.close()
+
+
+@campaign_timing
+def publish_campaign_video(
+    campaign_id: str,
+    final_path: str,
+    encoding_profile: str | None = None,
+    final_attempt: bool = True,
+) -> str:
+    """
+    UPLOAD STAGE — pushes the merged ad to S3 and marks the campaign done.
+    Must run where final_path is readable (same host / shared volume
+    as the merge worker). The merged files are kept after a failure
+    unless this is the task's final attempt.
+    """
+
+    db: Session = SessionLocal()
+    campaign = None
+
+    try:
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        if not campaign:
+            raise Exception("Campaign not found")
+
+        return _publish(
+            db, campaign, final_path, encoding_profile, keep_on_error=not final_attempt
+        )
 
     except Exception:
-        campaign.status = "video_failed"
-        db.commit()
-        logger.exception("❌ Campaign %s failed", campaign_id)
+        if final_attempt:
+            # Nothing published (e.g. campaign gone) → still free the disk
+            video_merger.discard_outputs(final_path)
+        if campaign is not None:
+            campaign.status = "video_failed"
+            db.commit()
+        logger.exception("❌ Campaign %s upload failed", campaign_id)
         raise
 
     finally:
         db.close()
+
+
+def mark_campaign_failed(campaign_id: str, error: str | None = None):
+    db: Session = SessionLocal()
+
+    try:
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        if campaign:
+            campaign.status = "video_failed"
+            if error:
+                campaign.generation_error = error
+            db.commit()
+        logger.error("❌ Campaign %s failed: %s", campaign_id, error)
+    finally:
+        db.close()
@@ -1,5 +1,60 @@
+from contextlib import contextmanager
+
+from celery import chain, chord, group
+from celery.signals import task_postrun, task_prerun
+
 from app.celery_app import celery_app
-from app.services.video_worker import run_video_generation
+from app.services.video_worker import (
+    DEFAULT_INCREMENTAL_MERGE,
+    DEFAULT_DISTRIBUTED_MERGE,
+    load_campaign_scene_ids,
+    run_scene_generation,
+    generate_scene_assets,
+    merge_campaign_video,
+    encode_campaign_segment,
+    concat_campaign_segments,
+    publish_campaign_video,
+    mark_campaign_failed,
+)
+from app.services.pipeline_timing import bind_task_retries, reset_task_retries
+
+
+# ------------------------------------------------------------------
+# Timing spans record which Celery retry of the task they ran in
+# ------------------------------------------------------------------
+_retry_tokens = {}
+
+
+@task_prerun.connect
+def _bind_task_retries(task_id=None, task=None, **kwargs):
+    _retry_tokens[task_id] = bind_task_retries(task.request.retries or 0)
+
+
+@task_postrun.connect
+def _reset_task_retries(task_id=None, **kwargs):
+    token = _retry_tokens.pop(task_id, None)
+    if token is not None:
+        reset_task_retries(token)
+
+
+def _is_final_attempt(task) -> bool:
+    max_retries = task.retry_kwargs.get("max_retries", task.max_retries)
+    return task.request.retries >= max_retries
+
+
+@contextmanager
+def _fail_campaign_on_final_attempt(task, campaign_id):
+    """
+    Scene / segment tasks don't own the campaign status, and their chord
+    errback is lost if the chord itself breaks → once the autoretries
+    are used up the task marks the campaign failed itself.
+    """
+    try:
+        yield
+    except Exception as e:
+        if _is_final_attempt(task):
+            mark_campaign_failed(campaign_id, str(e))
+        raise
 
 
 @celery_app.task(
@@ -8,11 +63,194 @@ from app.services.video_worker import run_video_generation
     retry_kwargs={"max_retries": 2, "countdown": 30},
     retry_backoff=True,
 )
-def generate_campaign_video_task(self, campaign_id, business_name, phone_number, website):
-    business_info = {
+def generate_campaign_video_task(
+    self,
+    campaign_id,
+    business_name,
+    phone_number,
+    website,
+    scene_concurrency=None,
+    encoding_profile=None,
+):
+    if DEFAULT_INCREMENTAL_MERGE:
+        # Each scene's segment is encoded on the merge queue as soon as
+        # that scene renders, then concat (merge) → publish (upload):
+        # no ffmpeg work in the I/O-bound generation pool
+        with _fail_campaign_on_final_attempt(self, campaign_id):
+            scene_ids = load_campaign_scene_ids(campaign_id)
+
+        return dispatch_campaign_fanout(
+            campaign_id,
+            scene_ids,
+            business_name,
+            phone_number,
+            website,
+            encoding_profile,
+            distributed=True,
+        ).id
+
+    business_info = _business_info(business_name, phone_number, website)
+
+    # Generation only; ffmpeg + upload continue on their own queues
+    scene_results = run_scene_generation(
+        campaign_id, business_info, scene_concurrency
+    )
+    merge_campaign_video_task.apply_async(
+        (scene_results, campaign_id, encoding_profile),
+        link_error=campaign_video_failed_task.s(campaign_id),
+    )
+
+
+# ------------------------------------------------------------------
+# FAN-OUT MODE
+# One task per scene (spreads across the worker fleet, retried alone)
+# + chord callback that merges once every scene is done
+#
+# Queues (see celery_app): scene tasks → generation,
+# merge → merge, publish → upload
+# ------------------------------------------------------------------
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 2, "countdown": 30},
+    retry_backoff=True,
+)
+def generate_scene_video_task(self, campaign_id, scene_id, business_info):
+    with _fail_campaign_on_final_attempt(self, campaign_id):
+        return generate_scene_assets(campaign_id, scene_id, business_info)
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 2, "countdown": 30},
+    retry_backoff=True,
+)
+def merge_campaign_video_task(self, scene_results, campaign_id, encoding_profile=None):
+    if DEFAULT_DISTRIBUTED_MERGE:
+        # Spread the encode over the merge queue instead of merging here
+        ordered = sorted(scene_results, key=lambda r: r["scene_number"])
+        header = group(
+            encode_segment_task.s(result, campaign_id, i, len(ordered), encoding_profile)
+            for i, result in enumerate(ordered)
+        )
+        return chord(header)(_concat_callback(campaign_id, encoding_profile)).id
+
+    final_path = merge_campaign_video(campaign_id, scene_results, encoding_profile)
+
+    _enqueue_publish(final_path, campaign_id, encoding_profile)
+    return final_path
+
+
+# ------------------------------------------------------------------
+# DISTRIBUTED MERGE (MERGE_DISTRIBUTED=true)
+# One mezzanine encode task per scene on any merge worker, then a
+# stream-copy concat of the uploaded segments → publish
+# ------------------------------------------------------------------
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 2, "countdown": 30},
+    retry_backoff=True,
+)
+def encode_segment_task(self, scene_result, campaign_id, index, total, encoding_profile=None):
+    with _fail_campaign_on_final_attempt(self, campaign_id):
+        return encode_campaign_segment(campaign_id, scene_result, index, total, encoding_profile)
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 2, "countdown": 30},
+    retry_backoff=True,
+)
+def concat_segments_task(self, segment_results, campaign_id, encoding_profile=None):
+    final_path = concat_campaign_segments(campaign_id, segment_results, encoding_profile)
+
+    _enqueue_publish(final_path, campaign_id, encoding_profile)
+    return final_path
+
+
+def _enqueue_publish(final_path, campaign_id, encoding_profile=None):
+    # Upload queue: needs MERGE_WORK_ROOT shared with this worker (see celery_app)
+    publish_campaign_video_task.apply_async(
+        (final_path, campaign_id, encoding_profile),
+        link_error=campaign_video_failed_task.s(campaign_id),
+    )
+
+
+def _concat_callback(campaign_id, encoding_profile):
+    return concat_segments_task.s(campaign_id, encoding_profile).on_error(
+        campaign_video_failed_task.s(campaign_id)
+    )
+
+
+@celery_app.task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_kwargs={"max_retries": 2, "countdown": 30},
+    retry_backoff=True,
+)
+def publish_campaign_video_task(self, final_path, campaign_id, encoding_profile=None):
+    # Earlier attempts keep the merged files for the autoretry
+    return publish_campaign_video(
+        campaign_id, final_path, encoding_profile, _is_final_attempt(self)
+    )
+
+
+@celery_app.task
+def campaign_video_failed_task(request, exc, traceback, campaign_id):
+    mark_campaign_failed(campaign_id, str(exc))
+
+
+def dispatch_campaign_fanout(
+    campaign_id,
+    scene_ids,
+    business_name,
+    phone_number,
+    website,
+    encoding_profile=None,
+    distributed=None,
+):
+    """
+    distributed: encode each scene's segment right after it renders and
+    concat the segments (defaults to MERGE_DISTRIBUTED). Scene re-renders
+    force it so untouched scenes reuse their saved segments.
+    """
+    business_info = _business_info(business_name, phone_number, website)
+
+    if distributed is None:
+        distributed = DEFAULT_DISTRIBUTED_MERGE
+
+    if distributed:
+        # Each scene's segment is encoded as soon as that scene is done
+        total = len(scene_ids)
+        header = group(
+            chain(
+                generate_scene_video_task.s(campaign_id, scene_id, business_info),
+                encode_segment_task.s(campaign_id, i, total, encoding_profile),
+            )
+            for i, scene_id in enumerate(scene_ids)
+        )
+        return chord(header)(_concat_callback(campaign_id, encoding_profile))
+
+    header = group(
+        generate_scene_video_task.s(campaign_id, scene_id, business_info)
+        for scene_id in scene_ids
+    )
+
+    callback = merge_campaign_video_task.s(campaign_id, encoding_profile).on_error(
+        campaign_video_failed_task.s(campaign_id)
+    )
+
+    return chord(header)(callback)
+
+
+def _business_info(business_name, phone_number, website):
+    return {
         "name": business_name,
         "phone": phone_number,
         "website": website,
     } if business_name else None
-
-    run_video_generation(campaign_id, business_info)
\ No newline at end of file
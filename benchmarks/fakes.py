@@ -0,0 +1,370 @@
+"""
+Drop-in fakes for benchmarking the pipeline without provider spend
+
+- SyntheticMedia         → images / clips / narration rendered locally
+                           with ffmpeg lavfi (testsrc2 + sine)
+- LocalS3                → directory-backed S3 client + HTTP server,
+                           so URLs resolve exactly like real S3 URLs
+- FakeNanoBananaGenerator, FakeVEO3VideoGenerator,
+  FakeElevenLabsTTSService
+                         → same public methods as the real services,
+                           configurable latency, same timing spans
+
+install_fakes() must run BEFORE any app.* import that pulls in the real
+services — it registers fake modules in sys.modules so the real SDK
+clients (Gemini, ElevenLabs) are never constructed.
+"""
+
+import io
+import os
+import sys
+import time
+import uuid
+import types
+import random
+import shutil
+import asyncio
+import threading
+import subprocess
+import hashlib
+import functools
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+
+# ------------------------------------------------------------------
+# LATENCY MODEL
+# ------------------------------------------------------------------
+@dataclass
+class Latency:
+    mean: float
+    jitter: float = 0.2     # ± fraction of mean
+
+    def sample(self, rng: random.Random) -> float:
+        if self.mean <= 0:
+            return 0.0
+        spread = self.mean * self.jitter
+        return max(0.0, rng.uniform(self.mean - spread, self.mean + spread))
+
+
+@dataclass
+class FakeLatencies:
+    character: Latency = field(default_factory=lambda: Latency(2.0))
+    scene_image: Latency = field(default_factory=lambda: Latency(2.0))
+    veo_submit: Latency = field(default_factory=lambda: Latency(0.5))
+    veo_render: Latency = field(default_factory=lambda: Latency(10.0))
+    veo_download: Latency = field(default_factory=lambda: Latency(0.5))
+    tts: Latency = field(default_factory=lambda: Latency(1.0))
+
+
+# ------------------------------------------------------------------
+# SYNTHETIC MEDIA (rendered once, copied per call)
+# ------------------------------------------------------------------
+class SyntheticMedia:
+
+    def __init__(
+        self,
+        root: str,
+        width: int = 1280,
+        height: int = 720,
+        fps: int = 24,
+        clip_seconds: float = 8.0,
+        voice_seconds: float = 6.0,
+    ):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+        self.image = os.path.join(root, "template_image.png")
+        self.clip = os.path.join(root, "template_clip.mp4")
+        self.voice = os.path.join(root, "template_voice.mp3")
+
+        if not os.path.exists(self.image):
+            self._ffmpeg(
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}",
+                "-frames:v", "1", self.image,
+            )
+        if not os.path.exists(self.clip):
+            self._ffmpeg(
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={clip_seconds}",
+                "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={clip_seconds}",
+                "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-shortest", self.clip,
+            )
+        if not os.path.exists(self.voice):
+            self._ffmpeg(
+                "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=44100:duration={voice_seconds}",
+                "-c:a", "libmp3lame", "-b:a", "128k", self.voice,
+            )
+
+    @staticmethod
+    def _ffmpeg(*args):
+        subprocess.run(
+            ["ffmpeg", "-y", "-v", "error", *args],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def read(self, path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+
+# ------------------------------------------------------------------
+# LOCAL S3 STAND-IN
+# ------------------------------------------------------------------
+def _client_error_404(operation: str):
+    from botocore.exceptions import ClientError
+    return ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, operation)
+
+
+class LocalS3:
+    """
+    Subset of the boto3 S3 client used by the app, backed by a directory.
+    An HTTP server serves the same directory so public URLs work.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.base_url = None
+        self._server = None
+
+    def _path(self, key: str) -> str:
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    # ---- HTTP side
+    def start_http(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        handler = functools.partial(_QuietHandler, directory=self.root)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        return self.base_url
+
+    def stop_http(self):
+        if self._server:
+            self._server.shutdown()
+
+    # ---- boto3 surface
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, **kwargs):
+        shutil.copyfile(Filename, self._path(Key))
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, **kwargs):
+        with open(self._path(Key), "wb") as f:
+            shutil.copyfileobj(Fileobj, f)
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        data = Body if isinstance(Body, (bytes, bytearray)) else Body.read()
+        with open(self._path(Key), "wb") as f:
+            f.write(data)
+        return {}
+
+    def get_object(self, Bucket, Key, **kwargs):
+        path = os.path.join(self.root, Key)
+        if not os.path.exists(path):
+            raise _client_error_404("GetObject")
+        with open(path, "rb") as f:
+            return {"Body": io.BytesIO(f.read()), "ContentLength": os.path.getsize(path)}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        path = os.path.join(self.root, Key)
+        if not os.path.exists(path):
+            raise _client_error_404("HeadObject")
+        return {"ContentLength": os.path.getsize(path)}
+
+    def download_file(self, Bucket, Key, Filename, **kwargs):
+        path = os.path.join(self.root, Key)
+        if not os.path.exists(path):
+            raise _client_error_404("GetObject")
+        shutil.copyfile(path, Filename)
+
+    # ---- multipart (parts staged under .multipart/<upload id>/)
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = uuid.uuid4().hex
+        os.makedirs(os.path.join(self.root, ".multipart", upload_id))
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        with open(os.path.join(self.root, ".multipart", UploadId, f"{PartNumber:05d}"), "wb") as f:
+            f.write(Body)
+        return {"ETag": f'"{UploadId}-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        staging = os.path.join(self.root, ".multipart", UploadId)
+        with open(self._path(Key), "wb") as out:
+            for part in sorted(MultipartUpload["Parts"], key=lambda p: p["PartNumber"]):
+                with open(os.path.join(staging, f"{part['PartNumber']:05d}"), "rb") as f:
+                    shutil.copyfileobj(f, out)
+        shutil.rmtree(staging, ignore_errors=True)
+        return {}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        shutil.rmtree(os.path.join(self.root, ".multipart", UploadId), ignore_errors=True)
+        return {}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# ------------------------------------------------------------------
+# FAKE PROVIDERS
+# ------------------------------------------------------------------
+class _FakeBase:
+
+    def __init__(self, media: SyntheticMedia, s3: LocalS3, latencies: FakeLatencies, seed: int = 0):
+        self.media = media
+        self.s3 = s3
+        self.latencies = latencies
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def _delay(self, latency: Latency) -> float:
+        with self._rng_lock:
+            return latency.sample(self._rng)
+
+    def _put(self, key: str, data: bytes) -> str:
+        from app.services.s3_service import build_s3_url
+
+        self.s3.put_object(Bucket="bench", Key=key, Body=data)
+        return build_s3_url(key)
+
+
+class FakeNanoBananaGenerator(_FakeBase):
+
+    async def generate_character(self, campaign_id, age, gender, ethnicity, outfit_prompt):
+        from app.services.pipeline_timing import stage_span
+
+        with stage_span("character_generation"):
+            await asyncio.sleep(self._delay(self.latencies.character))
+            return self._put(
+                f"campaigns/characters/{campaign_id}/character_reference.png",
+                self.media.read(self.media.image),
+            )
+
+    async def generate_scene_with_character(
+        self,
+        visual_prompt,
+        character_image_url,
+        scene_number,
+        campaign_id,
+        product_type="beauty",
+        camera_angle="eye level",
+        outfit_reference_url=None,
+    ):
+        from app.services.pipeline_timing import stage_span
+
+        with stage_span("scene_image", scene_number=scene_number):
+            await asyncio.sleep(self._delay(self.latencies.scene_image))
+            return self._put(
+                f"campaigns/{product_type}/{campaign_id}/scene_{scene_number}.png",
+                self.media.read(self.media.image),
+            )
+
+
+class FakeVEO3VideoGenerator(_FakeBase):
+
+    async def generate_video_with_text(
+        self,
+        scene_image_url,
+        motion_prompt,
+        text_overlays,
+        campaign_id,
+        scene_number,
+        business_info=None,
+        product_type="beauty",
+    ):
+        from app.services.pipeline_timing import stage_span
+
+        with stage_span("veo_submit", scene_number=scene_number):
+            await asyncio.sleep(self._delay(self.latencies.veo_submit))
+
+        with stage_span("veo_wait", scene_number=scene_number):
+            await asyncio.sleep(self._delay(self.latencies.veo_render))
+
+        with stage_span("veo_download", scene_number=scene_number) as span:
+            await asyncio.sleep(self._delay(self.latencies.veo_download))
+            video_bytes = self.media.read(self.media.clip)
+            span.bytes_moved = len(video_bytes)
+
+        with stage_span("s3_upload", scene_number=scene_number) as span:
+            url = await asyncio.to_thread(
+                self._put,
+                f"campaigns/{product_type}/{campaign_id}/scene_{scene_number}_"
+                f"{hashlib.sha256(video_bytes).hexdigest()[:16]}_video.mp4",
+                video_bytes,
+            )
+            span.bytes_moved = len(video_bytes)
+
+        from app.services.media_cache import media_cache
+        await asyncio.to_thread(media_cache.put, url, video_bytes)
+
+        return url
+
+
+class FakeElevenLabsTTSService(_FakeBase):
+
+    voice_id = "fake-voice"
+    model_id = "fake-model"
+
+    def generate_voice(self, text: str, output_dir: str = None) -> str:
+        if not output_dir:
+            output_dir = os.getenv("TEMP", "/tmp")
+
+        time.sleep(self._delay(self.latencies.tts))
+
+        output_path = os.path.join(output_dir, f"voice_{uuid.uuid4().hex}.mp3")
+        shutil.copyfile(self.media.voice, output_path)
+        return output_path
+
+
+# ------------------------------------------------------------------
+# INSTALL
+# ------------------------------------------------------------------
+def install_fakes(
+    work_dir: str,
+    latencies: FakeLatencies = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Registers fake provider modules + local S3. Call before importing
+    app.routes / app.services.video_worker / app.tasks.
+    """
+    latencies = latencies or FakeLatencies()
+
+    media = SyntheticMedia(os.path.join(work_dir, "media"))
+    s3 = LocalS3(os.path.join(work_dir, "s3"))
+    os.environ["S3_PUBLIC_BASE_URL"] = s3.start_http()
+
+    fakes = {
+        "nano_banana": FakeNanoBananaGenerator(media, s3, latencies, seed),
+        "veo": FakeVEO3VideoGenerator(media, s3, latencies, seed + 1),
+        "tts": FakeElevenLabsTTSService(media, s3, latencies, seed + 2),
+    }
+
+    _register("app.services.nano_banana_generator", {
+        "NanoBananaGenerator": FakeNanoBananaGenerator,
+        "nano_banana_generator": fakes["nano_banana"],
+    })
+    _register("app.services.veo3_video_generator", {
+        "VEO3VideoGenerator": FakeVEO3VideoGenerator,
+        "veo3_video_generator": fakes["veo"],
+    })
+    _register("app.services.elevenlabs_tts_service", {
+        "ElevenLabsTTSService": FakeElevenLabsTTSService,
+        "elevenlabs_tts_service": fakes["tts"],
+    })
+
+    import app.services.s3_service as s3_service
+    s3_service._s3_client = s3
+
+    return {"media": media, "s3": s3, **fakes}
+
+
+def _register(module_name: str, attrs: dict):
+    module = types.ModuleType(module_name)
+    module.__dict__.update(attrs)
+    sys.modules[module_name] = module
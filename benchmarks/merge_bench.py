@@ -0,0 +1,343 @@
+"""
+Merge / encode throughput benchmark (synthetic corpus, no network)
+
+Renders a deterministic corpus of scene clips + narration with ffmpeg
+lavfi (testsrc2 / sine) at VEO's output size and duration, then runs
+VideoMerger.process_full_pipeline over a grid of:
+
+    engine × scene count × encoding profile × prep workers
+
+Every configuration runs in a fresh child process, so CPU time and peak
+RSS are its own. Per run the report contains wall time, CPU seconds
+(merger + ffmpeg children), peak RSS, peak temp-disk bytes under the
+merge work root and the output size. Results go to JSON so two runs can
+be diffed.
+
+Usage:
+    python -m benchmarks.merge_bench --output before.json
+    python -m benchmarks.merge_bench --engines filtergraph,legacy \\
+        --scenes 3,6 --profiles draft,standard --workers 1,4 --repeat 3
+
+Requires ffmpeg / ffprobe on PATH.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+
+
+# ------------------------------------------------------------------
+# SYNTHETIC CORPUS (deterministic, rendered once per spec)
+# ------------------------------------------------------------------
+def _ffmpeg(*args):
+    subprocess.run(
+        ["ffmpeg", "-y", "-v", "error", *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def build_corpus(root: str, scenes: int, width: int, height: int, fps: int, clip_seconds: float) -> dict:
+    """
+    scene_<i>.mp4 → testsrc2 + tone, one per scene (distinct audio pitch)
+    voice_<i>.mp3 → narration alternating shorter / longer than the clip
+                    (exercises both the pad and the trim path)
+    """
+    corpus_dir = os.path.join(root, f"corpus_{width}x{height}_{fps}fps_{clip_seconds:g}s")
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    clips, voices = [], []
+    for i in range(scenes):
+        clip = os.path.join(corpus_dir, f"scene_{i}.mp4")
+        voice = os.path.join(corpus_dir, f"voice_{i}.mp3")
+
+        if not os.path.exists(clip):
+            _ffmpeg(
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={clip_seconds}",
+                "-f", "lavfi", "-i", f"sine=frequency={330 + 55 * i}:sample_rate=48000:duration={clip_seconds}",
+                "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-shortest", "-fflags", "+bitexact", clip,
+            )
+        if not os.path.exists(voice):
+            voice_seconds = round(clip_seconds * (0.75 + 0.1 * (i % 4)), 2)
+            _ffmpeg(
+                "-f", "lavfi", "-i", f"sine=frequency={180 + 20 * i}:sample_rate=44100:duration={voice_seconds}",
+                "-c:a", "libmp3lame", "-b:a", "128k", "-fflags", "+bitexact", voice,
+            )
+
+        clips.append(clip)
+        voices.append(voice)
+
+    return {"dir": corpus_dir, "clips": clips, "voices": voices}
+
+
+# ------------------------------------------------------------------
+# DISK SAMPLER (peak bytes under the merge work root)
+# ------------------------------------------------------------------
+class DiskSampler:
+
+    def __init__(self, root: str, interval: float = 0.05):
+        self.root = root
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _size(self) -> int:
+        total = 0
+        for dirpath, _, files in os.walk(self.root):
+            for f in files:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, f))
+                except OSError:
+                    pass    # removed mid-walk
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._size())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._size())
+
+
+def _cpu_seconds(who) -> float:
+    r = resource.getrusage(who)
+    return r.ru_utime + r.ru_stime
+
+
+def _rss_mb(who) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return round(resource.getrusage(who).ru_maxrss / scale, 1)
+
+
+# ------------------------------------------------------------------
+# ONE RUN (child process)
+# ------------------------------------------------------------------
+def run_one(config: dict, corpus: dict, work_root: str) -> dict:
+    os.environ["MEDIA_CACHE_ENABLED"] = "false"
+    os.environ["MERGE_MIN_FREE_MB"] = "0"
+
+    from app.services.video_merger import VideoMerger
+
+    shutil.rmtree(work_root, ignore_errors=True)
+    os.makedirs(work_root)
+
+    merger = VideoMerger(
+        engine=config["engine"],
+        work_root=work_root,
+        prep_workers=config["workers"],
+        previews=config["previews"],
+        stream_upload=False,
+    )
+    clips = corpus["clips"][:config["scenes"]]
+    voices = corpus["voices"][:config["scenes"]]
+
+    cpu_self = _cpu_seconds(resource.RUSAGE_SELF)
+    cpu_children = _cpu_seconds(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+
+    with DiskSampler(work_root) as disk:
+        output = merger.process_full_pipeline(
+            scene_video_urls=clips,
+            voice_paths=voices,
+            campaign_id="bench",
+            output_name="final_ad.mp4",
+            profile=config["profile"],
+            renditions=config["renditions"],
+        )
+
+    wall = time.perf_counter() - started
+    cpu_self = _cpu_seconds(resource.RUSAGE_SELF) - cpu_self
+    cpu_children = _cpu_seconds(resource.RUSAGE_CHILDREN) - cpu_children
+
+    derived = [
+        *merger.rendition_paths(output, config["renditions"]).values(),
+        *(merger.preview_paths(output).values() if config["previews"] else []),
+    ]
+    result = {
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu_self + cpu_children, 3),
+        "cpu_seconds_ffmpeg": round(cpu_children, 3),
+        "peak_rss_mb": {
+            "merger": _rss_mb(resource.RUSAGE_SELF),
+            "ffmpeg": _rss_mb(resource.RUSAGE_CHILDREN),
+        },
+        "temp_disk_peak_bytes": disk.peak,
+        "output_bytes": os.path.getsize(output),
+        "derived_bytes": sum(os.path.getsize(p) for p in derived if os.path.exists(p)),
+        "output_duration": round(merger.get_video_duration(output), 3),
+    }
+
+    shutil.rmtree(work_root, ignore_errors=True)
+    return result
+
+
+def _spawn(config: dict, corpus: dict, work_root: str) -> dict:
+    payload = json.dumps({"config": config, "corpus": corpus, "work_root": work_root})
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.merge_bench", "--run-one", payload],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip()[-1000:]}
+    # Merger prints progress → the report is the last stdout line
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ------------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------------
+def _host_info() -> dict:
+    try:
+        ffmpeg = subprocess.run(
+            ["ffmpeg", "-version"], stdout=subprocess.PIPE, text=True
+        ).stdout.splitlines()[0]
+    except (OSError, IndexError):
+        ffmpeg = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": ffmpeg,
+        "commit": commit,
+    }
+
+
+def _csv(value: str, cast=str) -> list:
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def run(args) -> dict:
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="merge_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+
+    scene_counts = _csv(args.scenes, int)
+    corpus = build_corpus(
+        work_dir, max(scene_counts), args.width, args.height, args.fps, args.clip_seconds
+    )
+    renditions = _csv(args.renditions)
+
+    grid = list(itertools.product(
+        _csv(args.engines), scene_counts, _csv(args.profiles), _csv(args.workers, int)
+    ))
+    print(f"🏁 {len(grid)} configurations × {args.repeat} runs  (corpus: {corpus['dir']})")
+
+    results = []
+    for engine, scenes, profile, workers in grid:
+        config = {
+            "engine": engine,
+            "scenes": scenes,
+            "profile": profile,
+            "workers": workers,
+            "previews": args.previews,
+            "renditions": renditions,
+        }
+        runs = [
+            _spawn(config, corpus, os.path.join(work_dir, "work"))
+            for _ in range(args.repeat)
+        ]
+        ok = [r for r in runs if "error" not in r]
+
+        summary = None
+        if ok:
+            summary = {
+                key: statistics.median(r[key] for r in ok)
+                for key in ("wall_seconds", "cpu_seconds", "temp_disk_peak_bytes", "output_bytes")
+            }
+            summary["peak_rss_mb_ffmpeg"] = max(r["peak_rss_mb"]["ffmpeg"] for r in ok)
+
+        label = f"{engine:<11} scenes={scenes:<2} {profile:<8} workers={workers:<2}"
+        if summary:
+            print(
+                f"   {label} {summary['wall_seconds']:>7.2f}s wall  "
+                f"{summary['cpu_seconds']:>7.2f}s cpu  "
+                f"{summary['temp_disk_peak_bytes'] / 1e6:>7.1f} MB disk"
+            )
+        else:
+            print(f"   {label} ❌ {runs[0]['error'][-200:]}")
+
+        results.append({"config": config, "median": summary, "runs": runs})
+
+    return {
+        "host": _host_info(),
+        "corpus": {
+            "width": args.width,
+            "height": args.height,
+            "fps": args.fps,
+            "clip_seconds": args.clip_seconds,
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VideoMerger throughput benchmark on synthetic media")
+    parser.add_argument("--engines", default="filtergraph,legacy")
+    parser.add_argument("--scenes", default="3,5", help="comma-separated scene counts")
+    parser.add_argument("--profiles", default="draft,standard")
+    parser.add_argument("--workers", default="1,4", help="comma-separated prep worker counts")
+    parser.add_argument("--renditions", default="", help="e.g. 9x16_1080,1x1_1080")
+    parser.add_argument("--previews", action="store_true", help="also cut poster / sprite / preview")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=24)
+    parser.add_argument("--clip-seconds", type=float, default=8.0, help="VEO clip length")
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_one:
+        payload = json.loads(args.run_one)
+        result = run_one(payload["config"], payload["corpus"], payload["work_root"])
+        print(json.dumps(result))
+        return 0
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"📄 Report written to {args.output}")
+
+    print(text)
+
+    failed = sum(1 for r in report["results"] if r["median"] is None)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+End-to-end pipeline benchmark (no provider spend)
+
+Drives the real code path:
+    generate_beauty_campaign  → generate_campaign_video_task
+with fake Nano Banana / VEO / ElevenLabs services, a local S3 stand-in
+and SQLite (or Postgres via DATABASE_URL). Celery runs eagerly in-process.
+
+Reports campaigns/hour, per-stage p50/p95 (from PipelineSpan rows) and
+peak RSS as JSON, so runs can be compared before/after a change.
+
+Usage:
+    python -m benchmarks.pipeline_bench --campaigns 6 --parallel 3
+    python -m benchmarks.pipeline_bench --veo-render 30 --output run.json
+
+Requires ffmpeg on PATH (synthetic media + the real merge pipeline).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from benchmarks.fakes import FakeLatencies, Latency, install_fakes
+
+
+# ------------------------------------------------------------------
+# ENVIRONMENT (before any app import)
+# ------------------------------------------------------------------
+def _prepare_env(work_dir: str):
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(work_dir, 'bench.db')}")
+    os.environ.setdefault("S3_CAMPAIGN_BUCKET", "bench")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ.setdefault("TEMP", work_dir)
+    os.environ.setdefault("MEDIA_CACHE_DIR", os.path.join(work_dir, "media_cache"))
+    os.environ.setdefault("MERGE_WORK_ROOT", os.path.join(work_dir, "merge"))
+
+
+def _percentile(values, pct: float):
+    if not values:
+        return None
+    # Nearest rank: ceil(p/100 · n), 1-based
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def _peak_rss_mb() -> dict:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+# ------------------------------------------------------------------
+# ONE CAMPAIGN (images → video task)
+# ------------------------------------------------------------------
+def _run_campaign(args, index: int) -> dict:
+    import asyncio
+    from app.database import SessionLocal
+    from app.models.campaign import Campaign
+    from app.routes.campaign import generate_beauty_campaign
+    from app.tasks.video_tasks import generate_campaign_video_task
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    campaign_id = None
+
+    try:
+        result = asyncio.run(generate_beauty_campaign(
+            business_type=args.business_type,
+            campaign_theme="Bench",
+            character_age="28-32",
+            character_gender="woman",
+            character_ethnicity="indian",
+            character_style="professional, natural",
+            num_scenes=args.scenes,
+            db=db,
+        ))
+        campaign_id = result["campaign_id"]
+
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        campaign.status = "video_queued"
+        db.commit()
+
+        generate_campaign_video_task.apply(
+            args=(campaign_id, f"Bench Salon {index}", "555-0100", "example.com"),
+            kwargs={"scene_concurrency": args.scene_concurrency},
+            throw=True,
+        )
+
+        db.expire_all()
+        campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+        status = campaign.status
+    except Exception as e:
+        print(f"❌ Campaign {index} failed: {e}")
+        status = "failed"
+    finally:
+        db.close()
+
+    return {
+        "campaign_id": campaign_id,
+        "status": status,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def _stage_stats(campaign_ids) -> dict:
+    from app.database import SessionLocal
+    from app.models.campaign import PipelineSpan
+    from app.services.pipeline_timing import flush_spans
+
+    # Spans are written by a background thread
+    flush_spans()
+
+    db = SessionLocal()
+    try:
+        spans = (
+            db.query(PipelineSpan)
+            .filter(PipelineSpan.campaign_id.in_(campaign_ids))
+            .all()
+        )
+    finally:
+        db.close()
+
+    by_stage: dict = {}
+    for s in spans:
+        by_stage.setdefault(s.stage, []).append(s)
+
+    stats = {}
+    for stage, rows in sorted(by_stage.items()):
+        durations = [r.duration_ms or 0 for r in rows]
+        stats[stage] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if r.status != "ok"),
+            "p50_ms": _percentile(durations, 50),
+            "p95_ms": _percentile(durations, 95),
+            "max_ms": max(durations),
+            "bytes_moved": sum(r.bytes_moved or 0 for r in rows),
+        }
+    return stats
+
+
+# ------------------------------------------------------------------
+# MAIN
+# ------------------------------------------------------------------
+def run(args) -> dict:
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="pipeline_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    _prepare_env(work_dir)
+
+    scale = args.latency_scale
+    latencies = FakeLatencies(
+        character=Latency(args.image_latency * scale, args.jitter),
+        scene_image=Latency(args.image_latency * scale, args.jitter),
+        veo_submit=Latency(0.5 * scale, args.jitter),
+        veo_render=Latency(args.veo_render * scale, args.jitter),
+        veo_download=Latency(0.5 * scale, args.jitter),
+        tts=Latency(args.tts_latency * scale, args.jitter),
+    )
+    install_fakes(work_dir, latencies=latencies, seed=args.seed)
+
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (register tables)
+    from app.celery_app import celery_app
+
+    Base.metadata.create_all(bind=engine)
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+
+    print(f"🏁 {args.campaigns} campaigns × {args.scenes} scenes, {args.parallel} in parallel")
+    print(f"   work dir: {work_dir}")
+
+    results = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.parallel, thread_name_prefix="bench") as pool:
+        futures = [pool.submit(_run_campaign, args, i) for i in range(args.campaigns)]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            print(f"   {r['status']:<18} {r['campaign_id']}  {r['seconds']}s")
+
+    wall = time.perf_counter() - started
+    completed = [r for r in results if r["status"] == "videos_generated"]
+
+    report = {
+        "config": {
+            "campaigns": args.campaigns,
+            "parallel": args.parallel,
+            "scenes": args.scenes,
+            "scene_concurrency": args.scene_concurrency,
+            "latency_scale": scale,
+            "veo_render_s": args.veo_render,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "env": {
+                k: os.environ[k] for k in sorted(os.environ)
+                if k.startswith(("VIDEO_", "TTS_", "SEGMENT_", "MERGE_", "FFMPEG_", "ENCODING_", "MEDIA_", "HLS_", "S3_MULTIPART_"))
+            },
+        },
+        "wall_seconds": round(wall, 2),
+        "completed": len(completed),
+        "failed": len(results) - len(completed),
+        "campaigns_per_hour": round(len(completed) / wall * 3600, 2) if wall else None,
+        "campaign_seconds": {
+            "p50": _percentile([r["seconds"] for r in completed], 50),
+            "p95": _percentile([r["seconds"] for r in completed], 95),
+        },
+        "stages": _stage_stats([r["campaign_id"] for r in results if r["campaign_id"]]),
+        "peak_rss_mb": _peak_rss_mb(),
+        "threads_alive": threading.active_count(),
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with fake providers")
+    parser.add_argument("--campaigns", type=int, default=4)
+    parser.add_argument("--parallel", type=int, default=2, help="campaigns running at once")
+    parser.add_argument("--scenes", type=int, default=3)
+    parser.add_argument("--scene-concurrency", type=int, default=None)
+    parser.add_argument("--business-type", default="nail salon")
+    parser.add_argument("--image-latency", type=float, default=2.0, help="seconds per Nano Banana call")
+    parser.add_argument("--veo-render", type=float, default=10.0, help="seconds per VEO render")
+    parser.add_argument("--tts-latency", type=float, default=1.0, help="seconds per TTS call")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplies every fake latency")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"📄 Report written to {args.output}")
+
+    print(text)
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
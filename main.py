@@ -6,7 +6,7 @@ from app.routes import campaign
 from dotenv import load_dotenv
 import os
 from app.services.file_cleanup import file_cleanup_service
-from app.database import Base, engine
+from app.database import prepare_schema
 
 
 load_dotenv()
@@ -24,8 +24,8 @@ from fastapi import FastAPI
 # all other imports below
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables (+ new nullable columns on existing tables)
+prepare_schema()
 
 app = FastAPI(
     title="Commercial Video Generator API",
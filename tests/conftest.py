@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Repo root on sys.path → `import app...` without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level singletons read their config at import time
+_TMP = tempfile.mkdtemp(prefix="ai_backend_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP, 'tests.db')}")
+os.environ.setdefault("FFMPEG_SLOT_DIR", os.path.join(_TMP, "cpu_slots"))
+os.environ.setdefault("MEDIA_CACHE_DIR", os.path.join(_TMP, "media_cache"))
+os.environ.setdefault("MERGE_WORK_ROOT", os.path.join(_TMP, "merge"))
+
+# Provider clients are built at import; nothing here calls them
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("ELEVENLABS_API_KEY", "test")
+
+
+@pytest.fixture
+def db():
+    """Session on a freshly created schema (SQLite unless DATABASE_URL is set)."""
+    from app.database import Base, SessionLocal, engine, prepare_schema
+
+    prepare_schema()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,133 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.models.campaign import Campaign, CampaignScene
+from app.routes import campaign as campaign_routes
+from app.services import video_worker
+from app.services.elevenlabs_tts_service import elevenlabs_tts_service
+
+SAVED_VIDEO = "https://example.com/campaigns/beauty/c1/scene_1_0123456789abcdef_video.mp4"
+SAVED_VOICE = "https://example.com/campaigns/beauty/c1/narration/scene_1_fedcba9876543210.mp3"
+
+
+@pytest.fixture
+def campaign(db):
+    db.add(Campaign(
+        id="c1", user_prompt="spring promo", product_type="beauty", num_scenes=2,
+        character_image_url="https://example.com/character.png", status="images_generated",
+    ))
+    db.add(CampaignScene(
+        id="s1", campaign_id="c1", scene_number=1, selected_image_url="https://example.com/1.png",
+        video_url=SAVED_VIDEO, status="video_generated",
+    ))
+    db.add(CampaignScene(
+        id="s2", campaign_id="c1", scene_number=2, selected_image_url="https://example.com/2.png",
+        status="image_selected",
+    ))
+    db.commit()
+    return "c1"
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Fake VEO + saved narration; records which scenes hit VEO."""
+    veo_calls = []
+
+    async def generate_video_with_retries(generator, scene_number, **kwargs):
+        veo_calls.append(scene_number)
+        return f"https://example.com/veo/scene_{scene_number}.mp4"
+
+    monkeypatch.setattr(video_worker, "generate_video_with_retries", generate_video_with_retries)
+    monkeypatch.setattr(
+        video_worker, "_ensure_narration", lambda *args: (SAVED_VOICE, None)
+    )
+    return veo_calls
+
+
+def _scene(db, scene_id):
+    db.expire_all()
+    return db.get(CampaignScene, scene_id)
+
+
+def test_checkpointed_scene_skips_veo(db, campaign, providers):
+    result = video_worker.generate_scene_assets(campaign, "s1", None)
+
+    assert providers == []
+    assert result == {"scene_number": 1, "video_url": SAVED_VIDEO, "voice_url": SAVED_VOICE}
+
+
+def test_rendered_scene_is_checkpointed(db, campaign, providers):
+    result = video_worker.generate_scene_assets(campaign, "s2", None)
+
+    assert providers == [2]
+    assert _scene(db, "s2").status == "video_generated"
+    assert _scene(db, "s2").video_url == result["video_url"]
+
+    # A retry of the same scene no longer pays for VEO
+    video_worker.generate_scene_assets(campaign, "s2", None)
+    assert providers == [2]
+
+
+def _narration_key(text="Visit Glow Studio"):
+    return video_worker._narration_s3_key("beauty", "c1", 1, text)
+
+
+def test_narration_key_is_stable():
+    assert _narration_key() == _narration_key()
+    assert _narration_key().startswith("campaigns/beauty/c1/narration/scene_1_")
+
+
+@pytest.mark.parametrize("attr", ["voice_id", "model_id"])
+def test_new_voice_or_model_gives_a_new_narration_key(monkeypatch, attr):
+    before = _narration_key()
+    monkeypatch.setattr(elevenlabs_tts_service, attr, "something-else")
+    assert _narration_key() != before
+
+
+def test_new_text_gives_a_new_narration_key():
+    assert _narration_key("Visit Glow Studio") != _narration_key("Call Glow Studio today")
+
+
+def test_saved_narration_is_reused(monkeypatch):
+    def generate_voice(*args, **kwargs):
+        raise AssertionError("TTS must not run for a saved narration")
+
+    monkeypatch.setattr(video_worker, "s3_object_exists", lambda key: True)
+    monkeypatch.setattr(elevenlabs_tts_service, "generate_voice", generate_voice)
+
+    voice_url, local_path = video_worker._ensure_narration("beauty", "c1", 1, "Visit Glow Studio")
+
+    assert local_path is None
+    assert voice_url.endswith(_narration_key())
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from app.tasks import video_tasks
+
+    queued = []
+    monkeypatch.setattr(
+        video_tasks.generate_campaign_video_task, "delay", lambda *args: queued.append(args)
+    )
+
+    app = FastAPI()
+    app.include_router(campaign_routes.router)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+    client.queued = queued
+    return client
+
+
+@pytest.mark.parametrize("resume, kept", [("false", None), ("true", SAVED_VIDEO)])
+def test_resume_flag_decides_scene_checkpoints(db, campaign, client, resume, kept):
+    response = client.post(
+        f"/api/campaign/generate_campaign_videos/{campaign}",
+        params={"resume": resume, "fan_out": "false"},
+    )
+
+    assert response.status_code == 200
+    assert len(client.queued) == 1
+    assert _scene(db, "s1").video_url == kept
+    assert _scene(db, "s1").status == ("video_generated" if kept else "image_selected")
@@ -0,0 +1,69 @@
+import pytest
+
+from app.services.cpu_slots import CpuSlots, fcntl, granted_threads
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="flock not available")
+
+
+def _slots(tmp_path, slots=4, job_threads=2, wait=0.2):
+    return CpuSlots(slots=slots, slot_dir=str(tmp_path), job_threads=job_threads,
+                    wait=wait, enabled=True)
+
+
+def test_grant_is_carried_in_context(tmp_path):
+    slots = _slots(tmp_path)
+    assert granted_threads() is None
+
+    with slots.acquire() as threads:
+        assert threads == 2
+        assert granted_threads() == 2
+
+    assert granted_threads() is None
+
+
+def test_nested_acquire_reuses_outer_grant(tmp_path):
+    slots = _slots(tmp_path, slots=2, job_threads=2)
+
+    with slots.acquire() as outer:
+        # Every slot is held by the outer grant: a fresh take would time out
+        with slots.acquire(want=1) as inner:
+            assert inner == outer == 2
+
+
+def test_slots_are_released_on_exit(tmp_path):
+    slots = _slots(tmp_path, slots=2, job_threads=2)
+
+    with slots.acquire():
+        assert slots._try_take(2) == []
+
+    fds = slots._try_take(2)
+    assert len(fds) == 2
+    slots._release(fds)
+
+
+def test_partial_grant_when_host_is_busy(tmp_path):
+    slots = _slots(tmp_path, slots=3, job_threads=3)
+    held = slots._try_take(2)
+    try:
+        with slots.acquire() as threads:
+            assert threads == 1
+    finally:
+        slots._release(held)
+
+
+def test_times_out_when_every_slot_is_held(tmp_path):
+    slots = _slots(tmp_path, slots=2, wait=0.1)
+    held = slots._try_take(2)
+    try:
+        with pytest.raises(RuntimeError, match="No ffmpeg CPU slot free"):
+            with slots.acquire():
+                pass
+    finally:
+        slots._release(held)
+
+
+def test_disabled_yields_none(tmp_path):
+    slots = CpuSlots(slots=2, slot_dir=str(tmp_path), enabled=False)
+    with slots.acquire() as threads:
+        assert threads is None
+        assert granted_threads() is None
@@ -0,0 +1,145 @@
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from app.services import ffmpeg_runner
+from app.services import video_merger as merger_module
+from app.services.ffmpeg_runner import STDERR_TAIL_LINES, FFmpegError, run_ffmpeg
+from app.services.media_probe import MediaInfo
+from app.services.video_merger import SceneInput, VideoMerger
+
+_PRELUDE = """\
+import os, sys, time
+args = sys.argv[1:]
+fd = int(args[args.index("-progress") + 1].split(":")[1])
+progress = os.fdopen(fd, "w", buffering=1)
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    """Installs a python script as FFMPEG_BINARY; `body` drives it."""
+
+    def install(body: str):
+        path = tmp_path / "ffmpeg"
+        path.write_text(f"#!{sys.executable}\n" + _PRELUDE + textwrap.dedent(body))
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setattr(ffmpeg_runner, "FFMPEG_BINARY", str(path))
+
+    return install
+
+
+def test_progress_pipe_is_parsed(fake_ffmpeg):
+    fake_ffmpeg("""
+        for line in ["out_time_us=2000000", "speed=1.5x", "progress=continue",
+                     "out_time_ms=4000000", "speed=2x", "progress=end"]:
+            progress.write(line + "\\n")
+    """)
+    reported = []
+
+    result = run_ffmpeg(["out.mp4"], step="encode", duration=4.0, on_progress=reported.append)
+
+    assert result.returncode == 0
+    assert result.out_time == pytest.approx(4.0)
+    assert result.speed == "2x"
+    assert reported == [pytest.approx(50.0), pytest.approx(100.0)]
+
+
+def test_failure_carries_the_stderr_tail(fake_ffmpeg):
+    fake_ffmpeg("""
+        for i in range(60):
+            sys.stderr.write(f"line {i}\\n")
+        sys.stderr.write("Conversion failed!\\n")
+        sys.exit(1)
+    """)
+
+    with pytest.raises(FFmpegError) as err:
+        run_ffmpeg(["out.mp4"], step="concat")
+
+    e = err.value
+    assert e.step == "concat" and e.returncode == 1 and e.timed_out is None
+    assert e.stderr_tail.endswith("Conversion failed!")
+    assert len(e.stderr_tail.splitlines()) == STDERR_TAIL_LINES
+    assert "line 0\n" not in e.stderr_tail
+    assert "ffmpeg concat failed (exit code 1)" in str(e)
+
+
+def test_stalled_process_is_killed(fake_ffmpeg):
+    fake_ffmpeg("""
+        progress.write("progress=continue\\n")
+        time.sleep(30)
+    """)
+
+    with pytest.raises(FFmpegError) as err:
+        run_ffmpeg(["out.mp4"], step="fade", timeout=30, stall_timeout=1)
+
+    assert "without progress" in err.value.timed_out
+
+
+def test_wall_clock_timeout_applies_despite_progress(fake_ffmpeg):
+    fake_ffmpeg("""
+        while True:
+            progress.write("progress=continue\\n")
+            time.sleep(0.2)
+    """)
+
+    with pytest.raises(FFmpegError) as err:
+        run_ffmpeg(["out.mp4"], step="encode", timeout=1, stall_timeout=None)
+
+    assert "timeout" in err.value.timed_out
+
+
+def test_stall_watchdog_can_be_switched_off(fake_ffmpeg):
+    fake_ffmpeg("""
+        time.sleep(2.5)
+        progress.write("progress=end\\n")
+    """)
+
+    result = run_ffmpeg(["out.mp4"], step="encode", timeout=30, stall_timeout=0)
+    assert result.returncode == 0
+
+
+def test_stdout_consumer_runs_while_ffmpeg_writes(fake_ffmpeg):
+    fake_ffmpeg("""
+        sys.stdout.buffer.write(b"x" * 100000)
+        sys.stdout.flush()
+    """)
+
+    result = run_ffmpeg(["pipe:1"], step="encode", stdout_consumer=lambda out: len(out.read()))
+    assert result.stdout_result == 100000
+
+
+def test_streamed_encode_uses_the_stream_stall_limit(tmp_path, monkeypatch):
+    calls = []
+
+    class Upload:
+        def __init__(self, key):
+            pass
+
+        def write_from(self, stream):
+            return 0
+
+        def complete(self):
+            return "https://example.com/final_ad.mp4"
+
+        def abort(self):
+            pass
+
+    def run(args, step, **kwargs):
+        calls.append(kwargs)
+        return ffmpeg_runner.FFmpegResult(step, 0, 0, 0, 0, 0, "", stdout_result=0)
+
+    monkeypatch.setattr(merger_module, "run_ffmpeg", run)
+    monkeypatch.setattr(merger_module, "MultipartStreamUpload", Upload)
+    info = MediaInfo(path="v.mp4", duration=4.0, format_name="mp4", width=1280, height=720)
+    scene = SceneInput(video_path="v.mp4", voice_path="a.mp3", duration=4.0, info=info)
+
+    merger = VideoMerger(work_root=str(tmp_path), previews=False)
+    output = merger.render_single_pass([scene], "c1", "final_ad.mp4", stream_upload=True)
+
+    assert calls[0]["stall_timeout"] == ffmpeg_runner.FFMPEG_STREAM_STALL_TIMEOUT
+    assert calls[0]["stall_timeout"] != ffmpeg_runner.FFMPEG_STALL_TIMEOUT
+    assert merger.stream_manifest(output)["url"] == "https://example.com/final_ad.mp4"
+    merger.discard_outputs(output)
@@ -0,0 +1,57 @@
+from app.services.media_probe import MediaInfo
+from app.services.video_merger import FADE_DURATION, SceneInput, VideoMerger
+
+
+def _scene(i, duration=5.0, width=1280, height=720):
+    info = MediaInfo(path=f"v{i}.mp4", duration=duration, format_name="mp4",
+                     video_codec="h264", width=width, height=height)
+    return SceneInput(video_path=f"v{i}.mp4", voice_path=f"a{i}.mp3", duration=duration, info=info)
+
+
+def _graph(tmp_path, scenes, music_volume=None):
+    merger = VideoMerger(engine="filtergraph", work_root=str(tmp_path))
+    return merger._build_filtergraph(scenes, music_volume).split(";")
+
+
+def test_fades_only_between_scenes(tmp_path):
+    parts = _graph(tmp_path, [_scene(0), _scene(1), _scene(2)])
+    video = [p for p in parts if p.endswith(("[v0]", "[v1]", "[v2]"))]
+
+    assert "fade=t=in" not in video[0] and "fade=t=out" in video[0]
+    assert "fade=t=in" in video[1] and "fade=t=out" in video[1]
+    assert "fade=t=in" in video[2] and "fade=t=out" not in video[2]
+    assert f"fade=t=out:st={5.0 - FADE_DURATION}:d={FADE_DURATION}" in video[0]
+
+
+def test_single_scene_has_no_fades(tmp_path):
+    parts = _graph(tmp_path, [_scene(0)])
+    assert not any("fade=" in p for p in parts)
+
+
+def test_voice_inputs_follow_video_inputs(tmp_path):
+    parts = _graph(tmp_path, [_scene(0, duration=4.0), _scene(1)])
+
+    assert parts[1].startswith("[2:a]") and parts[1].endswith("[a0]")
+    assert parts[3].startswith("[3:a]") and parts[3].endswith("[a1]")
+    assert "apad=whole_dur=4.0" in parts[1] and "atrim=end=4.0" in parts[1]
+
+
+def test_scale_only_when_resolution_differs(tmp_path):
+    parts = _graph(tmp_path, [_scene(0), _scene(1), _scene(2, width=1920, height=1080)])
+
+    assert "scale=" not in parts[0]
+    assert "scale=" not in parts[2]
+    assert "scale=1280:720" in parts[4]
+
+
+def test_concat_without_music(tmp_path):
+    parts = _graph(tmp_path, [_scene(0), _scene(1)])
+    assert parts[-1] == "[v0][a0][v1][a1]concat=n=2:v=1:a=1[vout][aout]"
+
+
+def test_music_is_mixed_after_concat(tmp_path):
+    parts = _graph(tmp_path, [_scene(0), _scene(1)], music_volume=0.2)
+
+    assert parts[-3].endswith("[vout][acat]")
+    assert parts[-2].startswith("[4:a]") and "volume=0.2" in parts[-2]
+    assert parts[-1] == "[acat][mus]amix=inputs=2:duration=first:dropout_transition=0[aout]"
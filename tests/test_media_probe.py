@@ -0,0 +1,148 @@
+import json
+import os
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import media_probe as probe_module
+from app.services.media_probe import MediaProbe, MediaProbeError, _parse
+
+FFPROBE_OUTPUT = {
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "8.041667", "bit_rate": "2451234"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1280, "height": 720,
+         "avg_frame_rate": "30000/1001", "r_frame_rate": "30/1", "pix_fmt": "yuv420p"},
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "44100",
+         "channels": 2, "channel_layout": "stereo"},
+        {"codec_type": "audio", "codec_name": "mp3", "sample_rate": "48000", "channels": 1},
+    ],
+}
+
+
+def test_ffprobe_json_is_parsed():
+    info = _parse("v.mp4", FFPROBE_OUTPUT)
+
+    assert info.duration == pytest.approx(8.041667)
+    assert info.bit_rate == 2451234
+    assert (info.video_codec, info.resolution, info.pix_fmt) == ("h264", "1280x720", "yuv420p")
+    assert info.fps == pytest.approx(29.97, abs=0.001)
+    assert [a.codec for a in info.audio_streams] == ["aac", "mp3"]
+    assert info.audio_streams[0].sample_rate == 44100
+    assert info.audio_streams[0].channel_layout == "stereo"
+    assert info.stream_signature() == ("h264", 1280, 720, 29.97, "yuv420p", "aac", 44100, 2)
+
+
+def test_frame_rate_and_duration_fallbacks():
+    data = {
+        "format": {"format_name": "mp4", "duration": "N/A"},
+        "streams": [{"codec_type": "video", "codec_name": "h264", "duration": "5.0",
+                     "avg_frame_rate": "0/0", "r_frame_rate": "24/1"}],
+    }
+    info = _parse("v.mp4", data)
+
+    assert info.duration == 5.0
+    assert info.fps == 24.0
+    assert not info.has_audio and info.bit_rate is None
+
+
+def test_audio_only_file():
+    data = {"format": {"format_name": "mp3", "duration": "3.2"},
+            "streams": [{"codec_type": "audio", "codec_name": "mp3", "sample_rate": "n/a"}]}
+    info = _parse("a.mp3", data)
+
+    assert not info.has_video and info.resolution is None
+    assert info.audio_streams[0].sample_rate is None
+
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"format": {"duration": ""}, "streams": []},
+    {"format": {"duration": "N/A"}, "streams": [{"codec_type": "audio", "codec_name": "aac"}]},
+])
+def test_missing_duration_raises(data):
+    with pytest.raises(MediaProbeError, match="No duration"):
+        _parse("broken.mp4", data)
+
+
+@pytest.fixture
+def ffprobe(monkeypatch):
+    """Fake subprocess.run; `.result` is returned, `.calls` counts runs."""
+    fake = SimpleNamespace(calls=[], result=None, raises=None)
+
+    def run(cmd, **kwargs):
+        fake.calls.append(cmd[-1])
+        if fake.raises:
+            raise fake.raises
+        return fake.result
+
+    fake.result = SimpleNamespace(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT), stderr="")
+    monkeypatch.setattr(probe_module.subprocess, "run", run)
+    return fake
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "scene.mp4"
+    path.write_bytes(b"v1")
+    return path
+
+
+def test_probe_is_cached_per_file_version(ffprobe, media):
+    probe = MediaProbe()
+
+    first = probe.probe(str(media))
+    assert probe.probe(str(media)) is first
+    assert len(ffprobe.calls) == 1
+
+    # Rewritten file (new size / mtime) → probed again
+    media.write_bytes(b"version 2")
+    os.utime(media, ns=(0, 123_000_000_000))
+    probe.probe(str(media))
+    assert len(ffprobe.calls) == 2
+
+
+def test_cache_follows_the_real_path(ffprobe, media, tmp_path):
+    link = tmp_path / "link.mp4"
+    link.symlink_to(media)
+    probe = MediaProbe()
+
+    probe.probe(str(media))
+    probe.probe(str(link))
+    assert len(ffprobe.calls) == 1
+
+
+def test_cache_is_bounded(ffprobe, tmp_path):
+    probe = MediaProbe(max_entries=1)
+    a, b = tmp_path / "a.mp4", tmp_path / "b.mp4"
+    a.write_bytes(b"a")
+    b.write_bytes(b"b")
+
+    probe.probe(str(a))
+    probe.probe(str(b))
+    probe.probe(str(a))
+    assert ffprobe.calls == [str(a), str(b), str(a)]
+
+
+def test_missing_file_raises_without_running_ffprobe(ffprobe, tmp_path):
+    with pytest.raises(MediaProbeError, match="Cannot probe"):
+        MediaProbe().probe(str(tmp_path / "missing.mp4"))
+    assert ffprobe.calls == []
+
+
+@pytest.mark.parametrize("result, raises, message", [
+    (SimpleNamespace(returncode=1, stdout="", stderr="moov atom not found"), None, "moov atom not found"),
+    (SimpleNamespace(returncode=0, stdout="not json", stderr=""), None, "Unreadable ffprobe output"),
+    (None, subprocess.TimeoutExpired("ffprobe", 30), "timed out"),
+])
+def test_ffprobe_failures_raise_media_probe_error(ffprobe, media, result, raises, message):
+    ffprobe.result, ffprobe.raises = result, raises
+    probe = MediaProbe()
+
+    with pytest.raises(MediaProbeError, match=message):
+        probe.probe(str(media))
+
+    # Failures are not cached
+    ffprobe.result = SimpleNamespace(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT), stderr="")
+    ffprobe.raises = None
+    assert probe.probe(str(media)).video_codec == "h264"
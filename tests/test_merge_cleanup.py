@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from app.services import video_merger as merger_module
+from app.services.ffmpeg_runner import FFmpegError
+from app.services.media_probe import MediaInfo
+from app.services.video_merger import SceneInput, VideoMerger
+
+
+@pytest.fixture
+def work_root(tmp_path):
+    root = tmp_path / "merge"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def failing_ffmpeg(monkeypatch, work_root):
+    """Writes a partial file for every output under work_root, then fails."""
+    calls = []
+
+    def run_ffmpeg(args, step, **kwargs):
+        calls.append(step)
+        for arg in args:
+            if isinstance(arg, str) and arg.startswith(str(work_root)) and not os.path.exists(arg):
+                with open(arg, "wb") as f:
+                    f.write(b"partial")
+        raise FFmpegError(step, 1, "Conversion failed!")
+
+    monkeypatch.setattr(merger_module, "run_ffmpeg", run_ffmpeg)
+    return calls
+
+
+def _info(path, duration=4.0):
+    return MediaInfo(path=path, duration=duration, format_name="mp4",
+                     video_codec="h264", width=1280, height=720)
+
+
+def _scenes(tmp_path, n=2):
+    return [
+        SceneInput(video_path=str(tmp_path / f"v{i}.mp4"), voice_path=str(tmp_path / f"a{i}.mp3"),
+                   duration=4.0, info=_info(str(tmp_path / f"v{i}.mp4")))
+        for i in range(n)
+    ]
+
+
+def test_single_pass_failure_leaves_no_outputs(tmp_path, work_root, failing_ffmpeg):
+    merger = VideoMerger(work_root=str(work_root), previews=True, stream_upload=False)
+
+    with pytest.raises(FFmpegError):
+        merger.render_single_pass(_scenes(tmp_path), "c1", "final_ad.mp4", renditions=["9x16_1080"])
+
+    assert failing_ffmpeg == ["encode"]
+    assert os.listdir(work_root) == []
+
+
+def test_streamed_encode_failure_aborts_and_leaves_no_outputs(
+    tmp_path, work_root, failing_ffmpeg, monkeypatch
+):
+    aborted = []
+
+    class Upload:
+        def __init__(self, key):
+            self.key = key
+
+        def write_from(self, stream):
+            return 0
+
+        def abort(self):
+            aborted.append(self.key)
+
+    monkeypatch.setattr(merger_module, "MultipartStreamUpload", Upload)
+    merger = VideoMerger(work_root=str(work_root), previews=True)
+
+    with pytest.raises(FFmpegError):
+        merger.render_single_pass(_scenes(tmp_path), "c1", "final_ad.mp4", stream_upload=True)
+
+    assert len(aborted) == 1
+    assert os.listdir(work_root) == []
+
+
+def test_concat_failure_leaves_no_outputs(tmp_path, work_root, failing_ffmpeg):
+    merger = VideoMerger(work_root=str(work_root), previews=True)
+
+    with merger.workspace("c1"), pytest.raises(FFmpegError):
+        merger.concat_segments([str(tmp_path / "seg_0.mp4")], "c1", "final_ad.mp4")
+
+    assert failing_ffmpeg == ["concat"]
+    assert os.listdir(work_root) == []
+
+
+def test_derivatives_failure_keeps_only_the_master(tmp_path, work_root, failing_ffmpeg, monkeypatch):
+    merger = VideoMerger(work_root=str(work_root), previews=True)
+    master = work_root / "c1_final_ad.mp4"
+    master.write_bytes(b"master")
+    monkeypatch.setattr(merger, "probe", _info)
+
+    with pytest.raises(FFmpegError):
+        merger.render_derivatives(str(master), ["1x1_1080"])
+
+    assert os.listdir(work_root) == [master.name]
+
+
+def test_discard_outputs_removes_every_sibling(work_root):
+    merger = VideoMerger(work_root=str(work_root), previews=True)
+    master = str(work_root / "c1_final_ad.mp4")
+    siblings = [
+        master,
+        merger.stream_manifest_path(master),
+        *merger.rendition_paths(master, ["9x16_1080", "1x1_720"]).values(),
+        *merger.preview_paths(master).values(),
+    ]
+    for path in siblings:
+        open(path, "wb").close()
+
+    merger.discard_outputs(master)
+    assert os.listdir(work_root) == []
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.operation_poller import OperationPoller
+
+
+def _poller(**kwargs):
+    defaults = dict(expected_seconds=60.0, min_interval=2.0, max_interval=15.0)
+    defaults.update(kwargs)
+    return OperationPoller(lambda op: op, **defaults)
+
+
+@pytest.mark.parametrize("elapsed, interval", [
+    (0.0, 15.0),    # window opens at 36s → capped at max_interval
+    (30.0, 6.0),    # sleep until the window opens
+    (35.5, 2.0),    # never below min_interval
+    (36.0, 2.0),    # completion window → tight polls
+    (90.0, 2.0),
+    (180.0, 6.0),   # overdue: min_interval · elapsed / expected
+    (3600.0, 15.0), # ... capped at max_interval
+])
+def test_interval_follows_expected_render_time(elapsed, interval):
+    assert _poller()._interval(elapsed) == pytest.approx(interval)
+
+
+def test_expected_time_learns_from_completions():
+    poller = _poller()
+    poller._record_completion(110.0)
+    assert poller.expected_seconds == pytest.approx(70.0)
+
+    # Later completions shift the window
+    assert poller._interval(30.0) == pytest.approx(12.0)
+
+
+def test_wait_resolves_when_operation_is_done():
+    polls = []
+
+    def get_operation(op):
+        polls.append(op.name)
+        return SimpleNamespace(name=op.name, done=len(polls) >= 3)
+
+    poller = OperationPoller(
+        get_operation, expected_seconds=0.01, min_interval=0.01, max_interval=0.02
+    )
+    result = asyncio.run(poller.wait(SimpleNamespace(name="op-1", done=False), timeout=5))
+
+    assert result.done and result.name == "op-1"
+    assert len(polls) == 3
+    assert poller.in_flight() == 0
+
+
+def test_repeated_status_failures_fail_the_operation():
+    def get_operation(op):
+        raise RuntimeError("status unavailable")
+
+    poller = OperationPoller(
+        get_operation, expected_seconds=0.01, min_interval=0.01, max_interval=0.02,
+        max_failures=2,
+    )
+    with pytest.raises(RuntimeError, match="status unavailable"):
+        asyncio.run(poller.wait(SimpleNamespace(name="op-2", done=False), timeout=5))
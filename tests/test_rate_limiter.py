@@ -0,0 +1,82 @@
+import pytest
+import redis
+
+from app.services.rate_limiter import RateLimiter, token_bucket
+
+
+def test_full_bucket_serves_burst_without_wait():
+    tokens, wait = token_bucket(None, None, now=100.0, capacity=2, rate=1.0, requested=1)
+    assert (tokens, wait) == (1.0, 0.0)
+
+    tokens, wait = token_bucket(tokens, 100.0, now=100.0, capacity=2, rate=1.0, requested=1)
+    assert (tokens, wait) == (0.0, 0.0)
+
+
+def test_empty_bucket_queues_callers_fifo():
+    tokens, ts = 0.0, 100.0
+    waits = []
+    for _ in range(3):
+        tokens, wait = token_bucket(tokens, ts, now=100.0, capacity=2, rate=0.5, requested=1)
+        waits.append(wait)
+
+    # Each caller waits one refill interval (2s) longer than the previous
+    assert waits == [2.0, 4.0, 6.0]
+
+
+def test_refill_is_capped_at_capacity():
+    tokens, wait = token_bucket(0.0, 0.0, now=3600.0, capacity=3, rate=1.0, requested=1)
+    assert (tokens, wait) == (2.0, 0.0)
+
+
+def test_debt_is_paid_back_by_refill():
+    tokens, _ = token_bucket(-2.0, 10.0, now=12.0, capacity=2, rate=1.0, requested=1)
+    # -2 + 2s · 1/s = 0 → this request is 1 token short
+    assert tokens == -1.0
+
+
+def test_zero_rate_never_waits():
+    assert token_bucket(0.0, 0.0, now=1.0, capacity=0, rate=0.0, requested=5) == (0, 0.0)
+
+
+def _limiter(limits, script):
+    limiter = RateLimiter(limits=limits)
+    limiter.enabled = True
+    limiter._get_script = lambda: script
+    return limiter
+
+
+def test_zero_rate_bucket_skips_redis():
+    def script(**kwargs):
+        raise AssertionError("Redis must not be called for an unlimited bucket")
+
+    limiter = _limiter({"veo_generate": (2.0, 0.0)}, script)
+    assert limiter.acquire("veo_generate") == 0.0
+
+
+def test_wait_from_redis_is_returned():
+    calls = []
+
+    def script(keys, args):
+        calls.append((keys, args))
+        return b"0.25"
+
+    limiter = _limiter({"veo_generate": (2.0, 1.0)}, script)
+    assert limiter._reserve("veo_generate", 1) == 0.25
+    assert calls == [(
+        ["ratelimit:bucket:veo_generate", "ratelimit:metrics:veo_generate"],
+        [2.0, 1.0, 1],
+    )]
+
+
+def test_unknown_bucket_raises():
+    limiter = _limiter({}, lambda **kwargs: b"0")
+    with pytest.raises(ValueError):
+        limiter.acquire("nope")
+
+
+def test_redis_down_fails_open():
+    def script(**kwargs):
+        raise redis.ConnectionError("down")
+
+    limiter = _limiter({"veo_generate": (2.0, 1.0)}, script)
+    assert limiter.acquire("veo_generate") == 0.0
@@ -0,0 +1,123 @@
+import io
+import os
+import json
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.services import s3_service
+from app.services import video_merger as merger_module
+from app.services.ffmpeg_runner import FFmpegResult
+from app.services.media_probe import MediaInfo
+from app.services.s3_service import MultipartStreamUpload
+from app.services.video_merger import SceneInput, VideoMerger
+
+MiB = 1024 * 1024
+
+
+class FakeS3:
+    """Records multipart calls; fail_part makes that part number raise."""
+
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.parts = {}
+        self.completed = None
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "SlowDown"}}, "UploadPart")
+        with self._lock:
+            self.parts[PartNumber] = len(Body)
+        return {"ETag": f'"etag-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+        raise ClientError({"Error": {"Code": "NoSuchUpload"}}, "AbortMultipartUpload")
+
+
+class ShortReads(io.RawIOBase):
+    """Pipe-like stream: never returns more than 64 KiB per read."""
+
+    def __init__(self, size):
+        self._data = io.BytesIO(b"\0" * size)
+
+    def read(self, n=-1):
+        return self._data.read(min(n, 64 * 1024))
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    client = FakeS3()
+    monkeypatch.setattr(s3_service, "_s3_client", client)
+    return client
+
+
+def test_stream_is_split_into_parts(s3):
+    upload = MultipartStreamUpload("campaigns/videos/a.mp4", part_mb=5, concurrency=2)
+
+    sent = upload.write_from(ShortReads(12 * MiB))
+    url = upload.complete()
+
+    assert sent == 12 * MiB
+    # Every part but the last is the full (S3 minimum) size
+    assert s3.parts == {1: 5 * MiB, 2: 5 * MiB, 3: 2 * MiB}
+    assert s3.completed == [{"PartNumber": n, "ETag": f'"etag-{n}"'} for n in (1, 2, 3)]
+    assert url.endswith("/campaigns/videos/a.mp4")
+
+
+def test_exact_multiple_has_no_empty_tail_part(s3):
+    upload = MultipartStreamUpload("k", part_mb=5)
+    upload.write_from(ShortReads(10 * MiB))
+    assert s3.parts == {1: 5 * MiB, 2: 5 * MiB}
+
+
+def test_empty_stream_still_uploads_one_part(s3):
+    upload = MultipartStreamUpload("k", part_mb=5)
+    assert upload.write_from(ShortReads(0)) == 0
+    assert s3.parts == {1: 0}
+
+
+def test_failed_part_raises_and_abort_is_safe(s3):
+    s3.fail_part = 2
+    upload = MultipartStreamUpload("k", part_mb=5, concurrency=1)
+
+    with pytest.raises(ClientError):
+        upload.write_from(ShortReads(30 * MiB))
+    upload.abort()
+
+    assert s3.aborted
+    assert s3.completed is None
+
+
+def test_streamed_master_writes_a_manifest(s3, tmp_path, monkeypatch):
+    def run_ffmpeg(args, step, stdout_consumer=None, **kwargs):
+        assert args[-1] == "pipe:1"
+        sent = stdout_consumer(ShortReads(3 * MiB))
+        return FFmpegResult(step, 0, 0, 0, 0, 0, "", stdout_result=sent)
+
+    monkeypatch.setattr(merger_module, "run_ffmpeg", run_ffmpeg)
+    info = MediaInfo(path="v.mp4", duration=6.0, format_name="mp4", width=1280, height=720)
+    scene = SceneInput(video_path="v.mp4", voice_path="a.mp3", duration=6.0, info=info)
+
+    merger = VideoMerger(work_root=str(tmp_path), previews=False)
+    output = merger.render_single_pass([scene], "c1", "final_ad.mp4", stream_upload=True)
+
+    manifest = merger.stream_manifest(output)
+    assert manifest["bytes"] == 3 * MiB
+    assert manifest["duration"] == 6.0
+    assert manifest["url"].endswith(f"/campaigns/videos/{output.rsplit('/', 1)[-1]}")
+    with open(merger.stream_manifest_path(output)) as f:
+        assert json.load(f) == manifest
+
+    # The master itself never touches the disk
+    assert not os.path.exists(output)
+    assert s3.completed == [{"PartNumber": 1, "ETag": '"etag-1"'}]
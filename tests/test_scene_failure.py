@@ -0,0 +1,72 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.models.campaign import Campaign, CampaignScene
+from app.services import video_worker
+
+
+@pytest.fixture
+def scenes(db):
+    campaign = Campaign(id="c1", user_prompt="spring promo", product_type="beauty")
+    scenes = [
+        CampaignScene(id=f"s{n}", campaign_id="c1", scene_number=n,
+                      selected_image_url=f"https://example.com/{n}.png", status="image_selected")
+        for n in (1, 2)
+    ]
+    db.add_all([campaign, *scenes])
+    db.commit()
+    return campaign, scenes
+
+
+def test_failure_waits_for_running_tts_threads(db, scenes, monkeypatch):
+    finished = []
+
+    def slow_narration(product_type, campaign_id, scene_number, text):
+        time.sleep(0.3)
+        finished.append(scene_number)
+        return f"https://example.com/voice_{scene_number}.mp3", None
+
+    async def failing_veo(*args, **kwargs):
+        raise RuntimeError("VEO failed")
+
+    monkeypatch.setattr(video_worker, "_ensure_narration", slow_narration)
+    monkeypatch.setattr(video_worker, "generate_video_with_retries", failing_veo)
+    campaign, scene_rows = scenes
+
+    async def run():
+        with pytest.raises(RuntimeError, match="VEO failed"):
+            await video_worker._generate_scene_assets(
+                db, campaign, scene_rows, None, concurrency=2, local_voices=False
+            )
+        # Snapshot as the failure surfaces, before the loop shuts down
+        return sorted(finished)
+
+    assert asyncio.run(run()) == [1, 2]
+
+
+def test_cancelled_threads_skip_work_not_started():
+    calls = []
+
+    async def run():
+        threads = video_worker._SceneThreads()
+        gate = threading.Event()
+
+        running = asyncio.create_task(threads.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        cancel = asyncio.create_task(threads.cancel())
+        await asyncio.sleep(0.05)
+
+        # Queued after the failure → never runs
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await threads.run(calls.append, "tts")
+
+        assert not cancel.done()   # still waiting for the running thread
+        gate.set()
+        await cancel
+        return await running
+
+    assert asyncio.run(run()) is True
+    assert calls == []
@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from app.constants.encoding_profiles import DEFAULT_ENCODING_PROFILE, ENCODING_PROFILES
+from app.services.segment_cache import segment_s3_key
+
+SCENE = {
+    "scene_number": 2,
+    "video_url": "https://bucket.s3.amazonaws.com/campaigns/p/c1/scene_2_0123456789abcdef_video.mp4",
+    "voice_url": "https://bucket.s3.amazonaws.com/campaigns/p/c1/narration/scene_2_fedcba9876543210.mp3",
+}
+
+
+def _key(scene=SCENE, index=1, total=3, profile=None):
+    return segment_s3_key("c1", scene, index, total, profile)
+
+
+def test_key_is_stable_for_the_same_inputs():
+    assert _key() == _key()
+    assert re.fullmatch(r"campaigns/segments/c1/scene_2_[0-9a-f]{16}\.mp4", _key())
+
+
+def test_default_profile_matches_explicit_default():
+    assert _key(profile=None) == _key(profile=DEFAULT_ENCODING_PROFILE)
+
+
+@pytest.mark.parametrize("changed", [
+    {"video_url": SCENE["video_url"].replace("0123456789abcdef", "aaaaaaaaaaaaaaaa")},
+    {"voice_url": SCENE["voice_url"].replace("fedcba9876543210", "bbbbbbbbbbbbbbbb")},
+])
+def test_new_media_gives_a_new_key(changed):
+    assert _key(scene={**SCENE, **changed}) != _key()
+
+
+def test_position_decides_the_fades():
+    assert _key(index=0) != _key(index=1)
+    assert _key(index=1, total=2) != _key(index=1, total=3)
+
+
+def test_profile_is_part_of_the_key():
+    keys = {_key(profile=name) for name in ENCODING_PROFILES}
+    assert len(keys) == len(ENCODING_PROFILES)
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        _key(profile="nope")
@@ -0,0 +1,109 @@
+import pytest
+
+from app.celery_app import GENERATION_QUEUE, MERGE_QUEUE, UPLOAD_QUEUE, celery_app
+from app.models.campaign import Campaign, CampaignScene
+from app.tasks import video_tasks
+
+
+@pytest.fixture
+def campaign(db):
+    db.add(Campaign(id="c1", user_prompt="spring promo", status="veo_generating"))
+    db.add(CampaignScene(
+        id="s1", campaign_id="c1", scene_number=1,
+        selected_image_url="https://example.com/scene_1.png",
+    ))
+    db.commit()
+    return "c1"
+
+
+@pytest.fixture
+def scene_attempts(monkeypatch):
+    """Fails the scene pipeline `failures` times, then succeeds."""
+    attempts = []
+
+    def patch(failures):
+        def generate_scene_assets(campaign_id, scene_id, business_info):
+            attempts.append(scene_id)
+            if len(attempts) <= failures:
+                raise RuntimeError("VEO quota exceeded")
+            return {"scene_number": 1, "video_url": "v", "voice_url": "a"}
+
+        monkeypatch.setattr(video_tasks, "generate_scene_assets", generate_scene_assets)
+        return attempts
+
+    return patch
+
+
+def _campaign(db, campaign_id):
+    db.expire_all()
+    return db.get(Campaign, campaign_id)
+
+
+def test_failing_scene_task_fails_the_campaign(db, campaign, scene_attempts):
+    attempts = scene_attempts(failures=99)
+    task = video_tasks.generate_scene_video_task
+
+    # Eager apply runs the autoretries inline
+    result = task.apply((campaign, "s1", None))
+
+    assert result.failed()
+    assert len(attempts) == task.retry_kwargs["max_retries"] + 1
+    assert _campaign(db, campaign).status == "video_failed"
+    assert "VEO quota exceeded" in _campaign(db, campaign).generation_error
+
+
+def test_scene_task_retry_keeps_the_campaign_running(db, campaign, scene_attempts):
+    attempts = scene_attempts(failures=1)
+    result = video_tasks.generate_scene_video_task.apply((campaign, "s1", None))
+
+    assert result.successful()
+    assert len(attempts) == 2
+    assert _campaign(db, campaign).status == "veo_generating"
+    assert _campaign(db, campaign).generation_error is None
+
+
+def test_failing_segment_task_fails_the_campaign(db, campaign, monkeypatch):
+    def encode_campaign_segment(*args):
+        raise RuntimeError("ffmpeg exited with 1")
+
+    monkeypatch.setattr(video_tasks, "encode_campaign_segment", encode_campaign_segment)
+    scene_result = {"scene_number": 1, "video_url": "v", "voice_url": "a"}
+    video_tasks.encode_segment_task.apply((scene_result, campaign, 0, 1))
+
+    assert _campaign(db, campaign).status == "video_failed"
+    assert _campaign(db, campaign).generation_error == "ffmpeg exited with 1"
+
+
+def test_failure_errback_runs_on_the_generation_queue(db, campaign):
+    route = celery_app.amqp.router.route({}, video_tasks.campaign_video_failed_task.name)
+    assert route["queue"].name == GENERATION_QUEUE
+
+    video_tasks.campaign_video_failed_task.apply(
+        (None, RuntimeError("merge failed"), None, campaign)
+    )
+    assert _campaign(db, campaign).status == "video_failed"
+    assert _campaign(db, campaign).generation_error == "merge failed"
+
+
+def test_incremental_merge_hands_segments_to_the_merge_queue(db, campaign, monkeypatch):
+    dispatched = []
+
+    def dispatch_campaign_fanout(campaign_id, scene_ids, *args, distributed=None):
+        dispatched.append((campaign_id, scene_ids, distributed))
+        return video_tasks.celery_app.AsyncResult("chord-id")
+
+    monkeypatch.setattr(video_tasks, "DEFAULT_INCREMENTAL_MERGE", True)
+    monkeypatch.setattr(video_tasks, "dispatch_campaign_fanout", dispatch_campaign_fanout)
+
+    result = video_tasks.generate_campaign_video_task.apply((campaign, None, None, None))
+
+    assert result.get() == "chord-id"
+    assert dispatched == [(campaign, ["s1"], True)]
+    for name in ("encode_segment_task", "concat_segments_task"):
+        route = celery_app.amqp.router.route({}, getattr(video_tasks, name).name)
+        assert route["queue"].name == MERGE_QUEUE
+
+
+def test_publish_runs_on_the_upload_queue():
+    route = celery_app.amqp.router.route({}, video_tasks.publish_campaign_video_task.name)
+    assert route["queue"].name == UPLOAD_QUEUE